@@ -1,6 +1,6 @@
-from langchain_mcp_adapters.client import MultiServerMCPClient
-from langchain_openai import ChatOpenAI
-from langchain_community.utilities.dalle_image_generator import DallEAPIWrapper
+# The OpenAI clients (llm_clients), the MCP client (mcp_pool) and the Twitter
+# modules are imported where they are used, so `import agent` stays
+# fast for code paths that never touch them
 from typing import Annotated, TypedDict
 from langchain_core.messages import (
     BaseMessage,
@@ -8,19 +8,30 @@ from langchain_core.messages import (
     AIMessage,
     ToolMessage,
     SystemMessage,
+    RemoveMessage,
 )
 from langgraph.graph import StateGraph, START, END, MessagesState
 from langchain_core.tools import tool
-from langgraph.checkpoint.memory import MemorySaver
-from langgraph.types import Command, interrupt
+from langgraph.types import interrupt
+from langgraph.func import task
+from langgraph.config import get_stream_writer
 from loguru import logger
 import uuid
 from langchain_core.runnables import RunnableLambda
 from dotenv import load_dotenv
 import json
 import re
-# Import the Twitter client
-from twitter_client import post_ip_minted_tweet
+import os
+import hashlib
+import asyncio
+# Import the disk-backed checkpointer
+from checkpointer import get_checkpointer
+# Import speculative work for content under review
+from speculation import SPECULATIVE_REVIEW, get_speculation
+# Import the human interaction layer
+from interaction import ConsoleInteraction, drive
+# Import the shared tool runner (thread pool and per-tool caps)
+from tool_runner import get_tool_runner
 
 # Load environment variables from .env file
 load_dotenv()
@@ -35,7 +46,9 @@ class AgentState(TypedDict):
 @tool
 def generate_image(prompt: str) -> str:
     """Generate an image using DALL-E 3 based on the prompt."""
-    dalle = DallEAPIWrapper()
+    from llm_clients import get_image_generator
+
+    dalle = get_image_generator()
     image_url = dalle.run(prompt)
     return f"Generated image URL: {image_url}"
 
@@ -69,11 +82,19 @@ def upload_local_file(file_path: str) -> str:
     
     if file_ext not in valid_extensions:
         return f"Error: Unsupported file type. Please use one of: {', '.join(valid_extensions)}"
+
+    # Check the contents really are an image or video, not just the name
+    from media_info import sniff_content_type
+
+    if sniff_content_type(file_path) is None:
+        return f"Error: {os.path.basename(file_path)} is not a readable image or video file."
     
-    # Check file size (limit to 100MB)
+    # Check file size (limit set by MAX_UPLOAD_BYTES)
+    from local_upload import DEFAULT_MAX_UPLOAD_BYTES
+
     file_size = os.path.getsize(file_path)
-    if file_size > 100 * 1024 * 1024:  # 100MB in bytes
-        return f"Error: File size too large. Maximum size is 100MB."
+    if DEFAULT_MAX_UPLOAD_BYTES and file_size > DEFAULT_MAX_UPLOAD_BYTES:
+        return f"Error: File size too large. Maximum size is {DEFAULT_MAX_UPLOAD_BYTES // (1024 * 1024)}MB."
     
     # Return the file path for further processing
     return file_path
@@ -115,28 +136,365 @@ def get_human_feedback(image_url: str) -> str:
 
 async def setup_mcp_client():
     """Setup MCP client and get IPFS tools"""
-    async with MultiServerMCPClient() as client:
-        await client.connect_to_server(
-            "story_server",
-            command="python",
-            args=["../story-sdk-mcp/server.py"],
+    return await connect_story_tools()
+
+
+# Longest tool result kept in a compacted summary
+COMPACT_RESULT_CHARS = 300
+
+# Most entries a compacted summary keeps; older ones are dropped
+COMPACT_MAX_ENTRIES = 10
+
+# Name given to the AIMessage holding compacted history
+COMPACTED_HISTORY = "compacted_history"
+
+
+def compact_tool_exchanges(messages, keep_last=1):
+    """Collapse finished tool exchanges into one short summary.
+
+    Everything from the first finished tool exchange up to the last
+    keep_last exchanges (tool calls, their results, review feedback and any
+    earlier summary) is folded into a single AI message that lists the
+    most recent COMPACT_MAX_ENTRIES steps. System messages are left alone.
+    However many regenerate loops a run goes through, the history stays
+    about the same size. The returned updates are meant for the
+    add_messages reducer.
+
+    Args:
+        messages: The conversation so far
+        keep_last: Number of most recent tool exchanges to leave untouched
+
+    Returns:
+        A list of one replacement AIMessage and the RemoveMessages for the
+        messages folded into it
+    """
+    exchanges = [
+        index
+        for index, message in enumerate(messages)
+        if isinstance(message, AIMessage) and message.tool_calls and message.id
+    ]
+    if len(exchanges) <= keep_last:
+        return []
+
+    end = exchanges[-keep_last] if keep_last else len(messages)
+    start = exchanges[0]
+    for index, message in enumerate(messages[:start]):
+        if isinstance(message, AIMessage) and message.name == COMPACTED_HISTORY:
+            start = index
+            break
+
+    results = {
+        message.tool_call_id: message
+        for message in messages
+        if isinstance(message, ToolMessage) and message.id
+    }
+
+    entries = []
+    omitted = 0
+    removed = []
+    for message in messages[start:end]:
+        if isinstance(message, SystemMessage) or message.id in removed:
+            continue
+        removed.append(message.id)
+
+        if isinstance(message, AIMessage) and message.name == COMPACTED_HISTORY:
+            omitted += message.additional_kwargs.get("omitted", 0)
+            entries.extend(message.additional_kwargs.get("entries", []))
+        elif isinstance(message, AIMessage) and message.tool_calls:
+            if message.content:
+                entries.append(f"assistant: {message.content}")
+            for tool_call in message.tool_calls:
+                result = results.get(tool_call["id"])
+                if result is None:
+                    entries.append(f"{tool_call['name']}: no result")
+                    continue
+                removed.append(result.id)
+                entries.append(f"{tool_call['name']}: {result.content}")
+        elif isinstance(message, ToolMessage):
+            # A result whose tool call isn't in the compacted range
+            entries.append(f"{message.name}: {message.content}")
+        else:
+            role = "user" if isinstance(message, HumanMessage) else "assistant"
+            entries.append(f"{role}: {message.content}")
+
+    entries = [
+        entry if len(entry) <= COMPACT_RESULT_CHARS else entry[:COMPACT_RESULT_CHARS] + "..."
+        for entry in entries
+    ]
+    omitted += max(0, len(entries) - COMPACT_MAX_ENTRIES)
+    entries = entries[-COMPACT_MAX_ENTRIES:]
+
+    content = "Earlier steps (compacted):\n"
+    if omitted:
+        content += f"- ({omitted} earlier steps omitted)\n"
+    content += "\n".join(f"- {entry}" for entry in entries)
+
+    summary = AIMessage(
+        content=content,
+        name=COMPACTED_HISTORY,
+        id=messages[start].id,
+        additional_kwargs={"entries": entries, "omitted": omitted},
+    )
+    return [summary] + [
+        RemoveMessage(id=message_id)
+        for message_id in dict.fromkeys(removed)
+        if message_id != summary.id
+    ]
+
+
+def apply_message_updates(messages, updates):
+    """Return messages as they will look once updates are applied."""
+    if not updates:
+        return messages
+    replaced = {update.id: update for update in updates if not isinstance(update, RemoveMessage)}
+    removed = {update.id for update in updates if isinstance(update, RemoveMessage)}
+    return [
+        replaced.get(message.id, message)
+        for message in messages
+        if message.id not in removed
+    ]
+
+
+def thread_id_from(config):
+    """Return the thread ID a node is running under, or None."""
+    return ((config or {}).get("configurable") or {}).get("thread_id")
+
+
+def ipfs_uri_from(upload_result):
+    """Return the IPFS URI from an upload_image_to_ipfs result, or None."""
+    if "Successfully uploaded image to IPFS:" in upload_result:
+        return upload_result.split("Successfully uploaded image to IPFS: ")[1].strip()
+    return None
+
+
+def upload_progress(label, writer=None):
+    """Return a progress callback for local_upload.
+
+    Prints every 10% of each stage and, given a LangGraph stream writer,
+    emits an "upload_progress" custom stream event for every chunk. The
+    callback runs in the upload thread, so events are handed to the loop.
+
+    Args:
+        label (str): Name of the file shown in the output
+        writer (callable): Stream writer from get_stream_writer(), if any
+
+    Returns:
+        callable: progress(stage, done, total)
+    """
+    loop = asyncio.get_running_loop()
+    last_steps = {}
+
+    def progress(stage, done, total):
+        step = done * 10 // total if total else 10
+        if last_steps.get(stage) != step:
+            last_steps[stage] = step
+            print(f"{stage.capitalize()} {label}: {step * 10}% ({done / 2**20:.1f}/{total / 2**20:.1f} MB)")
+        if writer is not None:
+            event = {"upload_progress": {"file": label, "stage": stage, "done": done, "total": total}}
+            loop.call_soon_threadsafe(writer, event)
+
+    return progress
+
+
+def local_media_info(content_url):
+    """Return probe_mp4 facts for a local MP4/MOV file:// URL, or None."""
+    from media_info import probe_mp4
+
+    if not content_url or not content_url.startswith("file://"):
+        return None
+    try:
+        return probe_mp4(content_url[len("file://"):])
+    except (OSError, ValueError) as e:
+        logger.warning(f"Could not read video details from {content_url}: {e}")
+        return None
+
+
+def with_media_attributes(attributes, media_info):
+    """Return the LLM's attributes plus typed attributes from media_info.
+
+    Measured values replace any attribute the LLM suggested with the same
+    trait_type.
+    """
+    from media_info import media_attributes
+
+    if not media_info:
+        return attributes
+    measured = media_attributes(media_info)
+    names = {attr["trait_type"] for attr in measured}
+    return [attr for attr in attributes if attr["trait_type"] not in names] + measured
+
+
+def build_metadata_prompt(ipfs_uri, original_description, media_info=None):
+    """Return the prompt asking the LLM for IP metadata in JSON."""
+    from media_info import media_summary
+
+    # Measured video details, when known, so the description can use them
+    details = (
+        f"\n                    The video details are: {media_summary(media_info)}"
+        if media_info and media_summary(media_info)
+        else ""
+    )
+    return HumanMessage(
+        content=f"""I've uploaded an image to IPFS with URI: {ipfs_uri}. 
+                    The image was created based on this description: "{original_description}"{details}
+
+                    Please generate metadata for this IP with the following fields:
+                    1. Name: A creative name for this IP
+                    2. Description: A detailed description of what's in the image
+                    3. Attributes: A list of traits in the exact format shown below:
+
+                    [
+                    {{"trait_type": "style", "value": "[one-word style descriptor]"}},
+                    {{"trait_type": "mood", "value": "[one-word mood descriptor]"}},
+                    {{"trait_type": "setting", "value": "[one-word setting descriptor]"}}
+                    ]
+
+                    Format your response exactly like this:
+                    {{
+                    "name": "Your creative name here",
+                    "description": "Your detailed description here",
+                    "attributes": [
+                        {{"trait_type": "style", "value": "anime"}},
+                        {{"trait_type": "mood", "value": "exciting"}},
+                        {{"trait_type": "setting", "value": "mountains"}}
+                    ]
+                }}"""
+    )
+
+
+def parse_metadata_suggestion(metadata_content):
+    """Return (name, description, attributes) from the LLM's metadata suggestion.
+
+    Raises:
+        json.JSONDecodeError: If the response contains malformed JSON
+    """
+    # Look for JSON content between curly braces
+    json_match = re.search(r"\{.*\}", metadata_content, re.DOTALL)
+    if json_match:
+        json_str = json_match.group(0)
+        metadata_dict = json.loads(json_str)
+
+        name = metadata_dict.get("name", "AI Generated Artwork")
+        description = metadata_dict.get(
+            "description", "An AI-generated artwork uploaded to IPFS"
         )
-        ipfs_tools = [
-            tool
-            for tool in client.get_tools()
-            if tool.name
-            in [
-                "upload_image_to_ipfs",
-                "create_ip_metadata",
-                "mint_and_register_ip_with_terms",
-                "mint_license_tokens",
+        attributes = metadata_dict.get("attributes", [])
+
+        # Validate attributes format
+        valid_attributes = []
+        for attr in attributes:
+            if (
+                isinstance(attr, dict)
+                and "trait_type" in attr
+                and "value" in attr
+            ):
+                valid_attributes.append(attr)
+
+        # If no valid attributes found, create some default ones
+        if not valid_attributes:
+            valid_attributes = [
+                {"trait_type": "style", "value": "digital"},
+                {"trait_type": "creator", "value": "AI"},
             ]
+    else:
+        # Fallback to manual parsing if JSON extraction fails
+        name = "AI Generated Artwork"
+        description = "An AI-generated artwork uploaded to IPFS"
+
+        # Extract name if present
+        if "name" in metadata_content.lower():
+            name_match = re.search(
+                r'"name"\s*:\s*"([^"]+)"', metadata_content, re.IGNORECASE
+            )
+            if name_match:
+                name = name_match.group(1)
+
+        # Extract description if present
+        if "description" in metadata_content.lower():
+            desc_match = re.search(
+                r'"description"\s*:\s*"([^"]+)"',
+                metadata_content,
+                re.IGNORECASE,
+            )
+            if desc_match:
+                description = desc_match.group(1)
+
+        # Create default attributes
+        valid_attributes = [
+            {"trait_type": "style", "value": "digital"},
+            {"trait_type": "creator", "value": "AI"},
         ]
-        return ipfs_tools
+
+    return name, description, valid_attributes
 
 
 class State(MessagesState):
-    """Simple state."""
+    """Pipeline state.
+
+    Besides the conversation, each node stores its result in a typed field
+    so later nodes can read it directly instead of searching the messages.
+    """
+
+    content_url: str | None
+    content_type: str | None
+    media_info: dict | None
+    ipfs_uri: str | None
+    metadata_suggestion: str | None
+    registration_metadata: dict | None
+    terms: dict | None
+    minting: dict | None
+    license: dict | None
+
+
+# How create_graph saves the workflow diagram: "off", "mermaid" (local text)
+# or "png" (rendered remotely by mermaid.ink, falls back to "mermaid" offline)
+WORKFLOW_GRAPH_FORMAT = os.getenv("WORKFLOW_GRAPH_FORMAT", "off").lower()
+
+# Where the diagram is written, without extension
+WORKFLOW_GRAPH_PATH = os.getenv("WORKFLOW_GRAPH_PATH", "workflow_graph")
+
+
+def save_workflow_graph(graph, output_format=WORKFLOW_GRAPH_FORMAT, path=WORKFLOW_GRAPH_PATH):
+    """Write the workflow diagram unless an up-to-date one already exists.
+
+    The diagram is keyed by a hash of the graph's Mermaid source, so it is
+    only re-rendered when nodes or edges change.
+
+    Args:
+        graph: The compiled graph
+        output_format (str): "off", "mermaid" or "png"
+        path (str): Output path without extension
+
+    Returns:
+        str or None: Path of the diagram, or None if rendering is off
+    """
+    if output_format not in ("mermaid", "png"):
+        return None
+
+    mermaid = graph.get_graph().draw_mermaid()
+    topology_hash = hashlib.sha256(mermaid.encode()).hexdigest()
+
+    output_path = f"{path}.{'png' if output_format == 'png' else 'mmd'}"
+    hash_path = f"{output_path}.sha256"
+    if os.path.exists(output_path) and os.path.exists(hash_path):
+        with open(hash_path) as f:
+            if f.read().strip() == topology_hash:
+                return output_path
+
+    if output_format == "png":
+        try:
+            data = graph.get_graph().draw_mermaid_png()
+        except Exception as e:
+            print(f"Could not render {output_path} ({type(e).__name__}), saving Mermaid source instead")
+            return save_workflow_graph(graph, "mermaid", path)
+    else:
+        data = mermaid.encode()
+
+    with open(output_path, "wb") as f:
+        f.write(data)
+    with open(hash_path, "w") as f:
+        f.write(topology_hash)
+    return output_path
 
 
 def create_graph(ipfs_tools):
@@ -164,8 +522,16 @@ def create_graph(ipfs_tools):
             "Missing required tools. Make sure all required tools are available."
         )
 
-    # Initialize model with all tools available
-    model = ChatOpenAI(model="gpt-4o").bind_tools(
+    from llm_clients import get_chat_model
+    from llm_cache import get_llm_cache
+    from mint_ledger import (
+        ADJUST, LANDED, TRANSIENT, UNKNOWN, RetryPolicy, classify_mint_result,
+        get_mint_ledger, mint_key, parse_mint_result,
+    )
+
+    # Initialize model with all tools available; models are shared by all
+    # graphs in the process and pool their connections
+    model = get_chat_model("gpt-4o").bind_tools(
         [
             generate_image,
             upload_to_ipfs_tool,
@@ -177,18 +543,211 @@ def create_graph(ipfs_tools):
         ]
     )
 
-    # Simpler model for negotiation and other tasks
-    simple_model = ChatOpenAI(model="gpt-4o-mini")
+    # Simpler model for negotiation and other tasks. Its prompts only depend
+    # on the asset and the chosen terms, so responses are cached on disk
+    simple_model = get_chat_model("gpt-4o-mini", cache=get_llm_cache())
+
+    @task
+    async def ask_simple_model(messages):
+        """Call simple_model from a node that may be interrupted.
+
+        The result is checkpointed with the node's pending writes, so when
+        LangGraph re-runs the node to resume an interrupt, the stored
+        response is replayed instead of calling the model again.
+        """
+        return await simple_model.ainvoke(messages)
+
+    speculation = get_speculation()
+    tool_runner = get_tool_runner()
+
+    async def upload_content(content_url, writer=None):
+        """Upload content to IPFS and return the upload result text.
+
+        Content found in the upload index is not sent again. Local files
+        are streamed straight to IPFS_UPLOAD_URL when it is set; everything
+        else goes through the MCP upload tool.
+        """
+        from local_upload import get_uploader
+        from upload_index import content_key, get_upload_index
+
+        path = content_url[len("file://"):] if content_url.startswith("file://") else None
+        progress = upload_progress(os.path.basename(path), writer) if path else None
+
+        index = get_upload_index()
+        key = None
+        if index is not None:
+            # Hashing a large file takes a while, so it and the index's
+            # SQLite calls run off the loop
+            key = await asyncio.to_thread(content_key, content_url, progress)
+            ipfs_uri = await asyncio.to_thread(index.lookup, key)
+            if ipfs_uri:
+                print(f"Already uploaded to IPFS: {ipfs_uri}")
+                return f"Successfully uploaded image to IPFS: {ipfs_uri}"
+
+        uploader = get_uploader()
+        if uploader is not None and path is not None:
+            sha256 = key[len("sha256:"):] if key and key.startswith("sha256:") else None
+            ipfs_uri = await asyncio.to_thread(uploader.upload, path, progress, sha256)
+            result = f"Successfully uploaded image to IPFS: {ipfs_uri}"
+        else:
+            result = str(await tool_runner.invoke(upload_to_ipfs_tool, {"image_data": content_url}))
+
+        if key is not None and (ipfs_uri := ipfs_uri_from(result)):
+            await asyncio.to_thread(index.record, key, ipfs_uri, content_url)
+        return result
+
+    mint_policy = RetryPolicy()
+    # Mints this process is sending now, by key
+    mints_in_flight = {}
+
+    async def mint_idempotently(tool_args):
+        """Mint and register an IP asset at most once, retrying failures by policy.
+
+        The mint is recorded in the mint ledger under its registration
+        metadata and terms before it is sent. If an earlier run already
+        minted the asset with the same terms, its result is returned; if an
+        earlier mint's outcome is unknown, nothing is sent and an error is
+        returned.
+
+        Returns:
+            str: The mint tool's result, or an error message
+        """
+        ledger = get_mint_ledger()
+        key = mint_key(
+            tool_args["registration_metadata"],
+            tool_args["commercial_rev_share"],
+            tool_args["derivatives_allowed"],
+        )
+
+        if key is None:
+            return await send_mint(ledger, key, tool_args)
+
+        # Another run here is minting the same asset: wait for its outcome
+        while key in mints_in_flight:
+            await asyncio.shield(mints_in_flight[key])
+        mints_in_flight[key] = asyncio.get_running_loop().create_future()
+        try:
+            return await send_mint(ledger, key, tool_args)
+        finally:
+            mints_in_flight.pop(key).set_result(None)
+
+    async def send_mint(ledger, key, tool_args):
+        from mcp_pool import MCPConnectionLost
+
+        for attempt in range(1, mint_policy.max_attempts + 1):
+            # Ledger reads and writes are SQLite, so they run off the loop
+            if key is not None and not await asyncio.to_thread(
+                ledger.claim, key, tool_args["registration_metadata"]
+            ):
+                record = await asyncio.to_thread(ledger.get, key)
+                if record["status"] == LANDED:
+                    print(f"Already minted as {record['ip_id']}, not minting again")
+                    return record["result"]
+                return (
+                    f"Error: An earlier mint of this asset (key {key}) may still land"
+                    f"{' in transaction 0x' + record['tx_hash'] if record['tx_hash'] else ''}. "
+                    "Check the explorer, then run `python mint_ledger.py resolve` or "
+                    "`python mint_ledger.py clear` with this key."
+                )
+
+            try:
+                result = str(await asyncio.wait_for(
+                    mint_register_ip_tool.ainvoke(tool_args), mint_policy.attempt_timeout
+                ))
+                outcome = classify_mint_result(result)
+            except asyncio.TimeoutError:
+                # The transaction may have been sent
+                result = f"Error: No answer from the mint after {mint_policy.attempt_timeout:g}s; it may still land"
+                outcome = UNKNOWN
+            except MCPConnectionLost as e:
+                result = f"Error: {e}"
+                outcome = UNKNOWN
+            except Exception as e:
+                result = f"Error: {e}"
+                outcome = classify_mint_result(result)
+
+            ip_id, tx_hash, _ = parse_mint_result(result)
+            if key is not None:
+                status = {LANDED: "landed", UNKNOWN: "pending"}.get(outcome, "failed")
+                await asyncio.to_thread(
+                    ledger.finish, key, status, result, ip_id=ip_id, tx_hash=tx_hash
+                )
+
+            if outcome == ADJUST and tool_args["derivatives_allowed"] != "true":
+                # Derivative attribution needs derivatives allowed
+                # Other terms are another mint, with a key of its own
+                print("Minting was rejected with derivatives disabled; retrying with derivatives allowed")
+                return await mint_idempotently({**tool_args, "derivatives_allowed": "true"})
+            if outcome == TRANSIENT and attempt < mint_policy.max_attempts:
+                delay = mint_policy.delay(attempt)
+                print(f"Minting failed ({result.strip()[:100]}); retrying in {delay:.1f}s")
+                await asyncio.sleep(delay)
+                continue
+            return result
+        return result
+
+    def speculate_after_review(thread_id, content_url, original_description):
+        """Start the upload and metadata steps for content awaiting review.
+
+        Each step is registered under the content URL. RunIPFSTool,
+        GenerateMetadata and CreateMetadata take the results after an
+        approval; a rejection discards them.
+        """
+        upload = speculation.start(
+            thread_id,
+            ("upload", content_url),
+            lambda: upload_content(content_url),
+        )
+
+        async def suggest_metadata():
+            ipfs_uri = ipfs_uri_from(str(await upload))
+            if not ipfs_uri:
+                raise ValueError("Upload did not return an IPFS URI")
+            media_info = await asyncio.to_thread(local_media_info, content_url)
+            response = await simple_model.ainvoke(
+                [build_metadata_prompt(ipfs_uri, original_description, media_info)]
+            )
+            return {
+                "ipfs_uri": ipfs_uri,
+                "description": original_description,
+                "content": response.content,
+                "media_info": media_info,
+            }
+
+        suggestion = speculation.start(
+            thread_id, ("metadata", content_url), suggest_metadata
+        )
+
+        async def create_metadata():
+            suggested = await suggestion
+            name, description, attributes = parse_metadata_suggestion(suggested["content"])
+            result = await create_metadata_tool.ainvoke(
+                {
+                    "image_uri": suggested["ipfs_uri"],
+                    "name": name,
+                    "description": description,
+                    "attributes": with_media_attributes(attributes, suggested["media_info"]),
+                }
+            )
+            return {
+                "ipfs_uri": suggested["ipfs_uri"],
+                "metadata_content": suggested["content"],
+                "result": result,
+            }
+
+        speculation.start(thread_id, ("create_metadata", content_url), create_metadata)
 
     class CallLLM:
         async def ainvoke(self, state, config=None):
-            messages = state["messages"]
+            # Collapse finished tool exchanges before prompting, so retries
+            # don't grow the prompt or the checkpoint
+            compaction = compact_tool_exchanges(state["messages"])
+            messages = apply_message_updates(state["messages"], compaction)
             response = await model.ainvoke(messages)
-            return {"messages": [response]}
+            return {"messages": compaction + [response]}
 
     class RunTool:
         async def ainvoke(self, state, config=None):
-            new_messages = []
             tools = {
                 "generate_image": generate_image,
                 "upload_image_to_ipfs": upload_to_ipfs_tool,
@@ -197,44 +756,26 @@ def create_graph(ipfs_tools):
             }
             last_message = state["messages"][-1]
 
-            for tool_call in last_message.tool_calls:
+            async def run_tool_call(tool_call):
                 try:
                     tool = tools[tool_call["name"]]
 
                     # Handle local file upload
                     if tool_call["name"] == "upload_local_file":
                         file_path = tool_call["args"].get("file_path", "")
-                        result = tool(file_path)
+                        result = await tool_runner.invoke(tool, {"file_path": file_path})
                         
                         if isinstance(result, str) and result.startswith("Error:"):
                             # If there's an error, return it
-                            new_messages.append(
-                                ToolMessage(
-                                    content=result,
-                                    name=tool_call["name"],
-                                    tool_call_id=tool_call["id"],
-                                )
-                            )
+                            content = result
                         else:
                             # If successful, return the file path for review
-                            new_messages.append(
-                                ToolMessage(
-                                    content=f"File path: {result}",
-                                    name=tool_call["name"],
-                                    tool_call_id=tool_call["id"],
-                                )
-                            )
+                            content = f"File path: {result}"
                     # Handle Luma video generation
                     elif tool_call["name"] == "generate_luma_video":
                         prompt = tool_call["args"].get("prompt", "")
-                        result = tool(prompt)
-                        new_messages.append(
-                            ToolMessage(
-                                content=f"Generated video URL: {result}",
-                                name=tool_call["name"],
-                                tool_call_id=tool_call["id"],
-                            )
-                        )
+                        result = await tool_runner.invoke(tool, {"prompt": prompt})
+                        content = f"Generated video URL: {result}"
                     # Extract just the string value for image_data if that's the parameter
                     elif (
                         tool_call["name"] == "upload_image_to_ipfs"
@@ -242,107 +783,83 @@ def create_graph(ipfs_tools):
                     ):
                         # Make sure we're passing just the URL string, not a complex object
                         image_url = tool_call["args"]["image_data"]
-                        result = await tool.ainvoke({"image_data": image_url})
-                        
-                        # Make sure result is a string
-                        if not isinstance(result, str):
-                            result = str(result)
-                        
-                        new_messages.append(
-                            ToolMessage(
-                                content=result,
-                                name=tool_call["name"],
-                                tool_call_id=tool_call["id"],
-                            )
-                        )
+                        content = await upload_content(image_url, get_stream_writer())
                     else:
-                        result = await tool.ainvoke(tool_call["args"])
-
                         # Make sure result is a string
-                        if not isinstance(result, str):
-                            result = str(result)
-                        
-                        new_messages.append(
-                            ToolMessage(
-                                content=result,
-                                name=tool_call["name"],
-                                tool_call_id=tool_call["id"],
-                            )
-                        )
+                        content = str(await tool_runner.invoke(tool, tool_call["args"]))
 
                 except Exception as e:
-                    new_messages.append(
-                        ToolMessage(
-                            content=f"Error executing tool: {str(e)}",
-                            name=tool_call["name"],
-                            tool_call_id=tool_call["id"],
-                        )
-                    )
+                    content = f"Error executing tool: {str(e)}"
+
+                return ToolMessage(
+                    content=content,
+                    name=tool_call["name"],
+                    tool_call_id=tool_call["id"],
+                )
+
+            # Run the calls concurrently; results keep the order of the calls
+            new_messages = list(
+                await asyncio.gather(*(run_tool_call(tc) for tc in last_message.tool_calls))
+            )
 
             # Determine next node based on the tool that was called
             if any(msg.name == "generate_image" for msg in new_messages) or \
                any(msg.name == "generate_luma_video" for msg in new_messages) or \
                any(msg.name == "upload_local_file" for msg in new_messages):
-                return {"messages": state["messages"] + new_messages, "next": "human_review_node"}
+                return {"messages": new_messages, "next": "human_review_node"}
             
-            return {"messages": state["messages"] + new_messages}
+            return {"messages": new_messages}
 
     class RunIPFSTool:
         async def ainvoke(self, state, config=None):
-            new_messages = []
             last_message = state["messages"][-1]
 
-            for tool_call in last_message.tool_calls:
+            async def run_tool_call(tool_call):
                 try:
                     # Extract just the string value for image_data if that's the parameter
                     if "image_data" in tool_call["args"]:
                         # Make sure we're passing just the URL string, not a complex object
                         image_url = tool_call["args"]["image_data"]
-                        result = await upload_to_ipfs_tool.ainvoke(
-                            {"image_data": image_url}
+
+                        # Use the upload started while the content was under review
+                        result = await speculation.take(
+                            thread_id_from(config), ("upload", image_url)
                         )
+                        if result is None:
+                            result = await upload_content(image_url, get_stream_writer())
                     else:
-                        result = await upload_to_ipfs_tool.ainvoke(tool_call["args"])
+                        result = await tool_runner.invoke(upload_to_ipfs_tool, tool_call["args"])
 
                     # Make sure result is a string
-                    if not isinstance(result, str):
-                        result = str(result)
-                    
-                    new_messages.append(
-                        ToolMessage(
-                            content=result,
-                            name=tool_call["name"],
-                            tool_call_id=tool_call["id"],
-                        )
-                    )
+                    content = str(result)
 
                 except Exception as e:
-                    new_messages.append(
-                        ToolMessage(
-                            content=f"Error executing tool: {str(e)}",
-                            name=tool_call["name"],
-                            tool_call_id=tool_call["id"],
-                        )
-                    )
+                    content = f"Error executing tool: {str(e)}"
 
-            return {"messages": new_messages}
+                return ToolMessage(
+                    content=content,
+                    name=tool_call["name"],
+                    tool_call_id=tool_call["id"],
+                )
+
+            # Run the calls concurrently; results keep the order of the calls
+            new_messages = list(
+                await asyncio.gather(*(run_tool_call(tc) for tc in last_message.tool_calls))
+            )
+
+            # The last successful upload wins, as when the calls ran one by one
+            ipfs_uri = None
+            for message in new_messages:
+                ipfs_uri = ipfs_uri_from(message.content) or ipfs_uri
+
+            return {"messages": new_messages, "ipfs_uri": ipfs_uri}
 
     class GenerateMetadata:
         async def ainvoke(self, state, config=None):
             print("Generating metadata...")
 
-            # Get the IPFS URI from the previous message
-            ipfs_uri = None
-            for message in reversed(state["messages"]):
-                if (
-                    isinstance(message, ToolMessage)
-                    and message.name == "upload_image_to_ipfs"
-                ):
-                    if "Successfully uploaded image to IPFS:" in message.content:
-                        ipfs_uri = message.content.split(
-                            "Successfully uploaded image to IPFS: "
-                        )[1].strip()
-                        break
+            # Get the IPFS URI stored by the upload step
+            ipfs_uri = state.get("ipfs_uri")
 
             if not ipfs_uri:
                 return {
@@ -360,47 +877,32 @@ def create_graph(ipfs_tools):
                     original_description = message.content
                     break
 
-            # Use a simple LLM without tools for metadata generation
-            metadata_llm = ChatOpenAI(model="gpt-4o-mini")
-
-            # Create a prompt for the LLM to generate metadata in the exact format we need
-            metadata_prompt = HumanMessage(
-                content=f"""I've uploaded an image to IPFS with URI: {ipfs_uri}. 
-                    The image was created based on this description: "{original_description}"
-
-                    Please generate metadata for this IP with the following fields:
-                    1. Name: A creative name for this IP
-                    2. Description: A detailed description of what's in the image
-                    3. Attributes: A list of traits in the exact format shown below:
-
-                    [
-                    {{"trait_type": "style", "value": "[one-word style descriptor]"}},
-                    {{"trait_type": "mood", "value": "[one-word mood descriptor]"}},
-                    {{"trait_type": "setting", "value": "[one-word setting descriptor]"}}
-                    ]
-
-                    Format your response exactly like this:
-                    {{
-                    "name": "Your creative name here",
-                    "description": "Your detailed description here",
-                    "attributes": [
-                        {{"trait_type": "style", "value": "anime"}},
-                        {{"trait_type": "mood", "value": "exciting"}},
-                        {{"trait_type": "setting", "value": "mountains"}}
-                    ]
-                }}"""
+            # Use metadata generated while the content was under review, if
+            # it was generated for this upload
+            speculative = await speculation.take(
+                thread_id_from(config), ("metadata", state.get("content_url"))
             )
+            if (
+                speculative
+                and speculative["ipfs_uri"] == ipfs_uri
+                and speculative["description"] == original_description
+            ):
+                metadata_content = speculative["content"]
+            else:
+                # Get LLM to generate metadata suggestions in the correct format
+                metadata_response = await simple_model.ainvoke(
+                    [build_metadata_prompt(ipfs_uri, original_description, state.get("media_info"))]
+                )
+                metadata_content = metadata_response.content
 
-            # Get LLM to generate metadata suggestions in the correct format
-            metadata_response = await metadata_llm.ainvoke([metadata_prompt])
-
-            # Store the IPFS URI in the message for the next node
+            # Store the suggestions for the next node
             return {
                 "messages": [
                     AIMessage(
-                        content=f"IPFS_URI: {ipfs_uri}\n\n{metadata_response.content}"
+                        content=f"IPFS_URI: {ipfs_uri}\n\n{metadata_content}"
                     )
-                ]
+                ],
+                "metadata_suggestion": metadata_content,
             }
 
     class CreateMetadata:
@@ -408,102 +910,58 @@ def create_graph(ipfs_tools):
             print("Creating metadata...")
             new_messages = []
 
-            # Get the metadata suggestions from the LLM
-            metadata_message = None
-            for message in reversed(state["messages"]):
-                if isinstance(message, AIMessage) and "IPFS_URI:" in message.content:
-                    metadata_message = message
-                    break
+            # Get the IPFS URI and the metadata suggestions from the LLM
+            ipfs_uri = state.get("ipfs_uri")
+            metadata_content = state.get("metadata_suggestion")
+            registration_metadata = None
 
-            if not metadata_message:
+            if not ipfs_uri or metadata_content is None:
                 return {
                     "messages": [
                         AIMessage(content="Failed to find metadata suggestions.")
                     ]
                 }
 
-            # Extract IPFS URI from the message
-            ipfs_uri = (
-                metadata_message.content.split("IPFS_URI:")[1].split("\n")[0].strip()
-            )
-
-            # Extract the JSON part of the message
-            metadata_content = metadata_message.content.split("IPFS_URI:")[1].split(
-                "\n\n", 1
-            )[1]
-
+            thread_id = thread_id_from(config)
             try:
-                # Try to parse the JSON directly from the LLM response
-                import json
-                import re
-
-                # Look for JSON content between curly braces
-                json_match = re.search(r"\{.*\}", metadata_content, re.DOTALL)
-                if json_match:
-                    json_str = json_match.group(0)
-                    metadata_dict = json.loads(json_str)
-
-                    name = metadata_dict.get("name", "AI Generated Artwork")
-                    description = metadata_dict.get(
-                        "description", "An AI-generated artwork uploaded to IPFS"
-                    )
-                    attributes = metadata_dict.get("attributes", [])
-
-                    # Validate attributes format
-                    valid_attributes = []
-                    for attr in attributes:
-                        if (
-                            isinstance(attr, dict)
-                            and "trait_type" in attr
-                            and "value" in attr
-                        ):
-                            valid_attributes.append(attr)
-
-                    # If no valid attributes found, create some default ones
-                    if not valid_attributes:
-                        valid_attributes = [
-                            {"trait_type": "style", "value": "digital"},
-                            {"trait_type": "creator", "value": "AI"},
-                        ]
+                # Use metadata created while the content was under review, if
+                # it was created from these suggestions
+                speculative = await speculation.take(
+                    thread_id, ("create_metadata", state.get("content_url"))
+                )
+                if (
+                    speculative
+                    and speculative["ipfs_uri"] == ipfs_uri
+                    and speculative["metadata_content"] == metadata_content
+                ):
+                    result = speculative["result"]
                 else:
-                    # Fallback to manual parsing if JSON extraction fails
-                    name = "AI Generated Artwork"
-                    description = "An AI-generated artwork uploaded to IPFS"
-
-                    # Extract name if present
-                    if "name" in metadata_content.lower():
-                        name_match = re.search(
-                            r'"name"\s*:\s*"([^"]+)"', metadata_content, re.IGNORECASE
-                        )
-                        if name_match:
-                            name = name_match.group(1)
-
-                    # Extract description if present
-                    if "description" in metadata_content.lower():
-                        desc_match = re.search(
-                            r'"description"\s*:\s*"([^"]+)"',
-                            metadata_content,
-                            re.IGNORECASE,
-                        )
-                        if desc_match:
-                            description = desc_match.group(1)
-
-                    # Create default attributes
-                    valid_attributes = [
-                        {"trait_type": "style", "value": "digital"},
-                        {"trait_type": "creator", "value": "AI"},
-                    ]
+                    name, description, valid_attributes = parse_metadata_suggestion(
+                        metadata_content
+                    )
 
-                # Call the create_ip_metadata tool with properly formatted data
-                result = await create_metadata_tool.ainvoke(
-                    {
-                        "image_uri": ipfs_uri,
-                        "name": name,
-                        "description": description,
-                        "attributes": valid_attributes,
-                    }
-                )
+                    # Call the create_ip_metadata tool with properly formatted data
+                    result = await create_metadata_tool.ainvoke(
+                        {
+                            "image_uri": ipfs_uri,
+                            "name": name,
+                            "description": description,
+                            "attributes": with_media_attributes(
+                                valid_attributes, state.get("media_info")
+                            ),
+                        }
+                    )
                 
+                # Keep the registration metadata for negotiation and minting
+                if "Registration metadata for minting:" in result:
+                    metadata_section = result.split(
+                        "Registration metadata for minting:"
+                    )[1].strip()
+                    try:
+                        registration_metadata = json.loads(metadata_section)
+                    except json.JSONDecodeError:
+                        pass
+
                 new_messages.append(
                     ToolMessage(
                         content=result,
@@ -521,42 +979,26 @@ def create_graph(ipfs_tools):
                     )
                 )
 
-            return {"messages": new_messages}
+            # Nothing speculative is needed for this run any more
+            speculation.discard(thread_id)
+
+            return {
+                "messages": new_messages,
+                "registration_metadata": registration_metadata,
+            }
 
     class NegotiateTerms:
         async def ainvoke(self, state, config=None):
             # Check if this is the first negotiation or a subsequent one
-            is_first_negotiation = True
-            for message in state["messages"]:
-                if (
-                    isinstance(message, AIMessage)
-                    and "Terms have been set for this IP:" in message.content
-                ):
-                    is_first_negotiation = False
-                    break
+            is_first_negotiation = state.get("terms") is None
 
             if is_first_negotiation:
                 print("Negotiating terms...")
             else:
                 print("Deliberating...")
 
-            # Get the registration metadata from the previous message
-            registration_metadata = None
-            for message in reversed(state["messages"]):
-                if (
-                    isinstance(message, ToolMessage)
-                    and message.name == "create_ip_metadata"
-                ):
-                    if "Registration metadata for minting:" in message.content:
-                        metadata_section = message.content.split(
-                            "Registration metadata for minting:"
-                        )[1].strip()
-
-                        try:
-                            registration_metadata = json.loads(metadata_section)
-                            break
-                        except json.JSONDecodeError:
-                            pass
+            # Get the registration metadata stored by CreateMetadata
+            registration_metadata = state.get("registration_metadata")
 
             if not registration_metadata:
                 return {
@@ -614,8 +1056,8 @@ def create_graph(ipfs_tools):
                 """
             )
 
-            # Get initial explanation from the LLM
-            explanation = await simple_model.ainvoke(
+            # Get initial explanation from the LLM (replayed on resume)
+            explanation = await ask_simple_model(
                 [SystemMessage(content=negotiation_prompt), initial_message]
             )
 
@@ -655,6 +1097,34 @@ def create_graph(ipfs_tools):
             ):
                 commercial_rev_share = 15  # Default to 15% if invalid
 
+            # Check if the LLM suggests changes - only if terms are outside reasonable ranges
+            suggests_changes = False
+
+            # For commercial revenue share, only suggest changes if outside 5-30% range
+            if commercial_rev_share < 5 or commercial_rev_share > 50:
+                suggests_changes = True
+
+            # If the terms are reasonable, skip the feedback step
+            if not suggests_changes:
+                # Store the negotiated terms and registration metadata for the next node
+                return {
+                    "messages": [
+                        AIMessage(
+                            content=f"""
+                            Terms have been set for this IP:
+                            - Commercial Revenue Share: {commercial_rev_share}%
+                            - Derivatives Allowed: {"Yes" if derivatives_allowed else "No"}
+
+                            Registration metadata is ready for minting.
+                        """,
+                        )
+                    ],
+                    "terms": {
+                        "commercial_rev_share": commercial_rev_share,
+                        "derivatives_allowed": derivatives_allowed,
+                    },
+                }
+
             # Prepare a message for the LLM to evaluate the user's choices
             evaluation_message = HumanMessage(
                 content=f"""
@@ -681,42 +1151,12 @@ def create_graph(ipfs_tools):
                 """
             )
 
-            # Get evaluation from the LLM
-            evaluation = await simple_model.ainvoke(
+            # Get evaluation from the LLM (only needed when giving feedback;
+            # replayed on resume)
+            evaluation = await ask_simple_model(
                 [SystemMessage(content=negotiation_prompt), evaluation_message]
             )
 
-            # Check if the LLM suggests changes - only if terms are outside reasonable ranges
-            suggests_changes = False
-
-            # For commercial revenue share, only suggest changes if outside 5-30% range
-            if commercial_rev_share < 5 or commercial_rev_share > 50:
-                suggests_changes = True
-
-            # If the terms are reasonable, skip the feedback step
-            if not suggests_changes:
-                # Store the negotiated terms and registration metadata for the next node
-                return {
-                    "messages": [
-                        AIMessage(
-                            content=f"""
-                            Terms have been set for this IP:
-                            - Commercial Revenue Share: {commercial_rev_share}%
-                            - Derivatives Allowed: {"Yes" if derivatives_allowed else "No"}
-
-                            Registration metadata is ready for minting.
-                        """,
-                            additional_kwargs={
-                                "terms_data": {
-                                    "commercial_rev_share": commercial_rev_share,
-                                    "derivatives_allowed": derivatives_allowed,
-                                    "registration_metadata": registration_metadata,
-                                }
-                            },
-                        )
-                    ]
-                }
-
             # Only ask for feedback if the terms are outside reasonable ranges
             feedback_review = interrupt(
                 {
@@ -786,31 +1226,20 @@ def create_graph(ipfs_tools):
 
                             Registration metadata is ready for minting.
                     """,
-                        additional_kwargs={
-                            "terms_data": {
-                                "commercial_rev_share": commercial_rev_share,
-                                "derivatives_allowed": derivatives_allowed,
-                                "registration_metadata": registration_metadata,
-                            }
-                        },
                     )
-                ]
+                ],
+                "terms": {
+                    "commercial_rev_share": commercial_rev_share,
+                    "derivatives_allowed": derivatives_allowed,
+                },
             }
 
     class MintRegisterIP:
         async def ainvoke(self, state, config=None):
             print("Minting and registering IP...")
 
-            # Get the terms data from the previous message
-            terms_data = None
-            for message in reversed(state["messages"]):
-                if (
-                    isinstance(message, AIMessage)
-                    and hasattr(message, "additional_kwargs")
-                    and "terms_data" in message.additional_kwargs
-                ):
-                    terms_data = message.additional_kwargs["terms_data"]
-                    break
+            # Get the negotiated terms
+            terms_data = state.get("terms")
 
             if not terms_data:
                 return {
@@ -825,7 +1254,7 @@ def create_graph(ipfs_tools):
                 # Extract the parameters
                 commercial_rev_share = terms_data["commercial_rev_share"]
                 derivatives_allowed = terms_data["derivatives_allowed"]
-                registration_metadata = terms_data["registration_metadata"]
+                registration_metadata = state.get("registration_metadata")
                 
                 # Fix the metadata format - ensure hashes have 0x prefix
                 fixed_metadata = {}
@@ -851,109 +1280,28 @@ def create_graph(ipfs_tools):
                     "registration_metadata": fixed_metadata
                 }
 
-                # Call the mint_and_register_ip_with_terms tool
-                result = await mint_register_ip_tool.ainvoke(tool_args)
-
-                # Check if there was an error related to derivatives
-                if (
-                    "Cannot add derivative attribution when derivative use is disabled"
-                    in result
-                ):
-                    # Retry with derivatives allowed
-                    tool_args["derivatives_allowed"] = "true"
-                    result = await mint_register_ip_tool.ainvoke(tool_args)
-                    
-                ip_id = None
-                tx_hash = None
-                license_terms_ids = []
-
-                # Extract IP ID
-                ip_id_match = re.search(r"IP ID: (0x[a-fA-F0-9]+)", result)
-                if ip_id_match:
-                    ip_id = ip_id_match.group(1)
+                result = await mint_idempotently(tool_args)
+                ip_id, tx_hash, license_terms_ids = parse_mint_result(result)
+                if ip_id:
                     # Print the IP link in the requested format
                     print(f"\n@https://aeneid.explorer.story.foundation/ipa/{ip_id}")
-
-                # Extract Transaction Hash
-                tx_hash_match = re.search(r"Transaction Hash: ([a-fA-F0-9]+)", result)
-                if tx_hash_match:
-                    tx_hash = tx_hash_match.group(1)
+                if tx_hash:
                     # Print the transaction link in the requested format
                     print(f"@https://aeneid.storyscan.xyz/tx/0x{tx_hash}")
 
-                # Extract License Terms IDs
-                license_terms_match = re.search(r"License Terms IDs: \[(.*?)\]", result)
-                if license_terms_match:
-                    terms_str = license_terms_match.group(1)
-                    # Parse the comma-separated list
-                    if terms_str:
-                        license_terms_ids = [
-                            int(term.strip())
-                            for term in terms_str.split(",")
-                            if term.strip().isdigit()
-                        ]
-
-                # If we still don't have an IP ID, the minting failed
-                if not ip_id:
-                    # Try one more time with more reasonable defaults and fixed metadata format
-                    tool_args = {
-                        "commercial_rev_share": "15",
-                        "derivatives_allowed": "true",
-                        "registration_metadata": fixed_metadata
-                    }
-                    
-                    print(f"\n--- Final Retry Arguments ---")
-                    print(json.dumps(tool_args, indent=2))
-                    print("----------------------------\n")
-                    
-                    result = await mint_register_ip_tool.ainvoke(tool_args)
-                    
-                    # Extract IP ID again
-                    ip_id_match = re.search(r"IP ID: (0x[a-fA-F0-9]+)", result)
-                    if ip_id_match:
-                        ip_id = ip_id_match.group(1)
-                        # Print the IP link in the requested format
-                        print(
-                            f"\n@https://aeneid.explorer.story.foundation/ipa/{ip_id}"
-                        )
-
-                    # Extract Transaction Hash again
-                    tx_hash_match = re.search(
-                        r"Transaction Hash: ([a-fA-F0-9]+)", result
-                    )
-                    if tx_hash_match:
-                        tx_hash = tx_hash_match.group(1)
-                        # Print the transaction link in the requested format
-                        print(f"@https://aeneid.storyscan.xyz/tx/0x{tx_hash}")
-
-                    # Extract License Terms IDs again
-                    license_terms_match = re.search(
-                        r"License Terms IDs: \[(.*?)\]", result
-                    )
-                    if license_terms_match:
-                        terms_str = license_terms_match.group(1)
-                        if terms_str:
-                            license_terms_ids = [
-                                int(term.strip())
-                                for term in terms_str.split(",")
-                                if term.strip().isdigit()
-                            ]
-
                 return {
                     "messages": [
                         ToolMessage(
                             content=result,
                             name="mint_and_register_ip_with_terms",
                             tool_call_id=str(uuid.uuid4()),
-                            additional_kwargs={
-                                "minting_data": {
-                                    "ip_id": ip_id,
-                                    "license_terms_ids": license_terms_ids,
-                                    "tx_hash": tx_hash,
-                                }
-                            },
                         )
-                    ]
+                    ],
+                    "minting": {
+                        "ip_id": ip_id,
+                        "license_terms_ids": license_terms_ids,
+                        "tx_hash": tx_hash,
+                    },
                 }
 
             except Exception as e:
@@ -976,12 +1324,8 @@ def create_graph(ipfs_tools):
         async def ainvoke(self, state, config=None):
             print("Minting license tokens...")
 
-            # Get the minting data from the previous message
-            minting_data = None
-            for message in reversed(state["messages"]):
-                if hasattr(message, "additional_kwargs") and "minting_data" in message.additional_kwargs:
-                    minting_data = message.additional_kwargs["minting_data"]
-                    break
+            # Get the minting data stored by MintRegisterIP
+            minting_data = state.get("minting")
 
             if not minting_data:
                 return {
@@ -997,10 +1341,10 @@ def create_graph(ipfs_tools):
             try:
                 # Simulate minting license tokens
                 # In a real implementation, this would call the Story Protocol SDK
-                import time
                 import random
 
-                time.sleep(2)  # Simulate blockchain transaction time
+                # Simulate blockchain transaction time without blocking other runs
+                await asyncio.sleep(2)
 
                 # Generate a random transaction hash
                 tx_hash = "0x" + "".join(
@@ -1015,7 +1359,7 @@ def create_graph(ipfs_tools):
                     "tx_hash": tx_hash,
                     "license_token_ids": license_token_ids,
                     "ip_id": minting_data.get("ip_id"),
-                    "terms": minting_data.get("terms")
+                    "terms": state.get("terms")
                 }
 
                 return {
@@ -1024,9 +1368,9 @@ def create_graph(ipfs_tools):
                             content=f"Successfully minted license tokens with IDs: {', '.join(map(str, license_token_ids))}. Transaction hash: {tx_hash}",
                             name="mint_license_tokens",
                             tool_call_id=str(uuid.uuid4()),
-                            additional_kwargs={"license_data": license_data, "minting_data": minting_data}
                         )
-                    ]
+                    ],
+                    "license": license_data,
                 }
             except Exception as e:
                 return {
@@ -1040,55 +1384,37 @@ def create_graph(ipfs_tools):
                 }
 
     class PostToTwitter:
-        """Post to Twitter about the minted IP asset."""
+        """Queue a tweet about the minted IP asset.
+
+        The tweet goes into the durable outbox and is posted in the
+        background, so a slow or rate-limited Twitter never holds up the run.
+        """
 
         async def ainvoke(self, state, config=None):
-            print("Posting to Twitter about the minted IP asset...")
+            print("Queueing a tweet about the minted IP asset...")
             
-            # Extract image URL from the messages
-            image_url = None
-            ip_id = None
-            tx_hash = None
-
-            # First find the image URL
-            for message in state["messages"]:
-                if hasattr(message, "content") and isinstance(message.content, str):
-                    if "https://" in message.content and (".png" in message.content or ".jpg" in message.content or ".jpeg" in message.content):
-                        # Extract URL from the message
-                        words = message.content.split()
-                        for word in words:
-                            if word.startswith("https://") and (".png" in word or ".jpg" in word or ".jpeg" in word):
-                                image_url = word.strip(",.()[]{}\"'")
-                                break
-                    if image_url:
-                        break
-
-            # Extract minting data from the most recent messages
-            for message in reversed(state["messages"]):
-                if hasattr(message, "additional_kwargs") and "minting_data" in message.additional_kwargs:
-                    minting_data = message.additional_kwargs["minting_data"]
-                    ip_id = minting_data.get("ip_id")
-                    tx_hash = minting_data.get("tx_hash")
-                    break
+            # Get the approved content and the minting result
+            image_url = state.get("content_url")
+            minting_data = state.get("minting") or {}
+            ip_id = minting_data.get("ip_id")
+            tx_hash = minting_data.get("tx_hash")
 
             if ip_id and tx_hash:
+                from tweet_outbox import enqueue_ip_minted_tweet
+
                 try:
-                    print(f"\nPosting to Twitter about minted IP asset (ID: {ip_id})...")
-                    # Post to Twitter
-                    response = await post_ip_minted_tweet(ip_id, tx_hash, image_url)
-                    
-                    if response["success"]:
-                        result = f"Successfully posted to Twitter about the minted IP asset (ID: {ip_id})."
-                        print(f"\n✅ {result}")
+                    # Queue the tweet; the outbox dispatcher posts it
+                    if await enqueue_ip_minted_tweet(ip_id, tx_hash, image_url):
+                        result = f"Queued a tweet about the minted IP asset (ID: {ip_id})."
                     else:
-                        result = f"Failed to post to Twitter: {response.get('error', 'Unknown error')}"
-                        print(f"\n❌ {result}")
+                        result = f"A tweet about the minted IP asset (ID: {ip_id}) was already queued."
+                    print(f"\n✅ {result}")
                 except Exception as e:
                     import traceback
                     print(f"\n--- Exception in PostToTwitter ---")
                     print(traceback.format_exc())
                     print("----------------------------\n")
-                    result = f"Error posting to Twitter: {str(e)}"
+                    result = f"Error queueing tweet: {str(e)}"
                     print(f"\n❌ {result}")
             else:
                 result = "Could not post to Twitter: Missing IP ID or transaction hash."
@@ -1126,11 +1452,24 @@ def create_graph(ipfs_tools):
             elif "File path:" in last_message.content:
                 local_file_path = last_message.content.split("File path: ")[1].strip()
                 
-                # Determine content type from file extension
-                if local_file_path.lower().endswith(('.mp4', '.mov', '.avi', '.webm')):
-                    content_type = "video"
-                else:
-                    content_type = "image"
+                # Determine content type from the file's contents, falling
+                # back to its extension
+                from media_info import media_summary, sniff_content_type
+
+                try:
+                    content_type = await asyncio.to_thread(sniff_content_type, local_file_path)
+                except OSError:
+                    content_type = None
+                if content_type is None:
+                    if local_file_path.lower().endswith(('.mp4', '.mov', '.avi', '.webm')):
+                        content_type = "video"
+                    else:
+                        content_type = "image"
+
+                # Duration, resolution and codecs from the video's headers
+                media_info = await asyncio.to_thread(local_media_info, f"file://{local_file_path}")
+                if media_info:
+                    print(f"Video details: {media_summary(media_info)}")
                 
                 return {
                     "messages": [
@@ -1145,6 +1484,9 @@ def create_graph(ipfs_tools):
                             ],
                         )
                     ],
+                    "content_url": f"file://{local_file_path}",
+                    "content_type": content_type,
+                    "media_info": media_info,
                     "next": "run_ipfs_tool",
                 }
             
@@ -1173,6 +1515,17 @@ def create_graph(ipfs_tools):
                     "next": "call_llm",
                 }
 
+            # Start uploading and generating metadata while the user decides
+            if SPECULATIVE_REVIEW:
+                original_description = ""
+                for message in state["messages"]:
+                    if isinstance(message, HumanMessage) and "Generate" in message.content:
+                        original_description = message.content
+                        break
+                speculate_after_review(
+                    thread_id_from(config), content_url, original_description
+                )
+
             # Present content for human review
             human_review = interrupt(
                 {
@@ -1196,10 +1549,15 @@ def create_graph(ipfs_tools):
                             ],
                         )
                     ],
+                    "content_url": content_url,
+                    "content_type": content_type,
                     "next": "run_ipfs_tool",
                 }
             else:
-                # If rejected, send feedback to LLM to regenerate
+                # If rejected, drop any speculative upload and metadata
+                speculation.discard(thread_id_from(config))
+
+                # Send feedback to LLM to regenerate
                 return {
                     "messages": [
                         HumanMessage(
@@ -1218,9 +1576,22 @@ def create_graph(ipfs_tools):
                     original_prompt = message.content.replace("Generate ", "")
                     break
         
-            print(f"\nUnable to generate image of {original_prompt}")
-            new_prompt = input("Please try a different prompt: ")
-        
+            # Ask for a new prompt through the interaction layer
+            answer = interrupt(
+                {
+                    "failed_prompt": original_prompt,
+                    "message": f"Unable to generate image of {original_prompt}",
+                    "fields": [
+                        {
+                            "name": "prompt",
+                            "label": "Please try a different prompt",
+                            "type": "text",
+                        }
+                    ],
+                }
+            )
+            new_prompt = answer.get("prompt") or original_prompt
+
             return {
                 "messages": [
                     SystemMessage(content="""You are an assistant that helps users create and mint IP assets on Story Protocol.
@@ -1311,50 +1682,130 @@ Use the available tools to accomplish these tasks. When generating images, use t
     # Mint license tokens -> post to Twitter
     workflow.add_edge("mint_license_tokens", "post_to_twitter")
 
+    # Failed generation -> LLM again with the new prompt
+    workflow.add_edge("handle_failed_generation", "call_llm")
+
     # Post to Twitter -> END
     workflow.add_edge("post_to_twitter", END)
 
-    # Add memory to graph compilation
-    memory = MemorySaver()
-
-    # Add memory to graph compilation
-    graph = workflow.compile(checkpointer=memory)
+    # Checkpoints are kept on disk so runs survive a restart
+    graph = workflow.compile(checkpointer=get_checkpointer())
 
-    # Save visualization
-    mermaid_png = graph.get_graph().draw_mermaid_png()
-    with open("workflow_graph.png", "wb") as f:
-        f.write(mermaid_png)
+    # Save visualization (opt-in, see WORKFLOW_GRAPH_FORMAT)
+    save_workflow_graph(graph)
 
     return graph
 
 
-async def run_agent():
-    # Create the MCP client and keep it open for the entire session
-    async with MultiServerMCPClient() as client:
-        # Connect to the server
-        await client.connect_to_server(
-            "story_server",
-            command="python",
-            args=["../story-sdk-mcp/server.py"],
-        )
-        # Get all required tools
-        ipfs_tools = [
-            tool
-            for tool in client.get_tools()
-            if tool.name
-            in [
-                "upload_image_to_ipfs",
-                "create_ip_metadata",
-                "mint_and_register_ip_with_terms",
-                "mint_license_tokens",
-            ]
+# Names of the Story MCP tools the graph needs
+STORY_TOOL_NAMES = [
+    "upload_image_to_ipfs",
+    "create_ip_metadata",
+    "mint_and_register_ip_with_terms",
+    "mint_license_tokens",
+]
+
+# System prompt for each way of creating an asset
+SYSTEM_PROMPTS = {
+    "file": """You are an assistant that helps users create and mint IP assets on Story Protocol.
+Your goal is to guide the user through the process of:
+1. Uploading a local file
+2. Uploading the file to IPFS
+3. Creating metadata for the IP asset
+4. Negotiating terms for the IP asset
+5. Minting and registering the IP asset
+6. Minting license tokens
+7. Posting about the minted IP asset on Twitter
+
+Use the available tools to accomplish these tasks. When uploading files, use the upload_local_file tool.
+""",
+    "image": """You are an assistant that helps users create and mint IP assets on Story Protocol.
+Your goal is to guide the user through the process of:
+1. Generating an image based on their prompt
+2. Uploading the image to IPFS
+3. Creating metadata for the IP asset
+4. Negotiating terms for the IP asset
+5. Minting and registering the IP asset
+6. Minting license tokens
+7. Posting about the minted IP asset on Twitter
+
+Use the available tools to accomplish these tasks. When generating images, use the generate_image tool.
+""",
+    "video": """You are an assistant that helps users create and mint IP assets on Story Protocol.
+Your goal is to guide the user through the process of:
+1. Generating a video based on their prompt
+2. Uploading the video to IPFS
+3. Creating metadata for the IP asset
+4. Negotiating terms for the IP asset
+5. Minting and registering the IP asset
+6. Minting license tokens
+7. Posting about the minted IP asset on Twitter
+
+Use the available tools to accomplish these tasks. When generating videos, use the generate_luma_video tool.
+""",
+}
+
+
+def build_initial_input(kind, value):
+    """Return the graph input that starts a run.
+
+    Args:
+        kind (str): "file" to upload a local file, "image" to generate an
+            image with DALL-E or "video" to generate a video with Luma
+        value (str): The file path or the generation prompt
+
+    Returns:
+        dict: Input for graph.astream
+    """
+    if kind == "file":
+        request = f"Upload this file: {value}"
+    elif kind == "image":
+        request = f"Generate {value}"
+    elif kind == "video":
+        request = f"Generate video: {value}"
+    else:
+        raise ValueError(f"Unknown asset kind: {kind}")
+
+    return {
+        "messages": [
+            SystemMessage(content=SYSTEM_PROMPTS[kind]),
+            HumanMessage(content=request),
         ]
+    }
+
+
+async def connect_story_tools():
+    """Start the shared Story MCP connection and return the tools the graph needs.
+
+    The tools call the server through the process-wide pool, so they stay
+    usable for the life of the process, across sessions and reconnects.
+    """
+    from mcp_pool import get_mcp_pool
+
+    pool = get_mcp_pool()
+    await pool.start()
+    return await pool.get_tools(STORY_TOOL_NAMES)
+
 
-        # Create the graph with the tools
-        graph = create_graph(ipfs_tools)
+async def run_agent():
+    from mcp_pool import get_mcp_pool
+    from tweet_outbox import get_dispatcher
+    from llm_clients import get_llm_clients
+    from llm_cache import get_llm_cache
+    from upload_index import get_upload_index
+
+    # Start the Story MCP server in the background while the user chooses;
+    # it stays up for the whole session
+    story_tools = asyncio.create_task(connect_story_tools())
+    async with get_mcp_pool():
+        # Resume posting anything left in the tweet outbox by earlier runs
+        get_dispatcher()
 
         thread_id = str(uuid.uuid4())
 
+        # All terminal input goes through here, off the event loop
+        console = ConsoleInteraction()
+
         # Prompt the user for what image they want to create
         print("\n=== Story IP Creator ===")
         print(
@@ -1370,7 +1821,7 @@ async def run_agent():
         # Get user choice
         while True:
             try:
-                choice = int(input("\nEnter your choice (1-3): "))
+                choice = int(await console.prompt("\nEnter your choice (1-3): "))
                 if 1 <= choice <= 3:
                     break
                 print("Please enter a number between 1 and 3.")
@@ -1380,29 +1831,13 @@ async def run_agent():
         # Handle user choice
         if choice == 1:
             # Local file upload
-            file_path = input("\nEnter the path to your image or video file: ")
-            initial_input = {
-                "messages": [
-                    SystemMessage(content="""You are an assistant that helps users create and mint IP assets on Story Protocol.
-Your goal is to guide the user through the process of:
-1. Uploading a local file
-2. Uploading the file to IPFS
-3. Creating metadata for the IP asset
-4. Negotiating terms for the IP asset
-5. Minting and registering the IP asset
-6. Minting license tokens
-7. Posting about the minted IP asset on Twitter
-
-Use the available tools to accomplish these tasks. When uploading files, use the upload_local_file tool.
-"""),
-                    HumanMessage(content=f"Upload this file: {file_path}")
-                ]
-            }
+            file_path = await console.prompt("\nEnter the path to your image or video file: ")
+            initial_input = build_initial_input("file", file_path)
             print("\nStarting the upload process...\n")
             
         elif choice == 2:
             # OpenAI image generation
-            image_prompt = input(
+            image_prompt = await console.prompt(
                 "\nWhat image would you like to create? (e.g., 'an anime style image of a person snowboarding'): "
             )
             if not image_prompt:
@@ -1411,28 +1846,12 @@ Use the available tools to accomplish these tasks. When uploading files, use the
                 )
                 print(f"Using default prompt: '{image_prompt}'")
 
-            initial_input = {
-                "messages": [
-                    SystemMessage(content="""You are an assistant that helps users create and mint IP assets on Story Protocol.
-Your goal is to guide the user through the process of:
-1. Generating an image based on their prompt
-2. Uploading the image to IPFS
-3. Creating metadata for the IP asset
-4. Negotiating terms for the IP asset
-5. Minting and registering the IP asset
-6. Minting license tokens
-7. Posting about the minted IP asset on Twitter
-
-Use the available tools to accomplish these tasks. When generating images, use the generate_image tool.
-"""),
-                    HumanMessage(content=f"Generate {image_prompt}")
-                ]
-            }
+            initial_input = build_initial_input("image", image_prompt)
             print("\nStarting the image generation process...\n")
             
         elif choice == 3:
             # Luma video generation
-            video_prompt = input(
+            video_prompt = await console.prompt(
                 "\nWhat video would you like to create? (e.g., 'a short clip of a sunset over mountains'): "
             )
             if not video_prompt:
@@ -1441,261 +1860,41 @@ Use the available tools to accomplish these tasks. When generating images, use t
                 )
                 print(f"Using default prompt: '{video_prompt}'")
 
-            initial_input = {
-                "messages": [
-                    SystemMessage(content="""You are an assistant that helps users create and mint IP assets on Story Protocol.
-Your goal is to guide the user through the process of:
-1. Generating a video based on their prompt
-2. Uploading the video to IPFS
-3. Creating metadata for the IP asset
-4. Negotiating terms for the IP asset
-5. Minting and registering the IP asset
-6. Minting license tokens
-7. Posting about the minted IP asset on Twitter
-
-Use the available tools to accomplish these tasks. When generating videos, use the generate_luma_video tool.
-"""),
-                    HumanMessage(content=f"Generate video: {video_prompt}")
-                ]
-            }
+            initial_input = build_initial_input("video", video_prompt)
             print("\nStarting the video generation process...\n")
 
+        # Create the graph once the Story tools are ready
+        graph = create_graph(await story_tools)
+
         # Add thread_id to the config
         config = {"configurable": {"thread_id": thread_id}}
 
-        # Process all events and handle interrupts at any stage
-        async def process_events(input_data):
-            async for event in graph.astream(input_data, config, stream_mode="updates"):
-                # Only process interrupts
-                if "__interrupt__" in event:
-                    interrupt_data = event["__interrupt__"][0].value
-
-                    # Check which type of interrupt we're dealing with
-                    if "image_url" in interrupt_data:
-                        # This is the image review interrupt
-                        # Display the image URL once so the user can see what was generated
-                        print(f"\nGenerated image: {interrupt_data['image_url']}\n")
-
-                        user_input = input(
-                            "Do you like this image? (yes/no + feedback): "
-                        )
+        # Run until the workflow finishes, asking in the terminal at each interrupt
+        await drive(graph, initial_input, config, console)
 
-                        if user_input.lower().startswith("yes"):
-                            # Continue to IPFS upload
-                            print("Uploading image to IPFS...")
-                            await process_events(Command(resume={"action": "continue"}))
-                        else:
-                            # Get feedback after "no"
-                            feedback = (
-                                user_input[4:]
-                                if len(user_input) > 4
-                                else "Please generate a different image"
-                            )
-                            print("Generating a new image...")
-                            await process_events(
-                                Command(resume={"action": "feedback", "data": feedback})
-                            )
-
-                    elif "fields" in interrupt_data:
-                        # Check if this is the terms negotiation interrupt
-                        if "commercial_rev_share" in [
-                            field["name"] for field in interrupt_data.get("fields", [])
-                        ]:
-                            # This is the initial terms negotiation interrupt
-                            print("\n" + interrupt_data.get("explanation", ""))
-
-                            # Get commercial revenue share
-                            while True:
-                                try:
-                                    rev_share = int(
-                                        input(
-                                            "Enter Commercial Revenue Share (0-100%, default: 15%): "
-                                        )
-                                        or "15"
-                                    )
-                                    if 0 <= rev_share <= 100:
-                                        break
-                                    print("Please enter a value between 0 and 100.")
-                                except ValueError:
-                                    print("Please enter a valid number.")
-
-                            # Get derivatives allowed
-                            while True:
-                                deriv_input = (
-                                    input(
-                                        "Allow Derivative Works? (yes/no, default: yes): "
-                                    ).lower()
-                                    or "yes"
-                                )
-                                if deriv_input in ["yes", "no", "y", "n"]:
-                                    derivatives_allowed = deriv_input.startswith("y")
-                                    break
-                                print("Please enter yes or no.")
-
-                            # Resume with the user's choices
-                            await process_events(
-                                Command(
-                                    resume={
-                                        "commercial_rev_share": rev_share,
-                                        "derivatives_allowed": derivatives_allowed,
-                                    }
-                                )
-                            )
-
-                        # Check if this is the feedback on terms interrupt
-                        elif "adjust_terms" in [
-                            field["name"] for field in interrupt_data.get("fields", [])
-                        ]:
-                            # This is the feedback on terms interrupt
-                            print("\n" + interrupt_data.get("explanation", ""))
-
-                            # Ask if user wants to adjust terms
-                            while True:
-                                adjust_input = input(
-                                    "Would you like to adjust your terms based on this feedback? (yes/no, default: yes): "
-                                ).lower() or ("yes" if interrupt_data.get("default", True) else "no")
-                                if adjust_input in [
-                                    "yes",
-                                    "no",
-                                    "y",
-                                    "n",
-                                    "",
-                                ]:  # Empty string for default
-                                    adjust_terms = not (
-                                        adjust_input.startswith("n")
-                                    )  # Default to yes
-                                    break
-                                print("Please enter yes or no.")
-
-                            # Resume with the user's choice
-                            await process_events(
-                                Command(resume={"adjust_terms": adjust_terms})
-                            )
-
-                        # Check if this is the term adjustment interrupt
-                        elif (
-                            len(interrupt_data.get("fields", [])) == 2
-                            and "commercial_rev_share"
-                            in [
-                                field["name"]
-                                for field in interrupt_data.get("fields", [])
-                            ]
-                            and "derivatives_allowed"
-                            in [
-                                field["name"]
-                                for field in interrupt_data.get("fields", [])
-                            ]
-                        ):
-                            # This is the term adjustment interrupt
-                            print("\n" + interrupt_data.get("explanation", ""))
-
-                            # Get commercial revenue share
-                            while True:
-                                try:
-                                    rev_share = int(
-                                        input(
-                                            f"Enter Commercial Revenue Share (0-100%, default: {interrupt_data['fields'][0].get('default', 15)}%): "
-                                        )
-                                        or str(
-                                            interrupt_data["fields"][0].get(
-                                                "default", 15
-                                            )
-                                        )
-                                    )
-                                    if 0 <= rev_share <= 100:
-                                        break
-                                    print("Please enter a value between 0 and 100.")
-                                except ValueError:
-                                    print("Please enter a valid number.")
-
-                            # Get derivatives allowed
-                            while True:
-                                default_deriv = (
-                                    "yes"
-                                    if interrupt_data["fields"][1].get("default", True)
-                                    else "no"
-                                )
-                                deriv_input = (
-                                    input(
-                                        f"Allow Derivative Works? (yes/no, default: {default_deriv}): "
-                                    ).lower()
-                                    or default_deriv
-                                )
-                                if deriv_input in ["yes", "no", "y", "n"]:
-                                    derivatives_allowed = deriv_input.startswith("y")
-                                    break
-                                print("Please enter yes or no.")
-
-                            # Resume with the user's choices
-                            await process_events(
-                                Command(
-                                    resume={
-                                        "commercial_rev_share": rev_share,
-                                        "derivatives_allowed": derivatives_allowed,
-                                    }
-                                )
-                            )
+        # The run is finished, so only its final checkpoint needs keeping
+        if not (await graph.aget_state(config)).next:
+            await get_checkpointer().aprune_thread(thread_id)
 
-                        else:
-                            # Generic fields handler
-                            print("Please provide the requested information:")
-                            responses = {}
-
-                            for field in interrupt_data.get("fields", []):
-                                field_name = field.get("name", "")
-                                field_type = field.get("type", "text")
-                                field_default = field.get("default", "")
-                                field_label = field.get("label", field_name)
-
-                                if field_type == "boolean":
-                                    while True:
-                                        value_input = input(
-                                            f"{field_label}? (yes/no, default: {'yes' if field_default else 'no'}): "
-                                        ).lower() or ("yes" if field_default else "no")
-                                        if value_input in ["yes", "no", "y", "n"]:
-                                            responses[field_name] = (
-                                                value_input.startswith("y")
-                                            )
-                                            break
-                                        print("Please enter yes or no.")
-
-                                elif field_type == "slider":
-                                    min_val = field.get("min", 0)
-                                    max_val = field.get("max", 100)
-                                    while True:
-                                        try:
-                                            value_input = input(
-                                                f"{field_label} ({min_val}-{max_val}, default: {field_default}): "
-                                            ) or str(field_default)
-                                            value = int(value_input)
-                                            if min_val <= value <= max_val:
-                                                responses[field_name] = value
-                                                break
-                                            print(
-                                                f"Please enter a value between {min_val} and {max_val}."
-                                            )
-                                        except ValueError:
-                                            print("Please enter a valid number.")
-
-                                else:  # text or other types
-                                    value_input = input(
-                                        f"{field_label} (default: {field_default}): "
-                                    ) or str(field_default)
-                                    responses[field_name] = value_input
-
-                            # Resume with all responses
-                            await process_events(Command(resume=responses))
+        # Give queued tweets a chance to go out before we exit; anything
+        # left stays in the outbox and is posted on the next run
+        await get_dispatcher().flush(timeout=60)
 
-                    else:
-                        # Generic interrupt handler for any other interrupts
-                        user_input = input("Enter your response: ")
-                        await process_events(Command(resume={"data": user_input}))
+        # Close the pooled OpenAI connections
+        await get_llm_clients().aclose()
 
-                # For non-interrupt events, we don't need to print anything
-                # This keeps the output clean and focused on user interactions
+        if (upload_index := get_upload_index()) is not None:
+            stats = upload_index.stats()
+            if stats["hits"]:
+                print(f"\nUpload index: {stats['hits']} of {stats['hits'] + stats['misses']} uploads reused")
 
-        # Start the initial processing
-        await process_events(initial_input)
+        if llm_cache := get_llm_cache():
+            stats = llm_cache.stats()
+            if stats["hits"] + stats["misses"]:
+                print(
+                    f"\nLLM cache: {stats['hits']} hits, {stats['misses']} misses "
+                    f"({stats['hit_rate']:.0%} hit rate)"
+                )
 
         print("\n=== Process Complete ===")
         print(
@@ -1705,6 +1904,4 @@ Use the available tools to accomplish these tasks. When generating videos, use t
 
 
 if __name__ == "__main__":
-    import asyncio
-
     asyncio.run(run_agent())
\ No newline at end of file
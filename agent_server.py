@@ -0,0 +1,362 @@
+#!/usr/bin/env python3
+"""
+Serve the agent over HTTP.
+
+The graph is compiled once at startup and every run shares it, along with
+one MCP connection, the checkpointer and the pooled OpenAI clients. Each run
+is a graph thread. It runs in the background until it finishes or reaches an
+interrupt, and its update events can be streamed as Server-Sent Events.
+
+Endpoints:
+    POST /runs                 Start a run. Body: {"image": prompt},
+                               {"video": prompt} or {"file": path}.
+                               Returns {"thread_id": ...}
+    GET  /runs/{id}            Status of a run: running, interrupted, done,
+                               failed or resumable, the pending interrupt and
+                               the results
+    GET  /runs/{id}/events     SSE stream of the run's update events, and
+                               upload_progress events for local files. Ends
+                               when the run stops at an interrupt or finishes.
+                               Sends the buffered events again on reconnect,
+                               skipping those up to the Last-Event-ID header
+    POST /runs/{id}/resume     Answer the pending interrupt. Body:
+                               {"resume": value}, passed to Command(resume=...).
+                               A resumable run continues from its last
+                               checkpoint and the value is ignored
+
+Runs are checkpointed, so a run that was waiting on an interrupt when the
+server stopped can be resumed after a restart. A run that was still advancing
+is reported as resumable, and continues from its last completed step.
+
+A run that has stopped is kept in memory, with its events, for
+AGENT_SERVER_RUN_TTL seconds. After that it is reloaded from its checkpoint
+when asked for, without the events. A failed run then shows as resumable.
+
+Example:
+    python agent_server.py --port 8000
+    curl -X POST localhost:8000/runs -d '{"image": "an anime cat"}'
+    curl -N localhost:8000/runs/<thread_id>/events
+    curl -X POST localhost:8000/runs/<thread_id>/resume -d '{"resume": {"action": "continue"}}'
+"""
+
+import os
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import contextlib
+import dataclasses
+
+import uvicorn
+from langgraph.types import Command
+from loguru import logger
+from sse_starlette.sse import EventSourceResponse
+from starlette.applications import Starlette
+from starlette.responses import JSONResponse
+from starlette.routing import Route
+
+from agent import build_initial_input, connect_story_tools, create_graph
+
+ASSET_KINDS = ("image", "video", "file")
+
+# Most runs advancing through the graph at once; others wait their turn
+DEFAULT_MAX_ACTIVE_RUNS = int(os.getenv("AGENT_SERVER_MAX_ACTIVE_RUNS", "8"))
+
+# Seconds a stopped run and its events stay in memory
+DEFAULT_RUN_TTL = float(os.getenv("AGENT_SERVER_RUN_TTL", "600"))
+
+
+def to_jsonable(value):
+    """JSON fallback for messages, interrupts and other graph values."""
+    if hasattr(value, "model_dump"):
+        return value.model_dump(exclude_none=True)
+    if dataclasses.is_dataclass(value):
+        return dataclasses.asdict(value)
+    return str(value)
+
+
+def run_results(values):
+    """The parts of a run's state a client cares about."""
+    minting = values.get("minting") or {}
+    return {
+        "content_url": values.get("content_url"),
+        "content_type": values.get("content_type"),
+        "ipfs_uri": values.get("ipfs_uri"),
+        "terms": values.get("terms"),
+        "ip_id": minting.get("ip_id"),
+        "tx_hash": minting.get("tx_hash"),
+        "license_token_ids": (values.get("license") or {}).get("license_token_ids"),
+    }
+
+
+class Run:
+    """One graph thread and the events it has produced since it last started."""
+
+    def __init__(self, thread_id):
+        self.thread_id = thread_id
+        self.status = "running"
+        self.interrupt = None
+        self.error = None
+        self.events = []
+        self.task = None
+        self.stopped_at = None
+        self._changed = asyncio.Condition()
+
+    async def add_event(self, event):
+        async with self._changed:
+            self.events.append(event)
+            self._changed.notify_all()
+
+    async def finish(self, status, interrupt=None, error=None):
+        async with self._changed:
+            self.status = status
+            self.interrupt = interrupt
+            self.error = error
+            self.stopped_at = time.monotonic()
+            self._changed.notify_all()
+
+    async def stream(self, after=-1):
+        """Yield (index, event) for every event after `after`, then new ones until the run stops."""
+        index = after + 1
+        while True:
+            async with self._changed:
+                await self._changed.wait_for(
+                    lambda: index < len(self.events) or self.status != "running"
+                )
+                pending = self.events[index:]
+                running = self.status == "running"
+            for event in pending:
+                yield index, event
+                index += 1
+            if not running and index >= len(self.events):
+                return
+
+
+class AgentService:
+    """Runs graph threads in the background on one shared graph."""
+
+    def __init__(self, graph, max_active_runs=DEFAULT_MAX_ACTIVE_RUNS, run_ttl=DEFAULT_RUN_TTL):
+        """Initialize the service.
+
+        Args:
+            graph: The compiled graph shared by all runs
+            max_active_runs (int): Most runs advancing at once
+            run_ttl (float): Seconds a stopped run stays in memory
+        """
+        self.graph = graph
+        self.runs = {}
+        self.run_ttl = run_ttl
+        self._active = asyncio.Semaphore(max_active_runs)
+
+    def expire(self):
+        """Forget runs that stopped more than run_ttl seconds ago.
+
+        Their state stays in the checkpointer, so get() can load them again.
+        """
+        cutoff = time.monotonic() - self.run_ttl
+        for thread_id in [
+            thread_id for thread_id, run in self.runs.items()
+            if run.stopped_at is not None and run.stopped_at < cutoff
+            and (run.task is None or run.task.done())
+        ]:
+            del self.runs[thread_id]
+
+    def start(self, thread_id, graph_input):
+        """Advance a thread in the background until it stops, and return its Run.
+
+        Raises:
+            RuntimeError: If the thread is still advancing from an earlier start
+        """
+        self.expire()
+        current = self.runs.get(thread_id)
+        if current is not None and current.task is not None and not current.task.done():
+            raise RuntimeError(f"Run {thread_id} is already running")
+        run = Run(thread_id)
+        self.runs[thread_id] = run
+        run.task = asyncio.create_task(self._advance(run, graph_input))
+        return run
+
+    async def _advance(self, run, graph_input):
+        from checkpointer import get_checkpointer
+        from speculation import get_speculation
+
+        config = {"configurable": {"thread_id": run.thread_id}}
+        interrupt = None
+        try:
+            async with self._active:
+                async for mode, event in self.graph.astream(
+                    graph_input, config, stream_mode=["updates", "custom"]
+                ):
+                    if mode == "updates" and "__interrupt__" in event:
+                        interrupt = event["__interrupt__"][0].value
+                    await run.add_event(event)
+        except Exception as e:
+            logger.exception(f"Run {run.thread_id} failed")
+            await run.finish("failed", error=f"{type(e).__name__}: {e}")
+            return
+        finally:
+            # Speculative work is only kept for a run waiting on a review
+            if interrupt is None or run.status == "failed":
+                get_speculation().discard(run.thread_id)
+
+        if interrupt is not None:
+            await run.finish("interrupted", interrupt=interrupt)
+        else:
+            await get_checkpointer().aprune_thread(run.thread_id)
+            await run.finish("done")
+
+    async def get(self, thread_id):
+        """Return the Run for a thread, loading it from its checkpoint if needed.
+
+        Returns:
+            Run or None: None if the thread has never been checkpointed
+        """
+        self.expire()
+        run = self.runs.get(thread_id)
+        if run is not None:
+            return run
+
+        state = await self.graph.aget_state({"configurable": {"thread_id": thread_id}})
+        if not state.values:
+            return None
+        run = Run(thread_id)
+        interrupts = [i for task in state.tasks for i in task.interrupts]
+        if interrupts:
+            run.status, run.interrupt = "interrupted", interrupts[0].value
+        else:
+            # Steps left but nothing advancing them: the server stopped mid-run
+            run.status = "done" if not state.next else "resumable"
+        run.stopped_at = time.monotonic()
+        # Another request may have loaded (and resumed) it while we waited
+        return self.runs.setdefault(thread_id, run)
+
+    async def describe(self, run):
+        """Return the status and results of a run as a JSON-ready dict."""
+        state = await self.graph.aget_state({"configurable": {"thread_id": run.thread_id}})
+        return {
+            "thread_id": run.thread_id,
+            "status": run.status,
+            "interrupt": run.interrupt,
+            "error": run.error,
+            "next": list(state.next),
+            "results": run_results(state.values),
+        }
+
+
+def json_response(content, status_code=200):
+    return JSONResponse(json.loads(json.dumps(content, default=to_jsonable)), status_code=status_code)
+
+
+async def read_json(request):
+    try:
+        body = await request.json()
+    except ValueError:
+        return None
+    return body if isinstance(body, dict) else None
+
+
+async def start_run(request):
+    body = await read_json(request)
+    kinds = [kind for kind in ASSET_KINDS if kind in (body or {})]
+    if len(kinds) != 1:
+        return json_response({"error": f"Give exactly one of {', '.join(ASSET_KINDS)}"}, 400)
+
+    thread_id = str(uuid.uuid4())
+    service = request.app.state.service
+    service.start(thread_id, build_initial_input(kinds[0], body[kinds[0]]))
+    return json_response({"thread_id": thread_id}, 202)
+
+
+async def get_run(request):
+    service = request.app.state.service
+    run = await service.get(request.path_params["thread_id"])
+    if run is None:
+        return json_response({"error": "Unknown run"}, 404)
+    return json_response(await service.describe(run))
+
+
+async def stream_events(request):
+    run = await request.app.state.service.get(request.path_params["thread_id"])
+    if run is None:
+        return json_response({"error": "Unknown run"}, 404)
+
+    try:
+        after = int(request.headers.get("last-event-id", "-1"))
+    except ValueError:
+        after = -1
+
+    async def events():
+        async for index, event in run.stream(after):
+            for node, update in event.items():
+                yield {"id": str(index), "event": node, "data": json.dumps(update, default=to_jsonable)}
+        final = {"status": run.status, "interrupt": run.interrupt, "error": run.error}
+        yield {"event": "end", "data": json.dumps(final, default=to_jsonable)}
+
+    return EventSourceResponse(events())
+
+
+async def resume_run(request):
+    body = await read_json(request)
+    if body is None or "resume" not in body:
+        return json_response({"error": 'Body must be {"resume": value}'}, 400)
+
+    service = request.app.state.service
+    thread_id = request.path_params["thread_id"]
+    run = await service.get(thread_id)
+    if run is None:
+        return json_response({"error": "Unknown run"}, 404)
+    # No await between the check and start(), so two answers to the same
+    # interrupt cannot both get through: the second one sees a running run
+    if run.status == "resumable":
+        service.start(thread_id, None)
+    elif run.status == "interrupted":
+        service.start(thread_id, Command(resume=body["resume"]))
+    else:
+        return json_response({"error": f"Run is {run.status}, not waiting for an answer"}, 409)
+    return json_response({"thread_id": thread_id}, 202)
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app):
+    from mcp_pool import get_mcp_pool
+    from tweet_outbox import get_dispatcher
+    from llm_clients import get_llm_clients
+
+    # One MCP connection pool and one compiled graph for every run
+    async with get_mcp_pool():
+        app.state.service = AgentService(create_graph(await connect_story_tools()))
+        get_dispatcher()
+        try:
+            yield
+        finally:
+            running = [run.task for run in app.state.service.runs.values() if run.task and not run.task.done()]
+            for task in running:
+                task.cancel()
+            await asyncio.gather(*running, return_exceptions=True)
+            await get_dispatcher().flush(timeout=60)
+            await get_llm_clients().aclose()
+
+
+app = Starlette(
+    routes=[
+        Route("/runs", start_run, methods=["POST"]),
+        Route("/runs/{thread_id}", get_run, methods=["GET"]),
+        Route("/runs/{thread_id}/events", stream_events, methods=["GET"]),
+        Route("/runs/{thread_id}/resume", resume_run, methods=["POST"]),
+    ],
+    lifespan=lifespan,
+)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8000, help="port to listen on")
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,204 @@
+#!/usr/bin/env python3
+"""
+Create and mint many IP assets without prompting.
+
+Reads a JSONL manifest with one asset per line and runs each one as its own
+graph thread. All threads share one compiled graph and one MCP connection,
+and at most --concurrency run at a time. Review decisions and terms come from
+the manifest instead of the keyboard.
+
+Manifest line fields:
+    id                 Name for the item in the results (default: line number)
+    image | video | file
+                       Image prompt, video prompt or local file path (exactly one)
+    reviews            Answers to the content reviews, in order: "approve",
+                       or feedback text to ask for another attempt
+                       (default: approve)
+    commercial_rev_share, derivatives_allowed
+                       License terms (default: 15, true)
+    adjust_terms       Answer when the agent questions the terms (default: false)
+
+Example manifest line:
+    {"id": "cat", "image": "an anime cat", "reviews": ["make it blue", "approve"], "commercial_rev_share": 10}
+
+Each finished item is written to stdout as one JSON line; progress and
+agent output go to stderr, followed by a summary.
+
+Example:
+    python batch_runner.py manifest.jsonl --concurrency 4 > results.jsonl
+"""
+
+import sys
+import json
+import time
+import uuid
+import asyncio
+import argparse
+import contextlib
+
+from agent import build_initial_input, connect_story_tools, create_graph
+from interaction import InteractionAdapter, drive, field_names
+
+ASSET_KINDS = ("image", "video", "file")
+DEFAULT_TERMS = {"commercial_rev_share": 15, "derivatives_allowed": True}
+
+
+def read_manifest(path):
+    """Return the manifest items, checking each names exactly one asset."""
+    items = []
+    with open(path) as f:
+        for line_number, line in enumerate(f, 1):
+            if not line.strip():
+                continue
+            item = json.loads(line)
+            kinds = [kind for kind in ASSET_KINDS if kind in item]
+            if len(kinds) != 1:
+                raise ValueError(f"Line {line_number}: give exactly one of {', '.join(ASSET_KINDS)}")
+            item.setdefault("id", str(line_number))
+            item["kind"] = kinds[0]
+            items.append(item)
+    return items
+
+
+def answer_interrupt(interrupt_data, item, reviews):
+    """Return the resume value for an interrupt, taken from the manifest item.
+
+    Args:
+        interrupt_data (dict): The interrupt payload
+        item (dict): The manifest item being run
+        reviews (list): Remaining review answers for the item (consumed)
+
+    Returns:
+        dict: Value for Command(resume=...)
+
+    Raises:
+        RuntimeError: If content generation failed, since there is no one to
+            ask for a new prompt
+    """
+    if "failed_prompt" in interrupt_data:
+        raise RuntimeError(interrupt_data["message"])
+
+    if "image_url" in interrupt_data or "video_url" in interrupt_data:
+        review = reviews.pop(0) if reviews else "approve"
+        if review.lower() in ("approve", "yes"):
+            return {"action": "continue"}
+        return {"action": "feedback", "data": review}
+
+    names = field_names(interrupt_data)
+    if "commercial_rev_share" in names:
+        return {
+            "commercial_rev_share": item.get("commercial_rev_share", DEFAULT_TERMS["commercial_rev_share"]),
+            "derivatives_allowed": item.get("derivatives_allowed", DEFAULT_TERMS["derivatives_allowed"]),
+        }
+    if "adjust_terms" in names:
+        return {"adjust_terms": item.get("adjust_terms", False)}
+    if names:
+        return {field["name"]: field.get("default") for field in interrupt_data["fields"]}
+    return {"data": ""}
+
+
+class ManifestInteraction(InteractionAdapter):
+    """Answers a run's interrupts from its manifest item."""
+
+    def __init__(self, item):
+        self.item = item
+        self.reviews = list(item.get("reviews", []))
+
+    async def ask(self, thread_id, interrupt_data):
+        return answer_interrupt(interrupt_data, self.item, self.reviews)
+
+
+async def run_item(graph, item):
+    """Run one manifest item to completion and return its result."""
+    thread_id = f"batch-{item['id']}-{uuid.uuid4().hex[:8]}"
+    config = {"configurable": {"thread_id": thread_id}}
+    start = time.perf_counter()
+
+    result = {"id": item["id"], "thread_id": thread_id}
+    try:
+        graph_input = build_initial_input(item["kind"], item[item["kind"]])
+        await drive(graph, graph_input, config, ManifestInteraction(item))
+
+        values = (await graph.aget_state(config)).values
+        minting = values.get("minting") or {}
+        result.update({
+            "status": "minted" if minting.get("ip_id") else "failed",
+            "ip_id": minting.get("ip_id"),
+            "tx_hash": minting.get("tx_hash"),
+            "ipfs_uri": values.get("ipfs_uri"),
+            "license_token_ids": (values.get("license") or {}).get("license_token_ids"),
+        })
+        if not minting.get("ip_id"):
+            result["error"] = values["messages"][-1].content if values.get("messages") else "No IP was minted"
+    except Exception as e:
+        result.update({"status": "failed", "error": f"{type(e).__name__}: {e}"})
+
+    result["seconds"] = round(time.perf_counter() - start, 3)
+    return result
+
+
+async def run_batch(items, concurrency, out):
+    """Run items with at most `concurrency` at once, writing each result to out.
+
+    Returns:
+        tuple: (results in completion order, seconds spent running the items)
+    """
+    from mcp_pool import get_mcp_pool
+    from checkpointer import get_checkpointer
+    from speculation import get_speculation
+    from tweet_outbox import get_dispatcher
+    from llm_clients import get_llm_clients
+
+    semaphore = asyncio.Semaphore(concurrency)
+    results = []
+
+    async with get_mcp_pool():
+        graph = create_graph(await connect_story_tools())
+        get_dispatcher()
+
+        async def run_one(item):
+            async with semaphore:
+                result = await run_item(graph, item)
+            get_speculation().discard(result["thread_id"])
+            await get_checkpointer().aprune_thread(result["thread_id"])
+            results.append(result)
+            out.write(json.dumps(result) + "\n")
+            out.flush()
+            print(f"[{len(results)}/{len(items)}] {item['id']}: {result['status']}", file=sys.stderr)
+
+        start = time.perf_counter()
+        await asyncio.gather(*(run_one(item) for item in items))
+        elapsed = time.perf_counter() - start
+
+        # Queued tweets are not counted in the run time
+        await get_dispatcher().flush(timeout=60)
+        await get_llm_clients().aclose()
+    return results, elapsed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("manifest", help="JSONL manifest of assets to create")
+    parser.add_argument("--concurrency", type=int, default=4, help="items to run at once")
+    args = parser.parse_args()
+
+    items = read_manifest(args.manifest)
+    out = sys.stdout
+
+    # Agent nodes print progress; keep stdout for results only
+    with contextlib.redirect_stdout(sys.stderr):
+        results, elapsed = asyncio.run(run_batch(items, args.concurrency, out))
+
+    failed = sum(1 for result in results if result["status"] != "minted")
+    print("\n=== Batch Summary ===", file=sys.stderr)
+    print(f"items: {len(results)}, minted: {len(results) - failed}, failed: {failed}", file=sys.stderr)
+    print(
+        f"elapsed: {elapsed:.1f}s, throughput: {len(results) / elapsed * 60:.1f} items/min "
+        f"(concurrency {args.concurrency})",
+        file=sys.stderr,
+    )
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
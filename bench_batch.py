@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Benchmark batch_runner.py throughput at several concurrency levels.
+
+Each level runs the same manifest of image items in a fresh process,
+against fake_story_mcp_server.py, fake_models.py and fake_twitter_scraper.js,
+and reports the time to run every item and the throughput. Checkpoints,
+caches, the mint ledger and the tweet outbox go to a temporary directory
+per level, so no credentials, network or wallet are needed.
+
+Example:
+    python bench_batch.py --items 13 --concurrency 1 4 8 --tool-ms 200
+"""
+
+import os
+import sys
+import json
+import asyncio
+import argparse
+import tempfile
+import functools
+import contextlib
+import subprocess
+
+from bench_startup import FAKE_MCP_SERVER, HERE, bench_env
+
+FAKE_SCRAPER = os.path.join(HERE, "fake_twitter_scraper.js")
+
+
+def write_manifest(path, items):
+    """Write a manifest of distinct image items, the first with one round of feedback."""
+    with open(path, "w") as f:
+        for index in range(items):
+            item = {"id": f"item{index}", "image": f"benchmark asset {index}"}
+            if index == 0:
+                item["reviews"] = ["make it brighter", "approve"]
+            f.write(json.dumps(item) + "\n")
+
+
+def use_fake_story_server(tool_ms):
+    """Make get_mcp_pool start fake_story_mcp_server.py with tool_ms latency per call.
+
+    Servers started over stdio don't inherit FAKE_STORY_TOOL_MS, so the
+    latency is passed as an argument.
+    """
+    import mcp_pool
+
+    mcp_pool._mcp_pool = mcp_pool.MCPPool(connection_factory=functools.partial(
+        mcp_pool.MCPConnection, args=[FAKE_MCP_SERVER, "--tool-ms", str(tool_ms)]
+    ))
+
+
+def run_level(items, concurrency, tool_ms, model_ms):
+    """Run the batch in a fresh process and return its {"elapsed", "minted"} summary."""
+    with tempfile.TemporaryDirectory(prefix="bench_batch_") as workdir:
+        env = bench_env(workdir)
+        env.update({
+            "FAKE_MODEL_MS": str(model_ms),
+            "TWITTER_SCRAPER_MODULE": FAKE_SCRAPER,
+            # Queued tweets are flushed after the timing; don't wait on the rate limit
+            "TWITTER_TWEETS_PER_WINDOW": "1000",
+            "TWITTER_RATE_WINDOW": "1",
+        })
+        manifest = os.path.join(workdir, "manifest.jsonl")
+        write_manifest(manifest, items)
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker", manifest,
+             "--concurrency", str(concurrency), "--tool-ms", str(tool_ms)],
+            cwd=HERE, env=env, capture_output=True, check=True,
+        ).stdout
+    return json.loads(output.decode().strip().splitlines()[-1])
+
+
+def worker(manifest, concurrency, tool_ms):
+    """Run one batch with fake models and print its summary as JSON."""
+    import fake_models
+    from batch_runner import read_manifest, run_batch
+
+    fake_models.install()
+    use_fake_story_server(tool_ms)
+    items = read_manifest(manifest)
+    with open(os.devnull, "w") as out, contextlib.redirect_stdout(sys.stderr):
+        results, elapsed = asyncio.run(run_batch(items, concurrency, out))
+    minted = sum(1 for result in results if result["status"] == "minted")
+    print(json.dumps({"elapsed": elapsed, "minted": minted}))
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--items", type=int, default=13, help="items in the manifest")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 8], help="levels to run")
+    parser.add_argument("--tool-ms", type=float, default=200, help="latency of every Story MCP tool call")
+    parser.add_argument("--model-ms", type=float, default=0, help="latency of every model call")
+    parser.add_argument("--worker", metavar="MANIFEST", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        worker(args.worker, args.concurrency[0], args.tool_ms)
+        return 0
+
+    print("=== Batch Runner Benchmark ===")
+    print(f"{args.items} items, {args.tool_ms:.0f}ms per tool call, {args.model_ms:.0f}ms per model call\n")
+    print(f"{'concurrency':>11} {'seconds':>8} {'items/min':>10} {'minted':>7}")
+    failed = False
+    for concurrency in args.concurrency:
+        summary = run_level(args.items, concurrency, args.tool_ms, args.model_ms)
+        print(
+            f"{concurrency:>11} {summary['elapsed']:>8.1f} "
+            f"{args.items / summary['elapsed'] * 60:>10.1f} {summary['minted']:>7}"
+        )
+        failed = failed or summary["minted"] != args.items
+
+    if failed:
+        print("\n❌ Some items were not minted")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""
+Benchmark the wait between approving content and the terms prompt.
+
+Runs an image through the graph with SPECULATIVE_REVIEW off and on, against
+fake_story_mcp_server.py and fake_models.py. The reviewer takes
+--think-seconds to approve, and the time from the approval until the terms
+question is measured. With speculation the upload and metadata steps run
+while the reviewer thinks, so little is left to do after the approval.
+Each run uses a fresh process and a temporary directory, so no credentials,
+network or wallet are needed.
+
+Example:
+    python bench_review.py --runs 3 --tool-ms 300 --think-seconds 1
+"""
+
+import os
+import sys
+import json
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+import contextlib
+import subprocess
+
+from bench_batch import use_fake_story_server
+from bench_startup import HERE, bench_env
+
+
+def run_once(speculative, tool_ms, think_seconds):
+    """Run one review in a fresh process and return seconds from approval to the terms prompt."""
+    with tempfile.TemporaryDirectory(prefix="bench_review_") as workdir:
+        env = bench_env(workdir)
+        env["SPECULATIVE_REVIEW"] = "1" if speculative else "0"
+        output = subprocess.run(
+            [sys.executable, os.path.abspath(__file__), "--worker",
+             "--tool-ms", str(tool_ms), "--think-seconds", str(think_seconds)],
+            cwd=HERE, env=env, capture_output=True, check=True,
+        ).stdout
+    return json.loads(output.decode().strip().splitlines()[-1])["seconds"]
+
+
+async def time_review(tool_ms, think_seconds):
+    """Approve the first content review after think_seconds and time the way to the terms prompt."""
+    from langgraph.types import Command
+
+    import fake_models
+    from agent import build_initial_input, connect_story_tools, create_graph
+    from mcp_pool import get_mcp_pool
+
+    fake_models.install()
+    use_fake_story_server(tool_ms)
+    async with get_mcp_pool():
+        graph = create_graph(await connect_story_tools())
+        config = {"configurable": {"thread_id": "bench-review"}}
+        graph_input = build_initial_input("image", "an anime cat")
+        approved_at = None
+        while True:
+            interrupt = None
+            async for event in graph.astream(graph_input, config, stream_mode="updates"):
+                if "__interrupt__" in event:
+                    interrupt = event["__interrupt__"][0].value
+            if interrupt is None:
+                raise RuntimeError("The run finished without asking for terms")
+            if approved_at is not None:
+                return time.perf_counter() - approved_at
+            if "image_url" not in interrupt:
+                raise RuntimeError(f"Expected a content review, got {interrupt}")
+            await asyncio.sleep(think_seconds)
+            approved_at = time.perf_counter()
+            graph_input = Command(resume={"action": "continue"})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=3, help="fresh processes per mode")
+    parser.add_argument("--tool-ms", type=float, default=300, help="latency of every Story MCP tool call")
+    parser.add_argument("--think-seconds", type=float, default=1.0, help="time the reviewer takes to approve")
+    parser.add_argument("--worker", action="store_true", help=argparse.SUPPRESS)
+    args = parser.parse_args()
+
+    if args.worker:
+        with contextlib.redirect_stdout(sys.stderr):
+            seconds = asyncio.run(time_review(args.tool_ms, args.think_seconds))
+        print(json.dumps({"seconds": seconds}))
+        return 0
+
+    print("=== Review Speculation Benchmark ===")
+    print(f"{args.tool_ms:.0f}ms per tool call, reviewer approves after {args.think_seconds:.1f}s\n")
+    print(f"{'speculation':>11} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    for speculative in (False, True):
+        values_ms = [run_once(speculative, args.tool_ms, args.think_seconds) * 1000 for _ in range(args.runs)]
+        print(
+            f"{'on' if speculative else 'off':>11} {statistics.median(values_ms):>10.0f} "
+            f"{min(values_ms):>8.0f} {max(values_ms):>8.0f}"
+        )
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
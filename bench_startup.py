@@ -0,0 +1,130 @@
+#!/usr/bin/env python3
+"""
+Benchmark agent.py cold start.
+
+Each run starts a fresh Python process and measures:
+  - import: time to `import agent`
+  - first prompt: time from launching `python agent.py` until it asks for
+    the asset creation choice. This covers the imports, the MCP server
+    connection and graph compilation.
+
+The agent talks to fake_story_mcp_server.py rather than the real Story MCP
+server. Checkpoints, caches and the tweet outbox go to a temporary
+directory, so no credentials, network or wallet are needed.
+
+Example:
+    python bench_startup.py --runs 5 --max-import-ms 2000 --max-first-prompt-ms 5000
+"""
+
+import os
+import sys
+import time
+import argparse
+import tempfile
+import statistics
+import subprocess
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+FAKE_MCP_SERVER = os.path.join(HERE, "fake_story_mcp_server.py")
+FIRST_PROMPT = b"Enter your choice"
+
+
+def bench_env(workdir):
+    """Environment for a benchmark run, isolated from local state."""
+    env = dict(os.environ)
+    env.update({
+        "STORY_MCP_SERVER": FAKE_MCP_SERVER,
+        "CHECKPOINT_DB_PATH": os.path.join(workdir, "checkpoints.db"),
+        "TWEET_OUTBOX_PATH": os.path.join(workdir, "tweet_outbox.db"),
+        "LLM_CACHE_PATH": os.path.join(workdir, "llm_cache.db"),
+        "UPLOAD_STATE_PATH": os.path.join(workdir, "uploads.db"),
+        "MINT_LEDGER_PATH": os.path.join(workdir, "mints.db"),
+        "WORKFLOW_GRAPH_FORMAT": "off",
+        "PYTHONUNBUFFERED": "1",
+    })
+    env.setdefault("OPENAI_API_KEY", "benchmark")
+    return env
+
+
+def time_import(env):
+    """Return seconds spent importing agent in a fresh interpreter."""
+    code = "import time; start = time.perf_counter(); import agent; print(time.perf_counter() - start)"
+    output = subprocess.run(
+        [sys.executable, "-c", code], cwd=HERE, env=env, capture_output=True, check=True
+    ).stdout
+    return float(output.decode().strip().splitlines()[-1])
+
+
+def time_first_prompt(env, timeout):
+    """Return seconds from launching agent.py until its first prompt."""
+    start = time.perf_counter()
+    process = subprocess.Popen(
+        [sys.executable, os.path.join(HERE, "agent.py")],
+        cwd=HERE,
+        env=env,
+        stdin=subprocess.PIPE,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+    )
+    output = b""
+    try:
+        while FIRST_PROMPT not in output:
+            if time.perf_counter() - start > timeout:
+                raise TimeoutError(f"No prompt after {timeout}s")
+            chunk = os.read(process.stdout.fileno(), 4096)
+            if not chunk:
+                raise RuntimeError(f"agent.py exited before prompting:\n{output.decode(errors='replace')}")
+            output += chunk
+        return time.perf_counter() - start
+    finally:
+        process.kill()
+        process.wait()
+
+
+def summarize(name, values):
+    values_ms = [v * 1000 for v in values]
+    print(
+        f"{name:>13} {statistics.median(values_ms):>10.0f} {min(values_ms):>8.0f} {max(values_ms):>8.0f}"
+    )
+    return statistics.median(values_ms)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=5, help="fresh processes per measurement")
+    parser.add_argument("--timeout", type=float, default=60, help="seconds to wait for the first prompt")
+    parser.add_argument("--max-import-ms", type=float, default=None,
+                        help="exit non-zero if the median import time is above this")
+    parser.add_argument("--max-first-prompt-ms", type=float, default=None,
+                        help="exit non-zero if the median time to first prompt is above this")
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory(prefix="bench_startup_") as workdir:
+        env = bench_env(workdir)
+
+        # One untimed run so bytecode compilation isn't counted
+        time_import(env)
+
+        imports = [time_import(env) for _ in range(args.runs)]
+        prompts = [time_first_prompt(env, args.timeout) for _ in range(args.runs)]
+
+    print("=== agent.py Startup Benchmark ===")
+    print(f"{args.runs} fresh processes each\n")
+    print(f"{'':>13} {'median ms':>10} {'min ms':>8} {'max ms':>8}")
+    import_ms = summarize("import", imports)
+    prompt_ms = summarize("first prompt", prompts)
+
+    failed = []
+    if args.max_import_ms is not None and import_ms > args.max_import_ms:
+        failed.append(f"import {import_ms:.0f}ms > {args.max_import_ms:.0f}ms")
+    if args.max_first_prompt_ms is not None and prompt_ms > args.max_first_prompt_ms:
+        failed.append(f"first prompt {prompt_ms:.0f}ms > {args.max_first_prompt_ms:.0f}ms")
+
+    if failed:
+        print(f"\n❌ Startup regressed: {', '.join(failed)}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+"""
+Benchmark the tweet posting path against the local fake Scraper.
+
+Runs TwitterClient.post_tweet through the real sidecar, with
+fake_twitter_scraper.js standing in for agent-twitter-client, and reports
+posts/sec and p50/p99 latency at each concurrency level. All posts are
+submitted at once, so latency includes time spent waiting for a free slot.
+No credentials or network access are needed.
+
+Example:
+    python bench_twitter_posting.py --posts 200 --concurrency 1 4 16 --post-ms 100
+"""
+
+import os
+import sys
+import time
+import asyncio
+import argparse
+import tempfile
+import statistics
+
+from twitter_client import TwitterClient, TwitterSidecar
+
+FAKE_SCRAPER = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fake_twitter_scraper.js")
+
+
+def percentile(values, fraction):
+    """Return the value at the given fraction (0-1) of the sorted values."""
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, int(round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+async def run_level(posts, concurrency):
+    """Post `posts` tweets with at most `concurrency` in flight and collect timings."""
+    sidecar = TwitterSidecar(max_concurrency=concurrency)
+    client = TwitterClient(sidecar=sidecar)
+
+    # Warm up so login and process start aren't counted
+    await client.post_tweet("warm-up")
+
+    latencies = []
+    failures = 0
+
+    async def post_one(i):
+        nonlocal failures
+        start = time.perf_counter()
+        result = await client.post_tweet(f"Benchmark tweet {i}")
+        latencies.append(time.perf_counter() - start)
+        if not result.get("success"):
+            failures += 1
+
+    start = time.perf_counter()
+    await asyncio.gather(*(post_one(i) for i in range(posts)))
+    elapsed = time.perf_counter() - start
+
+    await sidecar.close()
+    return {
+        "concurrency": concurrency,
+        "posts": posts,
+        "failures": failures,
+        "posts_per_sec": posts / elapsed,
+        "p50_ms": percentile(latencies, 0.50) * 1000,
+        "p99_ms": percentile(latencies, 0.99) * 1000,
+        "mean_ms": statistics.mean(latencies) * 1000,
+    }
+
+
+async def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--posts", type=int, default=100, help="tweets to post per concurrency level")
+    parser.add_argument("--concurrency", type=int, nargs="+", default=[1, 4, 16], help="concurrency levels to test")
+    parser.add_argument("--login-ms", type=float, default=1000, help="fake login latency")
+    parser.add_argument("--post-ms", type=float, default=200, help="fake mean post latency")
+    parser.add_argument("--jitter-ms", type=float, default=50, help="fake post latency jitter")
+    parser.add_argument("--failure-rate", type=float, default=0.0, help="fraction of fake posts that fail")
+    parser.add_argument("--min-posts-per-sec", type=float, default=None,
+                        help="exit non-zero if any level is slower than this")
+    args = parser.parse_args()
+
+    os.environ.update({
+        "TWITTER_SCRAPER_MODULE": FAKE_SCRAPER,
+        "TWITTER_SESSION_DIR": tempfile.mkdtemp(prefix="bench_twitter_sessions_"),
+        "FAKE_TWITTER_LOGIN_MS": str(args.login_ms),
+        "FAKE_TWITTER_POST_MS": str(args.post_ms),
+        "FAKE_TWITTER_JITTER_MS": str(args.jitter_ms),
+        "FAKE_TWITTER_FAILURE_RATE": str(args.failure_rate),
+    })
+    for var in ("TWITTER_USERNAME", "TWITTER_PASSWORD", "TWITTER_EMAIL"):
+        os.environ.setdefault(var, "benchmark")
+
+    print("=== Tweet Posting Benchmark (fake Scraper) ===")
+    print(f"post latency {args.post_ms:.0f}±{args.jitter_ms:.0f}ms, failure rate {args.failure_rate:.0%}\n")
+    print(f"{'concurrency':>11} {'posts':>6} {'failed':>6} {'posts/sec':>10} {'p50 ms':>8} {'p99 ms':>8}")
+
+    too_slow = []
+    for concurrency in args.concurrency:
+        result = await run_level(args.posts, concurrency)
+        print(
+            f"{result['concurrency']:>11} {result['posts']:>6} {result['failures']:>6} "
+            f"{result['posts_per_sec']:>10.1f} {result['p50_ms']:>8.1f} {result['p99_ms']:>8.1f}"
+        )
+        if args.min_posts_per_sec is not None and result["posts_per_sec"] < args.min_posts_per_sec:
+            too_slow.append(concurrency)
+
+    if too_slow:
+        print(f"\n❌ Throughput below {args.min_posts_per_sec} posts/sec at concurrency {too_slow}")
+        return 1
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(asyncio.run(main()))
@@ -0,0 +1,138 @@
+#!/usr/bin/env python3
+"""
+Check local_upload.py's resumable uploads against fake_tus_server.py.
+
+Uploads a file of random bytes and checks that:
+  - an upload whose PATCH fails part way resumes from the server's offset,
+    sending only the chunks it did not have
+  - the URI is built from the server's Upload-Cid for the file's SHA-256
+  - a file whose bytes do not match the SHA-256 it was announced with is
+    rejected
+  - an upload that finishes without an Upload-Cid is an error
+
+The upload state goes to a temporary directory, so no credentials or
+network are needed.
+
+Example:
+    python check_resumable_upload.py --size-mb 64 --chunk-mb 4
+"""
+
+import os
+import sys
+import socket
+import hashlib
+import argparse
+import tempfile
+
+import fake_tus_server
+from local_upload import ResumableUploader, UploadError, file_sha256
+
+
+def free_port():
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        return sock.getsockname()[1]
+
+
+def write_random_file(path, size_bytes):
+    with open(path, "wb") as f:
+        for start in range(0, size_bytes, 1 << 20):
+            f.write(os.urandom(min(1 << 20, size_bytes - start)))
+
+
+def check_resume(uploader, path, chunk_bytes, fail_after):
+    """Fail a PATCH part way, upload again and return a list of problems."""
+    problems = []
+    size = os.path.getsize(path)
+    sha256 = file_sha256(path)
+    chunks = -(-size // chunk_bytes)
+
+    fake_tus_server.STATE["fail_after"] = fail_after
+    try:
+        uploader.upload(path)
+        problems.append("the injected PATCH failure was not reported")
+    except UploadError as e:
+        print(f"first attempt: {e}")
+    received = max(len(upload["data"]) for upload in fake_tus_server.UPLOADS.values())
+    print(f"server has {received} of {size} bytes")
+
+    patches_before = fake_tus_server.STATE["patches"]
+    stages = set()
+    uri = uploader.upload(path, lambda stage, done, total: stages.add(stage))
+    resumed_patches = fake_tus_server.STATE["patches"] - patches_before
+    print(f"second attempt: {uri}, {resumed_patches} PATCH requests")
+
+    if resumed_patches != chunks - fail_after:
+        problems.append(f"resume sent {resumed_patches} chunks, expected {chunks - fail_after}")
+    if uri != f"ipfs://{fake_tus_server.fake_cid(sha256)}":
+        problems.append(f"URI {uri} is not the CID of sha256 {sha256}")
+    if "uploading" not in stages:
+        problems.append("no upload progress was reported")
+    return problems
+
+
+def check_checksum_mismatch(uploader, path):
+    """Announce the wrong SHA-256 and return a list of problems."""
+    wrong = hashlib.sha256(b"not the file").hexdigest()
+    try:
+        uploader.upload(path, sha256=wrong)
+    except UploadError as e:
+        print(f"wrong sha256: {e}")
+        return []
+    return ["an upload with the wrong sha256 was accepted"]
+
+
+def check_missing_cid(uploader, path):
+    """Finish an upload without Upload-Cid and return a list of problems."""
+    fake_tus_server.STATE["omit_cid"] = True
+    try:
+        uploader.upload(path)
+    except UploadError as e:
+        print(f"no Upload-Cid: {e}")
+        return []
+    finally:
+        fake_tus_server.STATE["omit_cid"] = False
+    return ["an upload without Upload-Cid returned a URI"]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--size-mb", type=int, default=64, help="size of the uploaded file")
+    parser.add_argument("--chunk-mb", type=int, default=4, help="bytes sent per PATCH")
+    parser.add_argument("--fail-after", type=int, default=5, help="PATCH requests that succeed before the failure")
+    args = parser.parse_args()
+
+    chunk_bytes = args.chunk_mb << 20
+    if args.size_mb <= args.chunk_mb * args.fail_after:
+        parser.error("--size-mb must be larger than --chunk-mb times --fail-after")
+
+    port = free_port()
+    server = fake_tus_server.serve_in_background(port=port)
+    try:
+        with tempfile.TemporaryDirectory(prefix="check_upload_") as workdir:
+            path = os.path.join(workdir, "video.mp4")
+            write_random_file(path, args.size_mb << 20)
+            uploader = ResumableUploader(
+                url=f"http://127.0.0.1:{port}/files",
+                token="check",
+                chunk_bytes=chunk_bytes,
+                state_path=os.path.join(workdir, "uploads.db"),
+            )
+
+            print("=== Resumable Upload Check ===")
+            print(f"{args.size_mb}MB file in {args.chunk_mb}MB chunks\n")
+            problems = check_resume(uploader, path, chunk_bytes, args.fail_after)
+            problems += check_checksum_mismatch(uploader, path)
+            problems += check_missing_cid(uploader, path)
+    finally:
+        server.should_exit = True
+
+    if problems:
+        print(f"\n❌ {'; '.join(problems)}")
+        return 1
+    print("\n✅ All checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,413 @@
+"""
+Disk-backed checkpointer for the IP creation graph.
+
+Replaces the in-process MemorySaver so checkpoint history no longer grows
+in memory and interrupted runs survive a restart. Checkpoints are stored in
+SQLite (WAL mode) as msgpack blobs produced by the graph's serializer.
+
+Once a thread completes, prune_thread drops every checkpoint but the last
+one. Threads that have not been touched for CHECKPOINT_RETENTION seconds are
+deleted entirely when the checkpointer is opened and whenever a thread is
+pruned.
+"""
+
+import os
+import time
+import random
+import sqlite3
+import asyncio
+import threading
+
+from langgraph.checkpoint.base import (
+    WRITES_IDX_MAP,
+    BaseCheckpointSaver,
+    CheckpointTuple,
+    get_checkpoint_id,
+    get_checkpoint_metadata,
+)
+from langgraph.checkpoint.serde.types import TASKS
+
+# Default location of the checkpoint database
+DEFAULT_CHECKPOINT_PATH = os.getenv(
+    "CHECKPOINT_DB_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "checkpoints.db"),
+)
+
+# Threads idle for longer than this many seconds are deleted (0 keeps them forever)
+DEFAULT_RETENTION = float(os.getenv("CHECKPOINT_RETENTION", str(7 * 24 * 60 * 60)))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS checkpoints (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    parent_checkpoint_id TEXT,
+    type TEXT NOT NULL,
+    checkpoint BLOB NOT NULL,
+    metadata_type TEXT NOT NULL,
+    metadata BLOB NOT NULL,
+    created_at REAL NOT NULL,
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id)
+);
+CREATE INDEX IF NOT EXISTS checkpoints_created ON checkpoints (created_at);
+CREATE TABLE IF NOT EXISTS writes (
+    thread_id TEXT NOT NULL,
+    checkpoint_ns TEXT NOT NULL DEFAULT '',
+    checkpoint_id TEXT NOT NULL,
+    task_id TEXT NOT NULL,
+    idx INTEGER NOT NULL,
+    channel TEXT NOT NULL,
+    type TEXT NOT NULL,
+    value BLOB NOT NULL,
+    task_path TEXT NOT NULL DEFAULT '',
+    PRIMARY KEY (thread_id, checkpoint_ns, checkpoint_id, task_id, idx)
+);
+"""
+
+
+class SqliteCheckpointer(BaseCheckpointSaver[str]):
+    """Checkpoint saver that keeps graph state in a SQLite database."""
+
+    def __init__(self, path=DEFAULT_CHECKPOINT_PATH, retention=DEFAULT_RETENTION, serde=None):
+        """Open (and create if needed) the checkpoint database.
+
+        Args:
+            path (str): Path to the SQLite database file
+            retention (float): Seconds an idle thread is kept; 0 keeps threads forever
+            serde (SerializerProtocol, optional): Serializer for checkpoints and writes
+        """
+        super().__init__(serde=serde)
+        self.path = path
+        self.retention = retention
+
+        # The graph writes a checkpoint after every step, so one connection
+        # is kept open and shared between threads under a lock
+        self._conn = sqlite3.connect(path, timeout=30, check_same_thread=False)
+        self._lock = threading.Lock()
+        with self._lock, self._conn:
+            self._conn.execute("PRAGMA journal_mode=WAL")
+            self._conn.execute("PRAGMA synchronous=NORMAL")
+            self._conn.executescript(SCHEMA)
+
+        self.expire()
+
+    def close(self):
+        """Close the database connection."""
+        with self._lock:
+            self._conn.close()
+
+    def get_tuple(self, config):
+        """Return the requested checkpoint, or the latest one for the thread.
+
+        Args:
+            config (dict): Config with thread_id and optionally checkpoint_ns and checkpoint_id
+
+        Returns:
+            CheckpointTuple or None: The checkpoint, or None if there isn't one
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints "
+            "WHERE thread_id = ? AND checkpoint_ns = ?"
+        )
+        params = [thread_id, checkpoint_ns]
+        if checkpoint_id := get_checkpoint_id(config):
+            query += " AND checkpoint_id = ?"
+            params.append(checkpoint_id)
+        else:
+            query += " ORDER BY checkpoint_id DESC LIMIT 1"
+
+        with self._lock:
+            row = self._conn.execute(query, params).fetchone()
+            if row is None:
+                return None
+            return self._load_tuple(row)
+
+    def list(self, config, *, filter=None, before=None, limit=None):
+        """List checkpoints, newest first.
+
+        Args:
+            config (dict, optional): Restrict to this thread (and namespace/checkpoint)
+            filter (dict, optional): Metadata values the checkpoints must match
+            before (dict, optional): Only list checkpoints older than this one
+            limit (int, optional): Maximum number of checkpoints to return
+
+        Yields:
+            CheckpointTuple: Matching checkpoints
+        """
+        query = (
+            "SELECT thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id, "
+            "type, checkpoint, metadata_type, metadata FROM checkpoints"
+        )
+        clauses, params = [], []
+        if config:
+            clauses.append("thread_id = ?")
+            params.append(config["configurable"]["thread_id"])
+            if (checkpoint_ns := config["configurable"].get("checkpoint_ns")) is not None:
+                clauses.append("checkpoint_ns = ?")
+                params.append(checkpoint_ns)
+            if checkpoint_id := get_checkpoint_id(config):
+                clauses.append("checkpoint_id = ?")
+                params.append(checkpoint_id)
+        if before and (before_id := get_checkpoint_id(before)):
+            clauses.append("checkpoint_id < ?")
+            params.append(before_id)
+        if clauses:
+            query += " WHERE " + " AND ".join(clauses)
+        query += " ORDER BY thread_id, checkpoint_ns, checkpoint_id DESC"
+
+        with self._lock:
+            rows = self._conn.execute(query, params).fetchall()
+
+        for row in rows:
+            if limit is not None and limit <= 0:
+                break
+
+            metadata = self.serde.loads_typed((row[6], row[7]))
+            if filter and not all(metadata.get(key) == value for key, value in filter.items()):
+                continue
+
+            if limit is not None:
+                limit -= 1
+            with self._lock:
+                checkpoint_tuple = self._load_tuple(row, metadata)
+            yield checkpoint_tuple
+
+    def put(self, config, checkpoint, metadata, new_versions):
+        """Save a checkpoint.
+
+        Args:
+            config (dict): Config of the parent checkpoint
+            checkpoint (dict): The checkpoint to save
+            metadata (dict): Metadata to save with the checkpoint
+            new_versions (dict): Channel versions written by this step
+
+        Returns:
+            dict: Config pointing at the saved checkpoint
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"]["checkpoint_ns"]
+        c = checkpoint.copy()
+        c.pop("pending_sends", None)
+        type_, data = self.serde.dumps_typed(c)
+        metadata_type, metadata_data = self.serde.dumps_typed(get_checkpoint_metadata(config, metadata))
+
+        with self._lock, self._conn:
+            self._conn.execute(
+                "INSERT OR REPLACE INTO checkpoints (thread_id, checkpoint_ns, checkpoint_id, "
+                "parent_checkpoint_id, type, checkpoint, metadata_type, metadata, created_at) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                (
+                    thread_id,
+                    checkpoint_ns,
+                    checkpoint["id"],
+                    config["configurable"].get("checkpoint_id"),
+                    type_,
+                    data,
+                    metadata_type,
+                    metadata_data,
+                    time.time(),
+                ),
+            )
+        return {
+            "configurable": {
+                "thread_id": thread_id,
+                "checkpoint_ns": checkpoint_ns,
+                "checkpoint_id": checkpoint["id"],
+            }
+        }
+
+    def put_writes(self, config, writes, task_id, task_path=""):
+        """Save the pending writes of a task.
+
+        Args:
+            config (dict): Config of the checkpoint the writes belong to
+            writes (list): (channel, value) pairs written by the task
+            task_id (str): ID of the task that made the writes
+            task_path (str): Path of the task that made the writes
+        """
+        thread_id = config["configurable"]["thread_id"]
+        checkpoint_ns = config["configurable"].get("checkpoint_ns", "")
+        checkpoint_id = config["configurable"]["checkpoint_id"]
+
+        rows = []
+        for idx, (channel, value) in enumerate(writes):
+            type_, data = self.serde.dumps_typed(value)
+            rows.append((
+                thread_id, checkpoint_ns, checkpoint_id, task_id,
+                WRITES_IDX_MAP.get(channel, idx), channel, type_, data, task_path,
+            ))
+
+        # Regular writes are kept from the first attempt; special writes
+        # (errors, interrupts, resumes) are replaced
+        with self._lock, self._conn:
+            for row in rows:
+                verb = "INSERT OR REPLACE" if row[4] < 0 else "INSERT OR IGNORE"
+                self._conn.execute(
+                    f"{verb} INTO writes (thread_id, checkpoint_ns, checkpoint_id, task_id, idx, "
+                    "channel, type, value, task_path) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                    row,
+                )
+
+    async def aget_tuple(self, config):
+        """Async version of get_tuple."""
+        return await asyncio.to_thread(self.get_tuple, config)
+
+    async def alist(self, config, *, filter=None, before=None, limit=None):
+        """Async version of list."""
+        tuples = await asyncio.to_thread(
+            lambda: list(self.list(config, filter=filter, before=before, limit=limit))
+        )
+        for checkpoint_tuple in tuples:
+            yield checkpoint_tuple
+
+    async def aput(self, config, checkpoint, metadata, new_versions):
+        """Async version of put."""
+        return await asyncio.to_thread(self.put, config, checkpoint, metadata, new_versions)
+
+    async def aput_writes(self, config, writes, task_id, task_path=""):
+        """Async version of put_writes."""
+        await asyncio.to_thread(self.put_writes, config, writes, task_id, task_path)
+
+    def get_next_version(self, current, channel):
+        """Return the next channel version (same scheme as MemorySaver)."""
+        if current is None:
+            current_v = 0
+        elif isinstance(current, int):
+            current_v = current
+        else:
+            current_v = int(current.split(".")[0])
+        return f"{current_v + 1:032}.{random.random():016}"
+
+    def prune_thread(self, thread_id):
+        """Drop every checkpoint of a finished thread except the latest.
+
+        Args:
+            thread_id (str): The thread to prune
+
+        Returns:
+            int: Number of checkpoints deleted
+        """
+        with self._lock, self._conn:
+            latest = self._conn.execute(
+                "SELECT checkpoint_ns, MAX(checkpoint_id) FROM checkpoints "
+                "WHERE thread_id = ? GROUP BY checkpoint_ns",
+                (thread_id,),
+            ).fetchall()
+
+            deleted = 0
+            for checkpoint_ns, checkpoint_id in latest:
+                deleted += self._conn.execute(
+                    "DELETE FROM checkpoints WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                ).rowcount
+                self._conn.execute(
+                    "DELETE FROM writes WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id != ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+                # The parent is gone, so the kept checkpoint becomes the root
+                self._conn.execute(
+                    "UPDATE checkpoints SET parent_checkpoint_id = NULL "
+                    "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ?",
+                    (thread_id, checkpoint_ns, checkpoint_id),
+                )
+
+        self.expire()
+        return deleted
+
+    async def aprune_thread(self, thread_id):
+        """Async version of prune_thread."""
+        return await asyncio.to_thread(self.prune_thread, thread_id)
+
+    def delete_thread(self, thread_id):
+        """Delete all checkpoints and writes of a thread."""
+        with self._lock, self._conn:
+            self._conn.execute("DELETE FROM checkpoints WHERE thread_id = ?", (thread_id,))
+            self._conn.execute("DELETE FROM writes WHERE thread_id = ?", (thread_id,))
+
+    def expire(self):
+        """Delete threads that have been idle for longer than the retention window.
+
+        Returns:
+            int: Number of threads deleted
+        """
+        if not self.retention:
+            return 0
+
+        with self._lock:
+            stale = [
+                row[0]
+                for row in self._conn.execute(
+                    "SELECT thread_id FROM checkpoints GROUP BY thread_id HAVING MAX(created_at) < ?",
+                    (time.time() - self.retention,),
+                )
+            ]
+        for thread_id in stale:
+            self.delete_thread(thread_id)
+        return len(stale)
+
+    def _load_tuple(self, row, metadata=None):
+        """Build a CheckpointTuple from a checkpoints row. Caller holds the lock."""
+        thread_id, checkpoint_ns, checkpoint_id, parent_checkpoint_id = row[:4]
+        checkpoint = self.serde.loads_typed((row[4], row[5]))
+        if metadata is None:
+            metadata = self.serde.loads_typed((row[6], row[7]))
+
+        writes = self._conn.execute(
+            "SELECT task_id, channel, type, value FROM writes "
+            "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? ORDER BY task_id, idx",
+            (thread_id, checkpoint_ns, checkpoint_id),
+        ).fetchall()
+
+        # Sends scheduled by the parent step are replayed as pending sends
+        sends = []
+        if parent_checkpoint_id:
+            sends = self._conn.execute(
+                "SELECT type, value FROM writes "
+                "WHERE thread_id = ? AND checkpoint_ns = ? AND checkpoint_id = ? AND channel = ? "
+                "ORDER BY task_path, task_id, idx",
+                (thread_id, checkpoint_ns, parent_checkpoint_id, TASKS),
+            ).fetchall()
+
+        return CheckpointTuple(
+            config={
+                "configurable": {
+                    "thread_id": thread_id,
+                    "checkpoint_ns": checkpoint_ns,
+                    "checkpoint_id": checkpoint_id,
+                }
+            },
+            checkpoint={
+                **checkpoint,
+                "pending_sends": [self.serde.loads_typed(send) for send in sends],
+            },
+            metadata=metadata,
+            parent_config=(
+                {
+                    "configurable": {
+                        "thread_id": thread_id,
+                        "checkpoint_ns": checkpoint_ns,
+                        "checkpoint_id": parent_checkpoint_id,
+                    }
+                }
+                if parent_checkpoint_id
+                else None
+            ),
+            pending_writes=[
+                (task_id, channel, self.serde.loads_typed((type_, value)))
+                for task_id, channel, type_, value in writes
+            ],
+        )
+
+
+_checkpointer = None
+
+
+def get_checkpointer():
+    """Return the process-wide checkpointer."""
+    global _checkpointer
+    if _checkpointer is None:
+        _checkpointer = SqliteCheckpointer()
+    return _checkpointer
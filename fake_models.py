@@ -0,0 +1,93 @@
+"""
+Local stand-in for the OpenAI models the agent uses.
+
+install() replaces the process-wide client registry in llm_clients with one
+whose chat models and image generator return canned responses, so the graph
+can be run and benchmarked without an API key or network. Call it before
+the graph is created.
+
+The tool-calling model calls the tool the request asks for:
+upload_local_file for "Upload this file: ...", generate_luma_video for
+"Generate video: ..." and generate_image for anything else. The plain model
+answers metadata prompts with JSON metadata and anything else with a short
+explanation.
+
+Settings (environment variables):
+    FAKE_MODEL_MS   Latency of every model call in ms (default: 0)
+"""
+
+import os
+import time
+import uuid
+import asyncio
+import hashlib
+
+from langchain_core.messages import AIMessage, HumanMessage
+
+import llm_clients
+
+MODEL_MS = float(os.getenv("FAKE_MODEL_MS", "0"))
+
+METADATA_RESPONSE = """{
+    "name": "Benchmark Asset",
+    "description": "An asset created by the fake model",
+    "attributes": [
+        {"trait_type": "style", "value": "anime"},
+        {"trait_type": "mood", "value": "calm"},
+        {"trait_type": "setting", "value": "studio"}
+    ]
+}"""
+
+
+class FakeChatModel:
+    """Chat model that answers from the request instead of calling OpenAI."""
+
+    def __init__(self, tools=False):
+        self.tools = tools
+
+    def bind_tools(self, tools, **kwargs):
+        return FakeChatModel(tools=True)
+
+    async def ainvoke(self, messages, *args, **kwargs):
+        await asyncio.sleep(MODEL_MS / 1000)
+        request = next(
+            (message.content for message in reversed(messages) if isinstance(message, HumanMessage)), ""
+        )
+        if self.tools:
+            return AIMessage(content="", tool_calls=[_tool_call(request)])
+        if "generate metadata" in request:
+            return AIMessage(content=METADATA_RESPONSE)
+        return AIMessage(content="These terms are within the usual range.")
+
+
+def _tool_call(request):
+    if request.startswith("Upload this file: "):
+        name, args = "upload_local_file", {"file_path": request.split(": ", 1)[1]}
+    elif request.startswith("Generate video: "):
+        name, args = "generate_luma_video", {"prompt": request.split(": ", 1)[1]}
+    else:
+        name, args = "generate_image", {"prompt": request}
+    return {"id": str(uuid.uuid4()), "name": name, "args": args}
+
+
+class FakeImageGenerator:
+    """DALL-E stand-in returning a URL that is unique to the prompt."""
+
+    def run(self, prompt):
+        time.sleep(MODEL_MS / 1000)
+        return f"https://images.example.com/{hashlib.sha256(prompt.encode()).hexdigest()[:16]}.png"
+
+
+class FakeLLMClients(llm_clients.LLMClientRegistry):
+    """Client registry handing out fake models."""
+
+    def chat_model(self, model, **kwargs):
+        return FakeChatModel()
+
+    def image_generator(self, **kwargs):
+        return FakeImageGenerator()
+
+
+def install():
+    """Make get_chat_model and get_image_generator return fake models."""
+    llm_clients._registry = FakeLLMClients()
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for the Story MCP server (../story-sdk-mcp/server.py).
+
+Serves the four tools agent.py uses over stdio and returns canned results,
+so the agent can be started and benchmarked without Story Protocol, IPFS or
+a wallet. Point the agent at it with STORY_MCP_SERVER=fake_story_mcp_server.py,
+or run it once with --transport sse and set STORY_MCP_URL to its /sse URL.
+
+Example:
+    python fake_story_mcp_server.py --transport sse --port 8001
+    STORY_MCP_URL=http://127.0.0.1:8001/sse python agent.py
+
+Settings (environment variables):
+    FAKE_STORY_TOOL_MS   Latency of every tool call in ms (default: 0)
+
+A server started over stdio by an MCP client only inherits a few variables
+such as PATH and HOME, so pass --tool-ms to set the latency there.
+"""
+
+import os
+import json
+import asyncio
+import hashlib
+import argparse
+
+from mcp.server.fastmcp import FastMCP
+
+TOOL_MS = float(os.getenv("FAKE_STORY_TOOL_MS", "0"))
+
+mcp = FastMCP("story_server")
+
+
+def _fake_hash(*parts):
+    return hashlib.sha256(json.dumps(parts, sort_keys=True, default=str).encode()).hexdigest()
+
+
+@mcp.tool()
+async def upload_image_to_ipfs(image_data: str) -> str:
+    """Upload an image to IPFS and return its URI."""
+    await asyncio.sleep(TOOL_MS / 1000)
+    return f"Successfully uploaded image to IPFS: ipfs://Qm{_fake_hash(image_data)[:44]}"
+
+
+@mcp.tool()
+async def create_ip_metadata(image_uri: str, name: str, description: str, attributes: list = None) -> str:
+    """Create and upload IP and NFT metadata."""
+    await asyncio.sleep(TOOL_MS / 1000)
+    digest = _fake_hash(image_uri, name, description, attributes)
+    registration_metadata = {
+        "ip_metadata_uri": f"ipfs://Qm{digest[:44]}",
+        "ip_metadata_hash": f"0x{digest}",
+        "nft_metadata_uri": f"ipfs://Qm{digest[20:64]}",
+        "nft_metadata_hash": f"0x{digest[::-1]}",
+    }
+    return (
+        "Successfully created and uploaded metadata.\n"
+        f"Registration metadata for minting: {json.dumps(registration_metadata)}"
+    )
+
+
+@mcp.tool()
+async def mint_and_register_ip_with_terms(
+    commercial_rev_share: int,
+    derivatives_allowed: bool,
+    registration_metadata: dict,
+    recipient: str = None,
+) -> str:
+    """Mint an NFT, register it as an IP asset and attach license terms."""
+    await asyncio.sleep(TOOL_MS / 1000)
+    digest = _fake_hash(commercial_rev_share, derivatives_allowed, registration_metadata)
+    return (
+        "Completed minting and registering IP with terms:\n"
+        f"Transaction Hash: {digest}\n"
+        f"IP ID: 0x{digest[:40]}\n"
+        "License Terms IDs: [1]"
+    )
+
+
+@mcp.tool()
+async def mint_license_tokens(licensor_ip_id: str, license_terms_id: int = 1, amount: int = 1) -> str:
+    """Mint license tokens for an IP asset."""
+    await asyncio.sleep(TOOL_MS / 1000)
+    return (
+        "Successfully minted license tokens:\n"
+        f"Transaction Hash: {_fake_hash(licensor_ip_id, license_terms_id, amount)}\n"
+        "License Token IDs: [1]"
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--transport", choices=["stdio", "sse"], default="stdio", help="how clients connect")
+    parser.add_argument("--port", type=int, default=8001, help="port for the sse transport")
+    parser.add_argument("--tool-ms", type=float, default=TOOL_MS, help="latency of every tool call")
+    args = parser.parse_args()
+
+    TOOL_MS = args.tool_ms
+    mcp.settings.port = args.port
+    mcp.run(args.transport)
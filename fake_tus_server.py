@@ -0,0 +1,148 @@
+#!/usr/bin/env python3
+"""
+Local stand-in for a tus upload endpoint such as Pinata's.
+
+Implements the parts of the tus protocol (https://tus.io) local_upload.py
+uses: creating an upload, HEAD for its offset and PATCH to append a chunk.
+Uploads are kept in memory. When the last byte arrives, the bytes are
+checked against the sha256 sent in Upload-Metadata and a made-up CID,
+derived from that hash, is returned in the Upload-Cid header. Point the
+agent at it with IPFS_UPLOAD_URL=http://127.0.0.1:8002/files.
+
+Example:
+    python fake_tus_server.py --port 8002
+    IPFS_UPLOAD_URL=http://127.0.0.1:8002/files python agent.py
+
+Settings (environment variables):
+    FAKE_TUS_FAIL_AFTER   Fail the PATCH after this many with HTTP 500, once
+                          (default: never)
+    FAKE_TUS_OMIT_CID     Set to 1 to leave out Upload-Cid (default: off)
+"""
+
+import os
+import time
+import uuid
+import base64
+import hashlib
+import argparse
+import threading
+
+import uvicorn
+from starlette.applications import Starlette
+from starlette.responses import Response
+from starlette.routing import Route
+
+TUS_VERSION = "1.0.0"
+
+# tus extension status for a checksum mismatch
+CHECKSUM_MISMATCH = 460
+
+# Uploads by ID: {"length": int, "metadata": dict, "data": bytearray}
+UPLOADS = {}
+
+# Faults to inject and counters, adjustable while the server runs
+STATE = {
+    "fail_after": int(os.environ["FAKE_TUS_FAIL_AFTER"]) if os.getenv("FAKE_TUS_FAIL_AFTER") else None,
+    "omit_cid": os.getenv("FAKE_TUS_OMIT_CID", "").lower() in ("1", "true", "yes"),
+    "patches": 0,
+}
+
+
+def fake_cid(sha256):
+    """The CID the server returns for bytes with this SHA-256."""
+    return f"bafkfake{sha256[:40]}"
+
+
+def _parse_metadata(header):
+    metadata = {}
+    for pair in filter(None, header.split(",")):
+        key, _, value = pair.strip().partition(" ")
+        metadata[key] = base64.b64decode(value).decode() if value else ""
+    return metadata
+
+
+def _offset_headers(upload):
+    headers = {
+        "Tus-Resumable": TUS_VERSION,
+        "Upload-Offset": str(len(upload["data"])),
+        "Upload-Length": str(upload["length"]),
+        "Cache-Control": "no-store",
+    }
+    if len(upload["data"]) == upload["length"] and not STATE["omit_cid"]:
+        headers["Upload-Cid"] = fake_cid(hashlib.sha256(upload["data"]).hexdigest())
+    return headers
+
+
+async def create_upload(request):
+    try:
+        length = int(request.headers["upload-length"])
+    except (KeyError, ValueError):
+        return Response("Upload-Length is required", status_code=400)
+
+    upload_id = uuid.uuid4().hex
+    UPLOADS[upload_id] = {
+        "length": length,
+        "metadata": _parse_metadata(request.headers.get("upload-metadata", "")),
+        "data": bytearray(),
+    }
+    return Response(status_code=201, headers={"Tus-Resumable": TUS_VERSION, "Location": f"/files/{upload_id}"})
+
+
+async def upload_file(request):
+    upload = UPLOADS.get(request.path_params["upload_id"])
+    if upload is None:
+        return Response(status_code=404)
+    if request.method == "HEAD":
+        return Response(status_code=200, headers=_offset_headers(upload))
+
+    if int(request.headers.get("upload-offset", "-1")) != len(upload["data"]):
+        return Response("Upload-Offset does not match", status_code=409)
+    STATE["patches"] += 1
+    if STATE["fail_after"] is not None and STATE["patches"] > STATE["fail_after"]:
+        STATE["fail_after"] = None
+        return Response("Injected failure", status_code=500)
+
+    chunk = await request.body()
+    if len(upload["data"]) + len(chunk) > upload["length"]:
+        return Response("Chunk runs past Upload-Length", status_code=413)
+    upload["data"] += chunk
+
+    expected = upload["metadata"].get("sha256")
+    if len(upload["data"]) == upload["length"] and expected:
+        actual = hashlib.sha256(upload["data"]).hexdigest()
+        if actual != expected:
+            upload["data"] = bytearray()
+            return Response(f"sha256 is {actual}, not {expected}", status_code=CHECKSUM_MISMATCH)
+    return Response(status_code=204, headers=_offset_headers(upload))
+
+
+app = Starlette(routes=[
+    Route("/files", create_upload, methods=["POST"]),
+    Route("/files/{upload_id}", upload_file, methods=["HEAD", "PATCH"]),
+])
+
+
+def serve_in_background(host="127.0.0.1", port=8002):
+    """Start the server in a daemon thread and return once it accepts requests.
+
+    Returns:
+        uvicorn.Server: Set its should_exit to stop it
+    """
+    server = uvicorn.Server(uvicorn.Config(app, host=host, port=port, log_level="warning"))
+    threading.Thread(target=server.run, daemon=True).start()
+    while not server.started:
+        time.sleep(0.05)
+    return server
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on")
+    parser.add_argument("--port", type=int, default=8002, help="port to listen on")
+    args = parser.parse_args()
+
+    uvicorn.run(app, host=args.host, port=args.port)
+
+
+if __name__ == "__main__":
+    main()
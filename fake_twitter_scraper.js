@@ -0,0 +1,63 @@
+/*
+ * Local stand-in for the agent-twitter-client Scraper.
+ *
+ * Load it in the sidecar with TWITTER_SCRAPER_MODULE=fake_twitter_scraper.js.
+ * Nothing is sent to Twitter; calls just wait and then succeed or fail.
+ *
+ * Settings (environment variables):
+ *   FAKE_TWITTER_LOGIN_MS      Login latency in ms (default: 1000)
+ *   FAKE_TWITTER_POST_MS       Mean post latency in ms (default: 200)
+ *   FAKE_TWITTER_JITTER_MS     Random +/- jitter on post latency in ms (default: 50)
+ *   FAKE_TWITTER_FAILURE_RATE  Fraction of posts that fail, 0-1 (default: 0)
+ *   FAKE_TWITTER_FAILURE       Error message for failed posts (default: a 429 rate limit)
+ */
+
+const LOGIN_MS = Number(process.env.FAKE_TWITTER_LOGIN_MS || 1000);
+const POST_MS = Number(process.env.FAKE_TWITTER_POST_MS || 200);
+const JITTER_MS = Number(process.env.FAKE_TWITTER_JITTER_MS || 50);
+const FAILURE_RATE = Number(process.env.FAKE_TWITTER_FAILURE_RATE || 0);
+const FAILURE = process.env.FAKE_TWITTER_FAILURE || 'Response status: 429 Too Many Requests';
+
+let nextTweetId = 1;
+
+function sleep(ms) {
+    return new Promise((resolve) => setTimeout(resolve, Math.max(0, ms)));
+}
+
+class Scraper {
+    constructor() {
+        this.cookies = [];
+    }
+
+    async login(username, password, email) {
+        await sleep(LOGIN_MS);
+        this.cookies = [`auth_token=fake-${username || 'user'}; Domain=twitter.com; Path=/`];
+    }
+
+    async getCookies() {
+        return this.cookies.map((cookie) => ({ toString: () => cookie }));
+    }
+
+    async setCookies(cookies) {
+        this.cookies = cookies.map((cookie) => cookie.toString());
+    }
+
+    async isLoggedIn() {
+        return this.cookies.length > 0;
+    }
+
+    async sendTweet(text, replyToTweetId, mediaData) {
+        await sleep(POST_MS + (Math.random() * 2 - 1) * JITTER_MS);
+
+        if (Math.random() < FAILURE_RATE) {
+            throw new Error(FAILURE);
+        }
+
+        // Mimic the GraphQL CreateTweet response the real client returns
+        const restId = String(nextTweetId++);
+        const body = { data: { create_tweet: { tweet_results: { result: { rest_id: restId } } } } };
+        return { json: async () => body };
+    }
+}
+
+module.exports = { Scraper };
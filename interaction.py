@@ -0,0 +1,200 @@
+"""
+How a run gets its answers from a person.
+
+Nodes never read input themselves: they call interrupt() with a payload
+describing the question, and the graph stops. drive() then asks an
+InteractionAdapter for the answer and resumes the thread with
+Command(resume=answer), in a loop, until the thread finishes. Adapters wait
+for answers without blocking the event loop, so other sessions and
+background work keep running meanwhile.
+
+Adapters:
+    ConsoleInteraction   Prompts in the terminal (used by agent.py)
+    QueueInteraction     Hands questions to other code through an asyncio
+                         queue and waits for answer() to be called
+
+The HTTP service in agent_server.py does not need an adapter: it stops at
+each interrupt and resumes when the answer is posted.
+
+Interrupt payloads:
+    {"image_url" | "video_url": url, "question": str}
+        Content review. Answer {"action": "continue"} or
+        {"action": "feedback", "data": feedback}
+    {"fields": [{"name", "label", "type", "default", ...}], "explanation": str}
+        Form. Answer {field name: value}
+    anything else
+        Answer {"data": text}
+"""
+
+import asyncio
+
+from langgraph.types import Command
+
+
+class InteractionAdapter:
+    """Answers interrupts for drive(). Subclasses implement ask()."""
+
+    async def ask(self, thread_id, interrupt_data):
+        """Return the answer to an interrupt.
+
+        Args:
+            thread_id (str): The run that is waiting
+            interrupt_data (dict): The payload passed to interrupt()
+
+        Returns:
+            The value to resume the run with
+        """
+        raise NotImplementedError
+
+
+async def drive(graph, graph_input, config, interaction):
+    """Run a thread until it finishes, answering each interrupt through interaction.
+
+    Args:
+        graph: The compiled graph
+        graph_input: The initial input, a Command to resume with, or None to
+            continue from the last checkpoint
+        config (dict): Run config with the thread ID
+        interaction (InteractionAdapter): Where answers come from
+
+    Returns:
+        int: How many interrupts were answered
+    """
+    thread_id = config["configurable"]["thread_id"]
+    answered = 0
+    while True:
+        interrupt_data = None
+        async for event in graph.astream(graph_input, config, stream_mode="updates"):
+            if "__interrupt__" in event:
+                interrupt_data = event["__interrupt__"][0].value
+        if interrupt_data is None:
+            return answered
+        graph_input = Command(resume=await interaction.ask(thread_id, interrupt_data))
+        answered += 1
+
+
+def field_names(interrupt_data):
+    """Names of the form fields in an interrupt payload."""
+    return [field["name"] for field in interrupt_data.get("fields", [])]
+
+
+class ConsoleInteraction(InteractionAdapter):
+    """Asks in the terminal. input() runs in a worker thread."""
+
+    async def prompt(self, text):
+        return await asyncio.to_thread(input, text)
+
+    async def ask(self, thread_id, interrupt_data):
+        if "image_url" in interrupt_data or "video_url" in interrupt_data:
+            return await self.ask_review(interrupt_data)
+
+        names = field_names(interrupt_data)
+        if names == ["commercial_rev_share", "derivatives_allowed"]:
+            print("\n" + interrupt_data.get("explanation", ""))
+            fields = interrupt_data["fields"]
+            return {
+                "commercial_rev_share": await self.ask_rev_share(fields[0].get("default", 15)),
+                "derivatives_allowed": await self.ask_yes_no(
+                    "Allow Derivative Works?", fields[1].get("default", True)
+                ),
+            }
+        if names == ["adjust_terms"]:
+            print("\n" + interrupt_data.get("explanation", ""))
+            return {
+                "adjust_terms": await self.ask_yes_no(
+                    "Would you like to adjust your terms based on this feedback?",
+                    interrupt_data["fields"][0].get("default", True),
+                )
+            }
+        if names:
+            if "message" in interrupt_data:
+                print(f"\n{interrupt_data['message']}")
+            else:
+                print("Please provide the requested information:")
+            return {field["name"]: await self.ask_field(field) for field in interrupt_data["fields"]}
+
+        return {"data": await self.prompt("Enter your response: ")}
+
+    async def ask_review(self, interrupt_data):
+        content_type = "image" if "image_url" in interrupt_data else "video"
+        print(f"\nGenerated {content_type}: {interrupt_data[content_type + '_url']}\n")
+        user_input = await self.prompt(f"Do you like this {content_type}? (yes/no + feedback): ")
+
+        if user_input.lower().startswith("yes"):
+            print(f"Uploading {content_type} to IPFS...")
+            return {"action": "continue"}
+        feedback = user_input[4:] if len(user_input) > 4 else f"Please generate a different {content_type}"
+        print(f"Generating a new {content_type}...")
+        return {"action": "feedback", "data": feedback}
+
+    async def ask_rev_share(self, default):
+        while True:
+            try:
+                rev_share = int(
+                    await self.prompt(f"Enter Commercial Revenue Share (0-100%, default: {default}%): ")
+                    or str(default)
+                )
+                if 0 <= rev_share <= 100:
+                    return rev_share
+                print("Please enter a value between 0 and 100.")
+            except ValueError:
+                print("Please enter a valid number.")
+
+    async def ask_yes_no(self, question, default):
+        default_answer = "yes" if default else "no"
+        while True:
+            answer = (await self.prompt(f"{question} (yes/no, default: {default_answer}): ")).lower() or default_answer
+            if answer in ["yes", "no", "y", "n"]:
+                return answer.startswith("y")
+            print("Please enter yes or no.")
+
+    async def ask_field(self, field):
+        label = field.get("label", field["name"])
+        default = field.get("default", "")
+
+        if field.get("type") == "boolean":
+            return await self.ask_yes_no(label + "?", default)
+
+        if field.get("type") == "slider":
+            min_val, max_val = field.get("min", 0), field.get("max", 100)
+            while True:
+                try:
+                    value = int(await self.prompt(f"{label} ({min_val}-{max_val}, default: {default}): ") or str(default))
+                    if min_val <= value <= max_val:
+                        return value
+                    print(f"Please enter a value between {min_val} and {max_val}.")
+                except ValueError:
+                    print("Please enter a valid number.")
+
+        if default == "":
+            return await self.prompt(f"{label}: ")
+        return await self.prompt(f"{label} (default: {default}): ") or str(default)
+
+
+class QueueInteraction(InteractionAdapter):
+    """Puts (thread_id, interrupt_data) on a queue and waits for answer()."""
+
+    def __init__(self):
+        self.questions = asyncio.Queue()
+        self._answers = {}
+
+    async def ask(self, thread_id, interrupt_data):
+        answer = asyncio.get_running_loop().create_future()
+        self._answers[thread_id] = answer
+        await self.questions.put((thread_id, interrupt_data))
+        try:
+            return await answer
+        finally:
+            self._answers.pop(thread_id, None)
+
+    def answer(self, thread_id, value):
+        """Answer the question a run is waiting on.
+
+        Args:
+            thread_id (str): The run that asked
+            value: The value to resume the run with
+
+        Raises:
+            KeyError: If the run is not waiting for an answer
+        """
+        self._answers[thread_id].set_result(value)
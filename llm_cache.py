@@ -0,0 +1,163 @@
+"""
+Disk-backed cache of LLM responses.
+
+Plugs into LangChain's cache interface, so any chat model created with
+cache=get_llm_cache() looks up a response by its model, parameters and
+messages before calling the API. Entries are kept in SQLite, expire after a
+TTL, and the least recently used ones are evicted once the cache is full.
+Hits and misses are counted so the hit rate can be reported.
+
+Only deterministic-enough prompts should go through the cache: the agent
+uses it for metadata generation and terms negotiation, not for the
+tool-calling model.
+"""
+
+import os
+import time
+import sqlite3
+import hashlib
+import warnings
+import threading
+from contextlib import closing
+
+from langchain_core._api import LangChainBetaWarning
+from langchain_core.caches import BaseCache
+from langchain_core.load import dumps, loads
+
+# Default location of the cache database
+DEFAULT_CACHE_PATH = os.getenv(
+    "LLM_CACHE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "llm_cache.db"),
+)
+
+# Entries older than this many seconds are ignored and removed
+DEFAULT_TTL = float(os.getenv("LLM_CACHE_TTL", str(7 * 24 * 60 * 60)))
+
+# Most entries kept before the least recently used are evicted (0 disables the cache)
+DEFAULT_MAX_ENTRIES = int(os.getenv("LLM_CACHE_MAX_ENTRIES", "1000"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS llm_cache (
+    key TEXT PRIMARY KEY,
+    response TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL
+);
+CREATE INDEX IF NOT EXISTS llm_cache_lru ON llm_cache (last_used_at);
+"""
+
+
+class LLMResponseCache(BaseCache):
+    """SQLite-backed LangChain cache with LRU eviction and a TTL."""
+
+    def __init__(self, path=DEFAULT_CACHE_PATH, ttl=DEFAULT_TTL, max_entries=DEFAULT_MAX_ENTRIES):
+        """Open (and create if needed) the cache database.
+
+        Args:
+            path (str): Path to the SQLite database file
+            ttl (float): Seconds a response stays valid; 0 keeps responses forever
+            max_entries (int): Most responses kept
+        """
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.evictions = 0
+        self._stats_lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def _count(self, name, n=1):
+        with self._stats_lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def lookup(self, prompt, llm_string):
+        """Return the cached generations for a prompt, or None on a miss.
+
+        Args:
+            prompt (str): Serialized messages sent to the model
+            llm_string (str): Serialized model name and parameters
+
+        Returns:
+            list or None: The cached generations
+        """
+        key = _cache_key(prompt, llm_string)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute(
+                "SELECT response, created_at FROM llm_cache WHERE key = ?", (key,)
+            ).fetchone()
+            if row and self.ttl and now - row[1] > self.ttl:
+                conn.execute("DELETE FROM llm_cache WHERE key = ?", (key,))
+                row = None
+            if row:
+                conn.execute("UPDATE llm_cache SET last_used_at = ? WHERE key = ?", (now, key))
+
+        if row is None:
+            self._count("misses")
+            return None
+        self._count("hits")
+        with warnings.catch_warnings():
+            # loads is marked beta but is what LangChain's own caches use
+            warnings.simplefilter("ignore", LangChainBetaWarning)
+            return loads(row[0])
+
+    def update(self, prompt, llm_string, return_val):
+        """Store the generations for a prompt, evicting old entries if full.
+
+        Args:
+            prompt (str): Serialized messages sent to the model
+            llm_string (str): Serialized model name and parameters
+            return_val (list): Generations returned by the model
+        """
+        key = _cache_key(prompt, llm_string)
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO llm_cache (key, response, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, dumps(return_val), now, now),
+            )
+            evicted = conn.execute(
+                "DELETE FROM llm_cache WHERE key IN ("
+                "SELECT key FROM llm_cache ORDER BY last_used_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_entries,),
+            ).rowcount
+        if evicted:
+            self._count("evictions", evicted)
+
+    def clear(self, **kwargs):
+        """Remove every cached response."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM llm_cache")
+
+    def stats(self):
+        """Return hit, miss and eviction counts and the hit rate for this process."""
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def _cache_key(prompt, llm_string):
+    return hashlib.sha256(f"{llm_string}\n{prompt}".encode()).hexdigest()
+
+
+_llm_cache = None
+
+
+def get_llm_cache():
+    """Return the process-wide LLM response cache, or None if it is disabled."""
+    global _llm_cache
+    if _llm_cache is None and DEFAULT_MAX_ENTRIES > 0:
+        _llm_cache = LLMResponseCache()
+    return _llm_cache
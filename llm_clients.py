@@ -0,0 +1,144 @@
+"""
+Shared OpenAI clients for the agent.
+
+Every chat model and image generator the agent uses is created once per
+process and shares one pooled HTTP client (sync and async), so concurrent
+sessions reuse keep-alive connections and TLS sessions instead of opening a
+new connection for each request.
+
+The async HTTP client belongs to the event loop that first uses it, which
+is the single loop started by asyncio.run in agent.py.
+"""
+
+import os
+import threading
+
+import httpx
+import openai
+
+# Connection pool settings for the shared HTTP clients
+DEFAULT_MAX_CONNECTIONS = int(os.getenv("OPENAI_MAX_CONNECTIONS", "20"))
+DEFAULT_MAX_KEEPALIVE = int(os.getenv("OPENAI_MAX_KEEPALIVE", "10"))
+DEFAULT_KEEPALIVE_EXPIRY = float(os.getenv("OPENAI_KEEPALIVE_EXPIRY", "60"))
+
+
+class LLMClientRegistry:
+    """Process-wide cache of OpenAI clients sharing one connection pool."""
+
+    def __init__(self, max_connections=DEFAULT_MAX_CONNECTIONS,
+                 max_keepalive=DEFAULT_MAX_KEEPALIVE, keepalive_expiry=DEFAULT_KEEPALIVE_EXPIRY):
+        """Initialize the registry. HTTP clients are created on first use.
+
+        Args:
+            max_connections (int): Most open connections to the API
+            max_keepalive (int): Most idle connections kept open
+            keepalive_expiry (float): Seconds an idle connection is kept open
+        """
+        self.limits = httpx.Limits(
+            max_connections=max_connections,
+            max_keepalive_connections=max_keepalive,
+            keepalive_expiry=keepalive_expiry,
+        )
+        self._http_client = None
+        self._http_async_client = None
+        self._chat_models = {}
+        self._image_generators = {}
+        self._lock = threading.Lock()
+
+    @property
+    def http_client(self):
+        """Shared httpx.Client, with the OpenAI SDK's default timeouts."""
+        with self._lock:
+            if self._http_client is None:
+                self._http_client = openai.DefaultHttpxClient(limits=self.limits)
+            return self._http_client
+
+    @property
+    def http_async_client(self):
+        """Shared httpx.AsyncClient, with the OpenAI SDK's default timeouts."""
+        with self._lock:
+            if self._http_async_client is None:
+                self._http_async_client = openai.DefaultAsyncHttpxClient(limits=self.limits)
+            return self._http_async_client
+
+    def chat_model(self, model, **kwargs):
+        """Return the shared ChatOpenAI for a model and settings.
+
+        Args:
+            model (str): OpenAI model name, e.g. "gpt-4o-mini"
+            **kwargs: Other ChatOpenAI settings, e.g. temperature
+
+        Returns:
+            ChatOpenAI: A chat model using the shared connection pool
+        """
+        from langchain_openai import ChatOpenAI
+
+        key = (model, _settings_key(kwargs))
+        if key not in self._chat_models:
+            self._chat_models[key] = ChatOpenAI(
+                model=model,
+                http_client=self.http_client,
+                http_async_client=self.http_async_client,
+                **kwargs,
+            )
+        return self._chat_models[key]
+
+    def image_generator(self, **kwargs):
+        """Return the shared DALL-E wrapper for the given settings.
+
+        Args:
+            **kwargs: DallEAPIWrapper settings, e.g. model or size
+
+        Returns:
+            DallEAPIWrapper: An image generator using the shared connection pool
+        """
+        from langchain_community.utilities.dalle_image_generator import DallEAPIWrapper
+
+        key = _settings_key(kwargs)
+        if key not in self._image_generators:
+            # DallEAPIWrapper would hand one http_client to both its sync and
+            # async OpenAI clients, so the clients are built here instead
+            self._image_generators[key] = DallEAPIWrapper(
+                client=openai.OpenAI(http_client=self.http_client).images,
+                async_client=openai.AsyncOpenAI(http_client=self.http_async_client).images,
+                **kwargs,
+            )
+        return self._image_generators[key]
+
+    async def aclose(self):
+        """Close the shared HTTP clients and forget the cached models."""
+        with self._lock:
+            http_client, self._http_client = self._http_client, None
+            http_async_client, self._http_async_client = self._http_async_client, None
+            self._chat_models.clear()
+            self._image_generators.clear()
+        if http_client is not None:
+            http_client.close()
+        if http_async_client is not None:
+            await http_async_client.aclose()
+
+
+def _settings_key(settings):
+    """Hashable key for a dict of client settings."""
+    return tuple(sorted((name, repr(value)) for name, value in settings.items()))
+
+
+_registry = None
+
+
+def get_llm_clients():
+    """Return the process-wide client registry."""
+    global _registry
+    if _registry is None:
+        _registry = LLMClientRegistry()
+    return _registry
+
+
+def get_chat_model(model, **kwargs):
+    """Return the shared ChatOpenAI for a model, see LLMClientRegistry.chat_model."""
+    return get_llm_clients().chat_model(model, **kwargs)
+
+
+def get_image_generator(**kwargs):
+    """Return the shared DALL-E wrapper, see LLMClientRegistry.image_generator."""
+    return get_llm_clients().image_generator(**kwargs)
@@ -0,0 +1,227 @@
+"""
+Streaming uploads of local files to IPFS.
+
+Large local videos are sent straight to an IPFS pinning service with the
+tus resumable upload protocol (https://tus.io), which Pinata's upload API
+speaks, instead of handing a file:// path to the Story MCP server. The file
+is memory-mapped and sent in fixed-size chunks, so memory use stays at one
+chunk whatever the file size. The SHA-256 of the bytes is computed
+incrementally, with progress reported along the way.
+
+Each upload in progress is recorded under the file's SHA-256. If the
+process stops part way, the next upload of the same bytes asks the server
+how much it already has and sends only the rest.
+
+Direct uploads are used when IPFS_UPLOAD_URL is set; otherwise local files
+are uploaded by the MCP server as before.
+"""
+
+import os
+import time
+import mmap
+import base64
+import sqlite3
+import hashlib
+from contextlib import closing
+
+import httpx
+
+# tus endpoint for direct uploads, e.g. https://uploads.pinata.cloud/v3/files (empty disables them)
+IPFS_UPLOAD_URL = os.getenv("IPFS_UPLOAD_URL", "")
+
+# Bearer token for the upload endpoint
+IPFS_UPLOAD_TOKEN = os.getenv("IPFS_UPLOAD_TOKEN") or os.getenv("PINATA_JWT", "")
+
+# Bytes sent per request
+DEFAULT_CHUNK_BYTES = int(os.getenv("UPLOAD_CHUNK_BYTES", str(8 * 1024 * 1024)))
+
+# Largest local file accepted (0 for no limit)
+DEFAULT_MAX_UPLOAD_BYTES = int(os.getenv("MAX_UPLOAD_BYTES", str(100 * 1024 * 1024)))
+
+# Default location of the upload state database
+DEFAULT_STATE_PATH = os.getenv(
+    "UPLOAD_STATE_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "uploads.db"),
+)
+
+TUS_VERSION = "1.0.0"
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_uploads (
+    sha256 TEXT PRIMARY KEY,
+    location TEXT NOT NULL,
+    size INTEGER NOT NULL,
+    created_at REAL NOT NULL
+);
+"""
+
+
+class UploadError(Exception):
+    """The upload server rejected an upload or returned no CID."""
+
+
+def file_sha256(path, chunk_bytes=DEFAULT_CHUNK_BYTES, progress=None):
+    """Return the SHA-256 hex digest of a file, reading it chunk by chunk.
+
+    Args:
+        path (str): The file to hash
+        chunk_bytes (int): Bytes hashed per step
+        progress (callable): Called as progress("hashing", done, total)
+
+    Returns:
+        str: The hex digest
+    """
+    digest = hashlib.sha256()
+    size = os.path.getsize(path)
+    if size:
+        with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            view = memoryview(data)
+            try:
+                for offset in range(0, size, chunk_bytes):
+                    digest.update(view[offset:offset + chunk_bytes])
+                    if progress:
+                        progress("hashing", min(offset + chunk_bytes, size), size)
+            finally:
+                view.release()
+    return digest.hexdigest()
+
+
+class ResumableUploader:
+    """Uploads local files to a tus endpoint in chunks, resuming where they stopped."""
+
+    def __init__(self, url=IPFS_UPLOAD_URL, token=IPFS_UPLOAD_TOKEN,
+                 chunk_bytes=DEFAULT_CHUNK_BYTES, state_path=DEFAULT_STATE_PATH):
+        """Initialize the uploader.
+
+        Args:
+            url (str): The tus endpoint that creates uploads
+            token (str): Bearer token sent with every request
+            chunk_bytes (int): Bytes sent per request
+            state_path (str): SQLite database recording uploads in progress
+        """
+        self.url = url
+        self.token = token
+        self.chunk_bytes = chunk_bytes
+        self.state_path = state_path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.state_path, timeout=30)
+
+    def _headers(self, **extra):
+        headers = {"Tus-Resumable": TUS_VERSION, **extra}
+        if self.token:
+            headers["Authorization"] = f"Bearer {self.token}"
+        return headers
+
+    def upload(self, path, progress=None, sha256=None):
+        """Upload a file and return its IPFS URI.
+
+        Args:
+            path (str): The local file
+            progress (callable): Called as progress(stage, done, total), with
+                stage "hashing" and then "uploading"
+            sha256 (str): The file's SHA-256, if already known
+
+        Returns:
+            str: ipfs://<cid>
+
+        Raises:
+            UploadError: If the server rejects the upload or returns no CID
+        """
+        size = os.path.getsize(path)
+        sha256 = sha256 or file_sha256(path, self.chunk_bytes, progress)
+
+        with httpx.Client(timeout=httpx.Timeout(60, write=300)) as client:
+            location, offset = self._resume(client, sha256, size)
+            if location is None:
+                location = self._create(client, path, sha256, size)
+                offset = 0
+
+            response = None
+            if size:
+                with open(path, "rb") as f, mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as data:
+                    while offset < size:
+                        # One chunk is copied out of the mapping per request
+                        chunk = data[offset:offset + self.chunk_bytes]
+                        response = client.patch(
+                            location,
+                            content=chunk,
+                            headers=self._headers(**{
+                                "Upload-Offset": str(offset),
+                                "Content-Type": "application/offset+octet-stream",
+                            }),
+                        )
+                        _check(response, "Upload failed")
+                        offset = int(response.headers["Upload-Offset"])
+                        if progress:
+                            progress("uploading", offset, size)
+
+            if response is None:
+                # Nothing left to send: the server already has every byte
+                response = client.head(location, headers=self._headers())
+                _check(response, "Upload failed")
+
+        cid = response.headers.get("Upload-Cid")
+        if not cid:
+            raise UploadError(f"Upload of {path} finished but the server returned no CID")
+        with closing(self._connect()) as conn, conn:
+            conn.execute("DELETE FROM pending_uploads WHERE sha256 = ?", (sha256,))
+        return f"ipfs://{cid}"
+
+    def _resume(self, client, sha256, size):
+        """Return (location, offset) of an earlier upload of the same bytes, or (None, 0)."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT location FROM pending_uploads WHERE sha256 = ? AND size = ?", (sha256, size)
+            ).fetchone()
+        if row is None:
+            return None, 0
+
+        response = client.head(row[0], headers=self._headers())
+        if response.status_code != 200 or "Upload-Offset" not in response.headers:
+            # Expired or unknown on the server: start again
+            with closing(self._connect()) as conn, conn:
+                conn.execute("DELETE FROM pending_uploads WHERE sha256 = ?", (sha256,))
+            return None, 0
+        return row[0], int(response.headers["Upload-Offset"])
+
+    def _create(self, client, path, sha256, size):
+        """Create an upload on the server, record it and return its URL."""
+        metadata = {"filename": os.path.basename(path), "sha256": sha256}
+        response = client.post(
+            self.url,
+            headers=self._headers(**{
+                "Upload-Length": str(size),
+                "Upload-Metadata": ",".join(
+                    f"{key} {base64.b64encode(value.encode()).decode()}" for key, value in metadata.items()
+                ),
+            }),
+        )
+        _check(response, "Could not start upload")
+        location = str(response.url.join(response.headers["Location"]))
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO pending_uploads (sha256, location, size, created_at) "
+                "VALUES (?, ?, ?, ?)",
+                (sha256, location, size, time.time()),
+            )
+        return location
+
+
+def _check(response, message):
+    if response.status_code >= 400:
+        raise UploadError(f"{message}: HTTP {response.status_code} {response.text[:200]}")
+
+
+_uploader = None
+
+
+def get_uploader():
+    """Return the process-wide uploader, or None if direct uploads are disabled."""
+    global _uploader
+    if _uploader is None and IPFS_UPLOAD_URL:
+        _uploader = ResumableUploader()
+    return _uploader
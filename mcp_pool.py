@@ -0,0 +1,357 @@
+"""
+Shared, self-healing connection to the Story MCP server.
+
+The server is started once per process and its tools are shared by every
+graph and session. LangChain tools returned by get_tools() are bound to the
+pool rather than to one MCP session, so a restarted server is picked up
+without rebuilding the graph.
+
+MCP multiplexes requests over a connection, so concurrent tool calls from
+many threads share it. With MCP_POOL_SIZE above 1, several server processes
+are started and each call goes to the least busy one.
+
+A background check pings every connection and restarts the ones that stop
+answering. A connection that drops fails the calls it was carrying at once,
+rather than leaving them waiting forever; those calls are not re-sent, since
+the server may already have acted on them (e.g. minted). Calls made after a
+drop reconnect first.
+
+Set STORY_MCP_URL to use a Story MCP server that is already running with
+the SSE transport instead of starting one, so separate CLI sessions share a
+warm server.
+"""
+
+import os
+import asyncio
+
+from loguru import logger
+
+# Story MCP server script started over stdio
+STORY_MCP_SERVER = os.getenv("STORY_MCP_SERVER", "../story-sdk-mcp/server.py")
+
+# SSE endpoint of an already running Story MCP server, e.g. http://127.0.0.1:8000/sse (empty starts one)
+STORY_MCP_URL = os.getenv("STORY_MCP_URL", "")
+
+# Server connections kept open
+DEFAULT_POOL_SIZE = int(os.getenv("MCP_POOL_SIZE", "1"))
+
+# Seconds between health checks (0 disables them)
+DEFAULT_HEALTH_INTERVAL = float(os.getenv("MCP_HEALTH_INTERVAL", "30"))
+
+# Seconds a ping may take before the connection is restarted
+DEFAULT_PING_TIMEOUT = float(os.getenv("MCP_PING_TIMEOUT", "10"))
+
+
+class MCPConnectionLost(ConnectionError):
+    """The connection to the MCP server dropped before a call's result came back."""
+
+    def __init__(self, message, sent=True):
+        super().__init__(message)
+        # Whether the request reached the connection, i.e. may have run
+        self.sent = sent
+
+
+class MCPConnection:
+    """One MCP session, owned by a background task.
+
+    The transport's context managers must be entered and left in the same
+    task, so a dedicated task opens them, keeps them open until close() or
+    until the server goes away, and then closes them.
+    """
+
+    def __init__(self, command="python", args=None, url=STORY_MCP_URL):
+        """Initialize the connection without opening it.
+
+        Args:
+            command (str): Executable that starts the server
+            args (list): Arguments for the server command
+            url (str): SSE endpoint to connect to instead of starting a server
+        """
+        self.command = command
+        self.args = [STORY_MCP_SERVER] if args is None else args
+        self.url = url
+        self.session = None
+        self.in_flight = 0
+        self._task = None
+        self._lost = asyncio.Event()
+        self._closing = asyncio.Event()
+
+    @property
+    def alive(self):
+        return self.session is not None and not self._lost.is_set()
+
+    def _transport(self):
+        from mcp import StdioServerParameters
+        from mcp.client.sse import sse_client
+        from mcp.client.stdio import stdio_client
+
+        if self.url:
+            return sse_client(self.url)
+        return stdio_client(StdioServerParameters(command=self.command, args=self.args))
+
+    async def open(self):
+        """Start the server (or connect to it) and initialize the session.
+
+        Raises:
+            Exception: Whatever the transport or the MCP handshake raised
+        """
+        ready = asyncio.get_running_loop().create_future()
+        self._task = asyncio.create_task(self._run(ready))
+        await ready
+
+    async def _run(self, ready):
+        import anyio
+        from mcp import ClientSession
+
+        try:
+            async with self._transport() as (read_stream, write_stream):
+                # Messages pass through a relay so the end of the server's
+                # output is noticed: mcp leaves pending requests waiting otherwise
+                relay_send, relay_receive = anyio.create_memory_object_stream(0)
+                async with ClientSession(relay_receive, write_stream) as session:
+                    relay = asyncio.create_task(self._relay(read_stream, relay_send))
+                    try:
+                        await session.initialize()
+                        self.session = session
+                        ready.set_result(None)
+                        closing = asyncio.create_task(self._closing.wait())
+                        await asyncio.wait({relay, closing}, return_when=asyncio.FIRST_COMPLETED)
+                        closing.cancel()
+                    finally:
+                        self._lost.set()
+                        relay.cancel()
+        except Exception as e:
+            if not ready.done():
+                ready.set_exception(e)
+            else:
+                logger.warning(f"MCP connection closed with an error: {e}")
+        finally:
+            self._lost.set()
+            self.session = None
+            if not ready.done():
+                ready.set_exception(MCPConnectionLost("MCP server closed the connection during startup", sent=False))
+
+    async def _relay(self, read_stream, relay_send):
+        async with relay_send:
+            async for message in read_stream:
+                await relay_send.send(message)
+
+    async def call_tool(self, name, arguments):
+        """Call a tool, failing at once if the connection drops meanwhile.
+
+        Args:
+            name (str): Tool name
+            arguments (dict): Tool arguments
+
+        Returns:
+            CallToolResult: The server's result
+
+        Raises:
+            MCPConnectionLost: If the connection dropped before the result came
+        """
+        if not self.alive:
+            raise MCPConnectionLost(f"MCP connection is closed; {name} was not sent", sent=False)
+        self.in_flight += 1
+        call = asyncio.ensure_future(self.session.call_tool(name, arguments))
+        lost = asyncio.ensure_future(self._lost.wait())
+        try:
+            await asyncio.wait({call, lost}, return_when=asyncio.FIRST_COMPLETED)
+            if call.done():
+                return call.result()
+            raise MCPConnectionLost(f"MCP connection dropped while {name} was running; it may have completed")
+        finally:
+            self.in_flight -= 1
+            call.cancel()
+            lost.cancel()
+
+    async def ping(self, timeout=DEFAULT_PING_TIMEOUT):
+        """Return whether the server answers a ping within timeout seconds."""
+        if not self.alive:
+            return False
+        try:
+            await asyncio.wait_for(self.session.send_ping(), timeout)
+            return True
+        except Exception:
+            return False
+
+    def mark_lost(self):
+        """Treat the connection as dropped, e.g. after a failed ping."""
+        self._lost.set()
+
+    async def close(self):
+        """Close the session and stop the server process."""
+        self._closing.set()
+        if self._task is not None:
+            await asyncio.gather(self._task, return_exceptions=True)
+
+
+class MCPPool:
+    """A fixed number of MCP connections, reopened when they fail."""
+
+    def __init__(self, size=DEFAULT_POOL_SIZE, health_interval=DEFAULT_HEALTH_INTERVAL,
+                 connection_factory=MCPConnection):
+        """Initialize the pool. Connections are opened by start() or on first use,
+        and closed by aclose() or on leaving an `async with` block.
+
+        Args:
+            size (int): Connections kept open
+            health_interval (float): Seconds between health checks (0 disables them)
+            connection_factory (callable): Returns an unopened MCPConnection
+        """
+        self.size = max(1, size)
+        self.health_interval = health_interval
+        self.connection_factory = connection_factory
+        self.opened = 0
+        self.reopened = 0
+        self._slots = [None] * self.size
+        self._locks = [asyncio.Lock() for _ in range(self.size)]
+        self._tool_specs = None
+        self._health_task = None
+
+    async def start(self):
+        """Open every connection and start the health checks."""
+        await asyncio.gather(*(self._connection(slot) for slot in range(self.size)))
+        if self.health_interval and self._health_task is None:
+            self._health_task = asyncio.create_task(self._check_health())
+
+    async def _connection(self, slot):
+        """Return the connection in a slot, opening or reopening it if needed."""
+        connection = self._slots[slot]
+        if connection is not None and connection.alive:
+            return connection
+        async with self._locks[slot]:
+            connection = self._slots[slot]
+            if connection is not None and connection.alive:
+                return connection
+            if connection is not None:
+                logger.warning("MCP server connection lost, reconnecting")
+                await connection.close()
+                self.reopened += 1
+            connection = self.connection_factory()
+            await connection.open()
+            self._slots[slot] = connection
+            self.opened += 1
+            return connection
+
+    async def _least_busy(self):
+        slot = min(
+            range(self.size),
+            key=lambda i: (
+                self._slots[i] is None or not self._slots[i].alive,
+                self._slots[i].in_flight if self._slots[i] is not None else 0,
+            ),
+        )
+        return await self._connection(slot)
+
+    async def call_tool(self, name, arguments):
+        """Call a tool on the least busy connection.
+
+        Args:
+            name (str): Tool name
+            arguments (dict): Tool arguments
+
+        Returns:
+            CallToolResult: The server's result
+
+        Raises:
+            MCPConnectionLost: If the connection dropped while the call was in flight
+        """
+        connection = await self._least_busy()
+        try:
+            return await connection.call_tool(name, arguments)
+        except MCPConnectionLost as e:
+            if e.sent:
+                raise
+            # Dropped before this call was sent: nothing ran, so send it again
+            return await (await self._least_busy()).call_tool(name, arguments)
+
+    async def get_tools(self, names=None):
+        """Return LangChain tools that call the server through the pool.
+
+        Args:
+            names (list): Tool names to return (default: all)
+
+        Returns:
+            list[BaseTool]: The tools, in the server's order
+        """
+        if self._tool_specs is None:
+            connection = await self._least_busy()
+            self._tool_specs = (await connection.session.list_tools()).tools
+        return [
+            self._langchain_tool(spec)
+            for spec in self._tool_specs
+            if names is None or spec.name in names
+        ]
+
+    def _langchain_tool(self, spec):
+        from langchain_core.tools import StructuredTool
+
+        async def call_tool(**arguments):
+            return _tool_content(await self.call_tool(spec.name, arguments))
+
+        return StructuredTool(
+            name=spec.name,
+            description=spec.description or "",
+            args_schema=spec.inputSchema,
+            coroutine=call_tool,
+            response_format="content_and_artifact",
+        )
+
+    async def _check_health(self):
+        while True:
+            await asyncio.sleep(self.health_interval)
+            for slot, connection in enumerate(self._slots):
+                if connection is None or not await connection.ping():
+                    if connection is not None:
+                        connection.mark_lost()
+                    try:
+                        await self._connection(slot)
+                    except Exception as e:
+                        logger.warning(f"Could not reconnect to the MCP server: {e}")
+
+    def stats(self):
+        """Return the number of connections opened, reopened and currently alive."""
+        return {
+            "opened": self.opened,
+            "reopened": self.reopened,
+            "alive": sum(1 for connection in self._slots if connection is not None and connection.alive),
+        }
+
+    async def __aenter__(self):
+        return self
+
+    async def __aexit__(self, *exc_info):
+        await self.aclose()
+
+    async def aclose(self):
+        """Stop the health checks and close every connection."""
+        if self._health_task is not None:
+            self._health_task.cancel()
+            await asyncio.gather(self._health_task, return_exceptions=True)
+            self._health_task = None
+        await asyncio.gather(*(connection.close() for connection in self._slots if connection is not None))
+        self._slots = [None] * self.size
+
+
+def _tool_content(result):
+    """Return (content, artifact) for a CallToolResult, as langchain_mcp_adapters does."""
+    from mcp.types import TextContent
+    from langchain_core.tools import ToolException
+
+    texts = [content.text for content in result.content if isinstance(content, TextContent)]
+    others = [content for content in result.content if not isinstance(content, TextContent)]
+    content = texts[0] if len(texts) == 1 else texts
+    if result.isError:
+        raise ToolException(content)
+    return content, others or None
+
+
+_mcp_pool = None
+
+
+def get_mcp_pool():
+    """Return the process-wide MCP connection pool."""
+    global _mcp_pool
+    if _mcp_pool is None:
+        _mcp_pool = MCPPool()
+    return _mcp_pool
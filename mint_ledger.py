@@ -0,0 +1,334 @@
+#!/usr/bin/env python3
+"""
+Ledger and retry policy for minting IP assets.
+
+Minting costs gas, and sending the same mint twice registers the asset
+twice. Every mint is recorded under an idempotency key derived from the
+registration metadata hashes and the license terms, before it is sent:
+
+    pending   sent, outcome not seen yet (or never seen: the call timed out,
+              the connection dropped or the process stopped)
+    landed    the server returned the IP ID
+    failed    the server rejected it; nothing was minted
+
+MintRegisterIP claims the key before sending. A landed key returns the
+recorded result without minting again. A pending key is not sent again,
+because the earlier mint may still land: check the explorer, then resolve
+it with this script.
+
+Server errors are classified to decide what happens next: rejected
+derivative settings are retried with derivatives allowed, transient RPC
+errors are retried with exponential backoff, timeouts are left pending and
+anything else fails the mint.
+
+Example:
+    python mint_ledger.py list --status pending
+    python mint_ledger.py resolve <key> --ip-id 0x... --tx-hash 0x...   # it landed
+    python mint_ledger.py clear <key>                                   # it did not land
+"""
+
+import os
+import re
+import sys
+import json
+import time
+import random
+import sqlite3
+import hashlib
+import argparse
+from contextlib import closing
+
+# Default location of the ledger
+DEFAULT_LEDGER_PATH = os.getenv(
+    "MINT_LEDGER_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "mints.db"),
+)
+
+# Most times a mint is sent, retries included
+DEFAULT_MAX_ATTEMPTS = int(os.getenv("MINT_MAX_ATTEMPTS", "3"))
+
+# Backoff before the first retry, doubled for each one after, in seconds
+DEFAULT_RETRY_BASE_SECONDS = float(os.getenv("MINT_RETRY_BASE_SECONDS", "2"))
+
+# Longest backoff between retries, in seconds
+DEFAULT_RETRY_MAX_SECONDS = float(os.getenv("MINT_RETRY_MAX_SECONDS", "30"))
+
+# Seconds to wait for the server's answer before leaving the mint pending
+DEFAULT_ATTEMPT_TIMEOUT = float(os.getenv("MINT_ATTEMPT_TIMEOUT", "300"))
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS mint_attempts (
+    key TEXT PRIMARY KEY,
+    status TEXT NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    ip_id TEXT,
+    tx_hash TEXT,
+    result TEXT,
+    registration_metadata TEXT,
+    created_at REAL NOT NULL,
+    updated_at REAL NOT NULL
+);
+"""
+
+# Outcomes of a mint attempt
+LANDED = "landed"
+ADJUST = "adjust"
+UNKNOWN = "unknown"
+TRANSIENT = "transient"
+FATAL = "fatal"
+
+IP_ID_PATTERN = re.compile(r"IP ID: (0x[a-fA-F0-9]+)")
+TX_HASH_PATTERN = re.compile(r"Transaction Hash: ([a-fA-F0-9]+)")
+LICENSE_TERMS_PATTERN = re.compile(r"License Terms IDs: \[(.*?)\]")
+
+# Rejected before a transaction was sent; retried with derivatives allowed
+ADJUST_ERRORS = re.compile(r"Cannot add derivative attribution when derivative use is disabled")
+
+# The transaction may have been sent; it is not sent again
+UNKNOWN_ERRORS = re.compile(
+    r"timed? ?out|already known|not in the chain after|transaction receipt not found", re.IGNORECASE
+)
+
+# Nothing was minted and trying again later may work
+TRANSIENT_ERRORS = re.compile(
+    r"nonce too low|replacement transaction underpriced|rate limit|too many requests"
+    r"|\b(?:429|502|503|504)\b|connection (?:reset|refused|aborted)|temporarily unavailable",
+    re.IGNORECASE,
+)
+
+
+def mint_key(registration_metadata, commercial_rev_share, derivatives_allowed):
+    """Return the idempotency key for minting an asset, or None without metadata hashes.
+
+    The same content minted with other terms is a different mint, so the
+    terms are part of the key.
+
+    Args:
+        registration_metadata (dict): Metadata from create_ip_metadata
+        commercial_rev_share: Commercial revenue share, in percent
+        derivatives_allowed: Whether derivative works are allowed
+
+    Returns:
+        str or None: SHA-256 of the IP and NFT metadata hashes and the terms
+    """
+    ip_hash = (registration_metadata or {}).get("ip_metadata_hash", "").lower().removeprefix("0x")
+    nft_hash = (registration_metadata or {}).get("nft_metadata_hash", "").lower().removeprefix("0x")
+    if not ip_hash or not nft_hash:
+        return None
+    terms = f"{str(commercial_rev_share).strip()}:{str(derivatives_allowed).strip().lower()}"
+    return hashlib.sha256(f"{ip_hash}:{nft_hash}:{terms}".encode()).hexdigest()
+
+
+def parse_mint_result(result):
+    """Return (ip_id, tx_hash, license_terms_ids) from a mint tool result.
+
+    Values that are missing from the result are None (or an empty list).
+    """
+    ip_id_match = IP_ID_PATTERN.search(result)
+    tx_hash_match = TX_HASH_PATTERN.search(result)
+    license_terms_match = LICENSE_TERMS_PATTERN.search(result)
+    license_terms_ids = []
+    if license_terms_match:
+        license_terms_ids = [
+            int(term.strip()) for term in license_terms_match.group(1).split(",") if term.strip().isdigit()
+        ]
+    return (
+        ip_id_match.group(1) if ip_id_match else None,
+        tx_hash_match.group(1) if tx_hash_match else None,
+        license_terms_ids,
+    )
+
+
+def classify_mint_result(result):
+    """Return what a mint tool result means for the next attempt.
+
+    Returns:
+        str: LANDED, ADJUST, UNKNOWN, TRANSIENT or FATAL
+    """
+    if IP_ID_PATTERN.search(result):
+        return LANDED
+    if ADJUST_ERRORS.search(result):
+        return ADJUST
+    if UNKNOWN_ERRORS.search(result):
+        return UNKNOWN
+    if TRANSIENT_ERRORS.search(result):
+        return TRANSIENT
+    return FATAL
+
+
+class RetryPolicy:
+    """How often, and how far apart, failed mints are retried."""
+
+    def __init__(self, max_attempts=DEFAULT_MAX_ATTEMPTS, base_seconds=DEFAULT_RETRY_BASE_SECONDS,
+                 max_seconds=DEFAULT_RETRY_MAX_SECONDS, attempt_timeout=DEFAULT_ATTEMPT_TIMEOUT):
+        """Initialize the policy.
+
+        Args:
+            max_attempts (int): Most times a mint is sent
+            base_seconds (float): Backoff before the first retry
+            max_seconds (float): Longest backoff
+            attempt_timeout (float): Seconds to wait for one attempt's result
+        """
+        self.max_attempts = max_attempts
+        self.base_seconds = base_seconds
+        self.max_seconds = max_seconds
+        self.attempt_timeout = attempt_timeout
+
+    def delay(self, attempt):
+        """Return seconds to wait after failed attempt number `attempt` (from 1).
+
+        The backoff doubles each time, up to max_seconds, with jitter so
+        runs that failed together do not retry together.
+        """
+        backoff = min(self.max_seconds, self.base_seconds * 2 ** (attempt - 1))
+        return backoff / 2 + random.uniform(0, backoff / 2)
+
+
+class MintLedger:
+    """SQLite record of mint attempts by idempotency key."""
+
+    def __init__(self, path=DEFAULT_LEDGER_PATH):
+        """Open (and create if needed) the ledger.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def get(self, key):
+        """Return the record for a key as a dict, or None."""
+        with closing(self._connect()) as conn:
+            row = conn.execute("SELECT * FROM mint_attempts WHERE key = ?", (key,)).fetchone()
+        return dict(row) if row else None
+
+    def claim(self, key, registration_metadata=None):
+        """Mark a key pending before sending a mint for it.
+
+        Only new keys and keys whose last attempt failed can be claimed, so
+        two runs can never send the same mint at once.
+
+        Args:
+            key (str): Key from mint_key()
+            registration_metadata (dict): Stored for reference
+
+        Returns:
+            bool: Whether the mint may be sent
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT INTO mint_attempts (key, status, attempts, registration_metadata, created_at, updated_at) "
+                "VALUES (?, 'pending', 1, ?, ?, ?) "
+                "ON CONFLICT(key) DO UPDATE SET status = 'pending', attempts = attempts + 1, "
+                "ip_id = NULL, tx_hash = NULL, updated_at = ? "
+                "WHERE mint_attempts.status = 'failed'",
+                (key, json.dumps(registration_metadata), now, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def finish(self, key, status, result, ip_id=None, tx_hash=None):
+        """Record the outcome of an attempt.
+
+        Args:
+            key (str): Key from mint_key()
+            status (str): "landed", "failed", or "pending" if the outcome is unknown
+            result (str): The tool result or error
+            ip_id (str): The minted IP ID
+            tx_hash (str): The transaction hash, if known
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE mint_attempts SET status = ?, result = ?, ip_id = ?, tx_hash = ?, updated_at = ? "
+                "WHERE key = ?",
+                (status, result, ip_id, tx_hash, time.time(), key),
+            )
+
+    def resolve(self, key, ip_id, tx_hash=None, license_terms_ids=None):
+        """Mark a pending mint as landed, after checking it on the explorer.
+
+        The stored result is written in the mint tool's format, so the
+        next run for this asset picks it up as if the mint had just returned.
+        """
+        lines = [f"IP ID: {ip_id}"]
+        if tx_hash:
+            lines.append(f"Transaction Hash: {tx_hash.removeprefix('0x')}")
+        lines.append(f"License Terms IDs: [{', '.join(str(term) for term in license_terms_ids or [])}]")
+        self.finish(key, LANDED, "\n".join(lines), ip_id=ip_id, tx_hash=tx_hash and tx_hash.removeprefix("0x"))
+
+    def clear(self, key):
+        """Mark a pending mint as failed so it can be sent again."""
+        self.finish(key, "failed", "Cleared: the earlier mint did not land")
+
+    def list(self, status=None):
+        """Return records, newest first, optionally only those with a status."""
+        with closing(self._connect()) as conn:
+            if status:
+                rows = conn.execute(
+                    "SELECT * FROM mint_attempts WHERE status = ? ORDER BY updated_at DESC", (status,)
+                ).fetchall()
+            else:
+                rows = conn.execute("SELECT * FROM mint_attempts ORDER BY updated_at DESC").fetchall()
+        return [dict(row) for row in rows]
+
+
+_mint_ledger = None
+
+
+def get_mint_ledger():
+    """Return the process-wide mint ledger."""
+    global _mint_ledger
+    if _mint_ledger is None:
+        _mint_ledger = MintLedger()
+    return _mint_ledger
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    listing = commands.add_parser("list", help="show recorded mints")
+    listing.add_argument("--status", choices=["pending", "landed", "failed"], help="only mints with this status")
+    resolve = commands.add_parser("resolve", help="record that a pending mint landed")
+    resolve.add_argument("key")
+    resolve.add_argument("--ip-id", required=True, help="IP ID shown on the explorer")
+    resolve.add_argument("--tx-hash", help="transaction hash of the mint")
+    resolve.add_argument("--license-terms-ids", type=int, nargs="*", default=[], help="attached license terms")
+    clear = commands.add_parser("clear", help="record that a pending mint did not land, so it can be retried")
+    clear.add_argument("key")
+    args = parser.parse_args()
+
+    ledger = MintLedger()
+    if args.command == "list":
+        for record in ledger.list(args.status):
+            updated = time.strftime("%Y-%m-%d %H:%M", time.localtime(record["updated_at"]))
+            print(
+                f"{record['key']}  {record['status']:<8} attempts: {record['attempts']}  "
+                f"ip_id: {record['ip_id'] or '-'}  tx: {record['tx_hash'] or '-'}  {updated}"
+            )
+        return 0
+
+    record = ledger.get(args.key)
+    if record is None:
+        print(f"No mint recorded under {args.key}", file=sys.stderr)
+        return 1
+    if record["status"] != "pending":
+        print(f"Mint {args.key} is {record['status']}, not pending", file=sys.stderr)
+        return 1
+    if args.command == "resolve":
+        ledger.resolve(args.key, args.ip_id, args.tx_hash, args.license_terms_ids)
+        print(f"{args.key}: landed as {args.ip_id}")
+    else:
+        ledger.clear(args.key)
+        print(f"{args.key}: cleared, the next run will mint again")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,108 @@
+"""
+Background work started ahead of a human decision.
+
+While a run waits on a review interrupt, the work that follows an approval
+(IPFS upload, metadata generation, metadata creation) can start straight
+away. Each step runs as an asyncio task registered under the run's thread ID
+and a key. The node that would normally do the work takes the task's result
+instead. A rejection discards the tasks, as does the end of the run. Work
+that is never taken or discarded, e.g. for a run left waiting on a review,
+expires after SPECULATION_TTL_SECONDS.
+
+Tasks only make progress while the event loop is free, so the caller must
+wait for the reviewer's answer without blocking the loop.
+"""
+
+import os
+import time
+import asyncio
+
+from loguru import logger
+
+# Start upload and metadata work while content is being reviewed
+SPECULATIVE_REVIEW = os.getenv("SPECULATIVE_REVIEW", "").lower() in ("1", "true", "yes")
+
+# Seconds speculative work is kept before it is dropped unused
+DEFAULT_TTL = float(os.getenv("SPECULATION_TTL_SECONDS", "3600"))
+
+
+class SpeculativeResults:
+    """Speculative tasks, keyed by thread ID and step."""
+
+    def __init__(self, ttl=DEFAULT_TTL):
+        """Initialize the registry.
+
+        Args:
+            ttl (float): Seconds a task is kept before it is dropped unused
+        """
+        self.ttl = ttl
+        self._tasks = {}
+        self._started = {}
+
+    def start(self, thread_id, key, factory):
+        """Start factory() in the background unless it is already running.
+
+        Args:
+            thread_id (str): The run the work belongs to
+            key (tuple): Identifies the step and its input
+            factory (callable): Returns the coroutine to run
+
+        Returns:
+            asyncio.Task: The running (or finished) task
+        """
+        self.expire()
+        task = self._tasks.get((thread_id, key))
+        if task is None:
+            task = asyncio.create_task(factory())
+            # Failures are handled by whoever takes the result
+            task.add_done_callback(lambda t: t.cancelled() or t.exception())
+            self._tasks[(thread_id, key)] = task
+            self._started[(thread_id, key)] = time.monotonic()
+        return task
+
+    async def take(self, thread_id, key):
+        """Wait for and remove a speculative result.
+
+        Args:
+            thread_id (str): The run the work belongs to
+            key (tuple): Identifies the step and its input
+
+        Returns:
+            The task's result, or None if there was no task or it failed
+        """
+        task = self._tasks.pop((thread_id, key), None)
+        self._started.pop((thread_id, key), None)
+        if task is None:
+            return None
+        try:
+            return await task
+        except Exception as e:
+            logger.warning(f"Speculative {key[0]} failed, running it again: {e}")
+            return None
+
+    def discard(self, thread_id):
+        """Cancel and forget all speculative work for a run."""
+        for task_key in [k for k in self._tasks if k[0] == thread_id]:
+            self._drop(task_key)
+
+    def expire(self):
+        """Cancel and forget work started more than ttl seconds ago."""
+        cutoff = time.monotonic() - self.ttl
+        for task_key in [k for k, started in self._started.items() if started < cutoff]:
+            logger.info(f"Speculative {task_key[1][0]} for {task_key[0]} expired unused")
+            self._drop(task_key)
+
+    def _drop(self, task_key):
+        self._started.pop(task_key, None)
+        self._tasks.pop(task_key).cancel()
+
+
+_speculation = None
+
+
+def get_speculation():
+    """Return the process-wide speculative results."""
+    global _speculation
+    if _speculation is None:
+        _speculation = SpeculativeResults()
+    return _speculation
@@ -0,0 +1,97 @@
+"""
+Runs the agent's tool calls.
+
+Async tools (the Story MCP tools) are awaited on the event loop. Sync tools
+(generate_image, upload_local_file, generate_luma_video) run in a bounded
+thread pool, so they never block the loop. Each tool can also be capped at a
+number of calls in flight across the whole process, e.g. to stay under the
+image API's rate limit while many sessions share one process.
+
+RunTool and RunIPFSTool start all tool calls of an LLM turn at once, so a
+turn takes as long as its slowest call rather than the sum.
+"""
+
+import os
+import asyncio
+import contextvars
+from concurrent.futures import ThreadPoolExecutor
+
+# Threads for sync tools
+DEFAULT_TOOL_WORKERS = int(os.getenv("TOOL_WORKERS", "8"))
+
+# Most calls of a tool in flight at once, e.g. "generate_image=2,upload_image_to_ipfs=4".
+# Tools that are not listed are only limited by TOOL_WORKERS (sync) or not at all (async)
+DEFAULT_TOOL_CONCURRENCY = os.getenv("TOOL_CONCURRENCY", "generate_image=4,generate_luma_video=2")
+
+
+def parse_limits(spec):
+    """Parse "name=limit,..." into a dict of per-tool limits."""
+    limits = {}
+    for entry in spec.split(","):
+        if entry.strip():
+            name, limit = entry.split("=")
+            limits[name.strip()] = int(limit)
+    return limits
+
+
+class ToolRunner:
+    """Runs tools with a shared thread pool and per-tool concurrency caps."""
+
+    def __init__(self, max_workers=DEFAULT_TOOL_WORKERS, limits=None):
+        """Initialize the runner. The thread pool is created on first use.
+
+        Args:
+            max_workers (int): Threads for sync tools
+            limits (dict): Most calls in flight per tool name
+        """
+        self.max_workers = max_workers
+        self.limits = parse_limits(DEFAULT_TOOL_CONCURRENCY) if limits is None else limits
+        self._executor = None
+        self._semaphores = {}
+
+    @property
+    def executor(self):
+        if self._executor is None:
+            self._executor = ThreadPoolExecutor(self.max_workers, thread_name_prefix="tool")
+        return self._executor
+
+    def _semaphore(self, name):
+        if name in self.limits and name not in self._semaphores:
+            self._semaphores[name] = asyncio.Semaphore(self.limits[name])
+        return self._semaphores.get(name)
+
+    async def invoke(self, tool, args):
+        """Run a tool, waiting for a free slot if its cap is reached.
+
+        Args:
+            tool (BaseTool): The tool to run
+            args (dict): The tool's arguments
+
+        Returns:
+            The tool's result
+        """
+        semaphore = self._semaphore(tool.name)
+        if semaphore is None:
+            return await self._invoke(tool, args)
+        async with semaphore:
+            return await self._invoke(tool, args)
+
+    async def _invoke(self, tool, args):
+        if getattr(tool, "coroutine", None) is not None:
+            return await tool.ainvoke(args)
+        # Copy the context so LangChain callbacks still see the run
+        context = contextvars.copy_context()
+        return await asyncio.get_running_loop().run_in_executor(
+            self.executor, context.run, tool.invoke, args
+        )
+
+
+_tool_runner = None
+
+
+def get_tool_runner():
+    """Return the process-wide tool runner."""
+    global _tool_runner
+    if _tool_runner is None:
+        _tool_runner = ToolRunner()
+    return _tool_runner
@@ -0,0 +1,242 @@
+"""
+Media preprocessing for tweets.
+
+Fetches each image or video once, then produces a variant that fits
+Twitter's upload limits. Originals and variants are cached on disk by
+content hash, so reposts and outbox retries reuse the encoded bytes instead
+of downloading full-size DALL-E PNGs again.
+
+Images are resized and re-encoded with Pillow. If media can't be prepared,
+the tweet is posted without it.
+"""
+
+import os
+import io
+import json
+import shutil
+import hashlib
+import asyncio
+import tempfile
+import urllib.parse
+import urllib.request
+
+from PIL import Image
+
+# Default location of the media cache
+DEFAULT_CACHE_DIR = os.getenv(
+    "TWEET_MEDIA_CACHE",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), ".media_cache"),
+)
+
+# Twitter upload limits
+MAX_IMAGE_BYTES = 5 * 1024 * 1024
+MAX_IMAGE_DIMENSION = 4096
+MAX_VIDEO_BYTES = 512 * 1024 * 1024
+
+# Largest download we are willing to fetch
+MAX_DOWNLOAD_BYTES = MAX_VIDEO_BYTES
+
+IMAGE_TYPES = {
+    ".jpg": "image/jpeg",
+    ".jpeg": "image/jpeg",
+    ".png": "image/png",
+    ".gif": "image/gif",
+    ".webp": "image/webp",
+}
+VIDEO_TYPES = {
+    ".mp4": "video/mp4",
+    ".mov": "video/quicktime",
+}
+PIL_FORMATS = {"JPEG": ".jpg", "PNG": ".png", "GIF": ".gif", "WEBP": ".webp"}
+
+CHUNK_SIZE = 1024 * 1024
+
+
+class MediaCache:
+    """On-disk cache of fetched media and their tweet-ready variants."""
+
+    def __init__(self, cache_dir=DEFAULT_CACHE_DIR):
+        """Initialize the cache, creating its directories if needed.
+
+        Args:
+            cache_dir (str): Directory to keep cached files in
+        """
+        self.cache_dir = cache_dir
+        self.originals_dir = os.path.join(cache_dir, "originals")
+        self.variants_dir = os.path.join(cache_dir, "variants")
+        self.urls_dir = os.path.join(cache_dir, "urls")
+        for directory in (self.originals_dir, self.variants_dir, self.urls_dir):
+            os.makedirs(directory, exist_ok=True)
+
+    def prepare(self, url):
+        """Return a tweet-ready copy of the media at url.
+
+        Args:
+            url (str): http(s) URL, file:// URL or local path of the media
+
+        Returns:
+            dict or None: {"path", "media_type", "size"} of the cached
+            variant, or None if the media can't be made to fit Twitter's limits
+        """
+        original_path, digest, ext = self._fetch(url)
+
+        variant = self._cached_variant(digest)
+        if variant:
+            return variant
+
+        if ext in VIDEO_TYPES:
+            return self._prepare_video(original_path, digest, ext)
+        return self._prepare_image(original_path, digest, ext)
+
+    def _fetch(self, url):
+        """Fetch media once and return (path, sha256, extension) of the original."""
+        index_path = os.path.join(self.urls_dir, hashlib.sha256(url.encode()).hexdigest() + ".json")
+        if os.path.exists(index_path):
+            with open(index_path) as f:
+                entry = json.load(f)
+            if os.path.exists(entry["path"]):
+                return entry["path"], entry["sha256"], entry["ext"]
+
+        ext = _extension(url)
+        digest = hashlib.sha256()
+        size = 0
+        fd, temp_path = tempfile.mkstemp(dir=self.originals_dir)
+        try:
+            with os.fdopen(fd, "wb") as out, _open_source(url) as source:
+                while chunk := source.read(CHUNK_SIZE):
+                    size += len(chunk)
+                    if size > MAX_DOWNLOAD_BYTES:
+                        raise ValueError(f"Media at {url} is larger than {MAX_DOWNLOAD_BYTES} bytes")
+                    digest.update(chunk)
+                    out.write(chunk)
+
+            path = os.path.join(self.originals_dir, digest.hexdigest() + ext)
+            os.replace(temp_path, path)
+        except BaseException:
+            os.remove(temp_path)
+            raise
+
+        with open(index_path, "w") as f:
+            json.dump({"path": path, "sha256": digest.hexdigest(), "ext": ext}, f)
+        return path, digest.hexdigest(), ext
+
+    def _cached_variant(self, digest):
+        """Return a previously prepared variant for this content, if any."""
+        for ext, media_type in {**IMAGE_TYPES, **VIDEO_TYPES}.items():
+            path = os.path.join(self.variants_dir, digest + ext)
+            if os.path.exists(path):
+                return _describe(path, media_type)
+        return None
+
+    def _store_variant(self, digest, ext, data=None, source_path=None):
+        """Write a variant atomically and return its description."""
+        path = os.path.join(self.variants_dir, digest + ext)
+        media_type = {**IMAGE_TYPES, **VIDEO_TYPES}[ext]
+
+        # Unchanged originals are hard-linked rather than copied where possible
+        if source_path is not None:
+            try:
+                os.link(source_path, path)
+                return _describe(path, media_type)
+            except FileExistsError:
+                return _describe(path, media_type)
+            except OSError:
+                pass
+
+        fd, temp_path = tempfile.mkstemp(dir=self.variants_dir)
+        with os.fdopen(fd, "wb") as out:
+            if data is not None:
+                out.write(data)
+            else:
+                with open(source_path, "rb") as source:
+                    shutil.copyfileobj(source, out, CHUNK_SIZE)
+        os.replace(temp_path, path)
+        return _describe(path, media_type)
+
+    def _prepare_video(self, path, digest, ext):
+        # Transcoding needs ffmpeg, so only videos that already fit are used
+        if os.path.getsize(path) > MAX_VIDEO_BYTES:
+            return None
+        return self._store_variant(digest, ext, source_path=path)
+
+    def _prepare_image(self, path, digest, ext):
+        with Image.open(path) as image:
+            image_ext = PIL_FORMATS.get(image.format)
+            fits = (
+                image_ext is not None
+                and os.path.getsize(path) <= MAX_IMAGE_BYTES
+                and max(image.size) <= MAX_IMAGE_DIMENSION
+            )
+            if fits:
+                return self._store_variant(digest, image_ext, source_path=path)
+
+            image.thumbnail((MAX_IMAGE_DIMENSION, MAX_IMAGE_DIMENSION))
+
+            # Keep transparency as PNG if that fits, otherwise fall back to JPEG
+            if image.mode in ("RGBA", "LA", "P"):
+                data = _encode(image, "PNG", optimize=True)
+                if len(data) <= MAX_IMAGE_BYTES:
+                    return self._store_variant(digest, ".png", data=data)
+                image = image.convert("RGB")
+            elif image.mode != "RGB":
+                image = image.convert("RGB")
+
+            for quality in (90, 80, 70, 60, 50):
+                data = _encode(image, "JPEG", quality=quality, optimize=True)
+                if len(data) <= MAX_IMAGE_BYTES:
+                    return self._store_variant(digest, ".jpg", data=data)
+        return None
+
+
+def is_video_url(url):
+    """Return whether a URL or path names a video, judging by its extension."""
+    return _extension(url) in VIDEO_TYPES
+
+
+def _extension(url):
+    """Guess a media extension from a URL or path, defaulting to .png."""
+    path = urllib.parse.urlparse(url).path if "://" in url else url
+    ext = os.path.splitext(path)[1].lower()
+    return ext if ext in IMAGE_TYPES or ext in VIDEO_TYPES else ".png"
+
+
+def _open_source(url):
+    """Open a URL or local path for streaming reads."""
+    if url.startswith("file://"):
+        return open(url[len("file://"):], "rb")
+    if "://" not in url:
+        return open(url, "rb")
+    return urllib.request.urlopen(url, timeout=60)
+
+
+def _encode(image, image_format, **options):
+    buffer = io.BytesIO()
+    image.save(buffer, image_format, **options)
+    return buffer.getvalue()
+
+
+def _describe(path, media_type):
+    return {"path": path, "media_type": media_type, "size": os.path.getsize(path)}
+
+
+_media_cache = None
+
+
+def get_media_cache():
+    """Return the process-wide media cache."""
+    global _media_cache
+    if _media_cache is None:
+        _media_cache = MediaCache()
+    return _media_cache
+
+
+async def prepare_tweet_media(url):
+    """Fetch and prepare media for a tweet without blocking the event loop.
+
+    Args:
+        url (str): http(s) URL, file:// URL or local path of the media
+
+    Returns:
+        dict or None: Description of the tweet-ready file, see MediaCache.prepare
+    """
+    return await asyncio.to_thread(get_media_cache().prepare, url)
@@ -0,0 +1,503 @@
+"""
+Durable outbox for tweets announcing minted IP assets.
+
+PostToTwitter enqueues an announcement and returns straight away. A
+background dispatcher drains the outbox under a token-bucket rate limit,
+retrying failures with exponential backoff. Announcements are stored in
+SQLite and deduplicated by IP ID, so they survive restarts and a retried
+run never announces the same asset twice.
+
+An announcement is claimed ("posting") before it is sent. A post whose
+outcome is unknown, because the sidecar timed out or exited after handing
+the tweet to Twitter, is marked "unknown" and never retried, since it may
+already be live. So is one left in "posting" by a crash. Check those by
+hand before resetting them to "pending".
+"""
+
+import os
+import time
+import random
+import sqlite3
+import asyncio
+from contextlib import closing
+
+from twitter_client import post_ip_minted_tweet, post_mint_digest, render_mint_digest
+
+# Default location of the outbox database
+DEFAULT_OUTBOX_PATH = os.getenv(
+    "TWEET_OUTBOX_PATH",
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), "tweet_outbox.db"),
+)
+
+# Default rate limit: TWITTER_TWEETS_PER_WINDOW tweets per TWITTER_RATE_WINDOW seconds
+DEFAULT_TWEETS_PER_WINDOW = int(os.getenv("TWITTER_TWEETS_PER_WINDOW", "50"))
+DEFAULT_RATE_WINDOW = float(os.getenv("TWITTER_RATE_WINDOW", "900"))
+
+# Digest settings: with TWITTER_DIGEST_SIZE > 1, announcements are held for up
+# to TWITTER_DIGEST_WINDOW seconds and posted together as one digest or thread
+DEFAULT_DIGEST_SIZE = int(os.getenv("TWITTER_DIGEST_SIZE", "1"))
+DEFAULT_DIGEST_WINDOW = float(os.getenv("TWITTER_DIGEST_WINDOW", "60"))
+DEFAULT_DIGEST_MODE = os.getenv("TWITTER_DIGEST_MODE", "digest")
+
+# Retry settings
+DEFAULT_MAX_ATTEMPTS = 8
+BASE_BACKOFF = 5.0
+MAX_BACKOFF = 3600.0
+RATE_LIMIT_BACKOFF = 300.0
+
+# Error messages that mean Twitter is rate limiting us
+RATE_LIMIT_MARKERS = ("429", "rate limit", "too many requests")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS outbox (
+    ip_id TEXT PRIMARY KEY,
+    tx_hash TEXT NOT NULL,
+    image_url TEXT,
+    status TEXT NOT NULL DEFAULT 'pending',
+    attempts INTEGER NOT NULL DEFAULT 0,
+    next_attempt_at REAL NOT NULL,
+    last_error TEXT,
+    created_at REAL NOT NULL,
+    sent_at REAL,
+    thread_tweet_id TEXT
+);
+CREATE INDEX IF NOT EXISTS outbox_due ON outbox (status, next_attempt_at);
+"""
+
+
+class TokenBucket:
+    """Token-bucket rate limiter."""
+
+    def __init__(self, rate, capacity):
+        """Initialize a full bucket.
+
+        Args:
+            rate (float): Tokens added per second
+            capacity (int): Maximum number of tokens (burst size)
+        """
+        self.rate = rate
+        self.capacity = capacity
+        self.tokens = float(capacity)
+        self.updated_at = time.monotonic()
+
+    def _refill(self):
+        now = time.monotonic()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated_at) * self.rate)
+        self.updated_at = now
+
+    def delay(self):
+        """Return how many seconds until a token is available."""
+        self._refill()
+        if self.tokens >= 1:
+            return 0.0
+        return (1 - self.tokens) / self.rate
+
+    async def acquire(self):
+        """Wait for a token and take it."""
+        while (wait := self.delay()) > 0:
+            await asyncio.sleep(wait)
+        self.tokens -= 1
+
+    def drain(self):
+        """Empty the bucket, e.g. after Twitter reports a rate limit."""
+        self._refill()
+        self.tokens = 0.0
+
+
+class TweetOutbox:
+    """SQLite-backed queue of pending IP announcements."""
+
+    def __init__(self, path=DEFAULT_OUTBOX_PATH):
+        """Open (and create if needed) the outbox database.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = path
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+            columns = {row["name"] for row in conn.execute("PRAGMA table_info(outbox)")}
+            if "thread_tweet_id" not in columns:
+                # Outboxes created before threads could be continued
+                conn.execute("ALTER TABLE outbox ADD COLUMN thread_tweet_id TEXT")
+
+    def _connect(self):
+        conn = sqlite3.connect(self.path, timeout=30)
+        conn.row_factory = sqlite3.Row
+        return conn
+
+    def enqueue(self, ip_id, tx_hash, image_url=None):
+        """Add an announcement unless one for this IP ID already exists.
+
+        Args:
+            ip_id (str): The ID of the IP asset
+            tx_hash (str): The transaction hash of the minting transaction
+            image_url (str, optional): URL to an image to include in the tweet
+
+        Returns:
+            bool: True if the announcement was added, False if it was a duplicate
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "INSERT OR IGNORE INTO outbox (ip_id, tx_hash, image_url, next_attempt_at, created_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (ip_id, tx_hash, image_url, now, now),
+            )
+            return cursor.rowcount == 1
+
+    def due(self, limit=10):
+        """Return pending announcements whose next attempt is due."""
+        with closing(self._connect()) as conn:
+            return [
+                dict(row)
+                for row in conn.execute(
+                    "SELECT * FROM outbox WHERE status = 'pending' AND next_attempt_at <= ? "
+                    "ORDER BY next_attempt_at LIMIT ?",
+                    (time.time(), limit),
+                )
+            ]
+
+    def next_due_at(self):
+        """Return the time of the next pending attempt, or None if the outbox is empty."""
+        with closing(self._connect()) as conn:
+            row = conn.execute(
+                "SELECT MIN(next_attempt_at) FROM outbox WHERE status = 'pending'"
+            ).fetchone()
+            return row[0]
+
+    def claim(self, ip_id):
+        """Mark a pending announcement as being posted.
+
+        Args:
+            ip_id (str): The ID of the IP asset
+
+        Returns:
+            bool: True if it was claimed, False if it is no longer pending
+        """
+        with closing(self._connect()) as conn, conn:
+            cursor = conn.execute(
+                "UPDATE outbox SET status = 'posting' WHERE ip_id = ? AND status = 'pending'",
+                (ip_id,),
+            )
+            return cursor.rowcount == 1
+
+    def mark_sent(self, ip_id):
+        """Record that an announcement was posted."""
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'sent', sent_at = ?, last_error = NULL WHERE ip_id = ?",
+                (time.time(), ip_id),
+            )
+
+    def mark_failed(self, ip_id, error, retry_in=None, thread_tweet_id=None):
+        """Record a failed attempt.
+
+        Args:
+            ip_id (str): The ID of the IP asset
+            error (str): Error message from the attempt
+            retry_in (float, optional): Seconds until the next attempt; if
+                None the announcement is given up on
+            thread_tweet_id (str, optional): Tweet of a partly posted thread
+                that the retry continues from
+        """
+        with closing(self._connect()) as conn, conn:
+            if retry_in is None:
+                conn.execute(
+                    "UPDATE outbox SET status = 'failed', attempts = attempts + 1, last_error = ? "
+                    "WHERE ip_id = ?",
+                    (error, ip_id),
+                )
+            else:
+                conn.execute(
+                    "UPDATE outbox SET status = 'pending', attempts = attempts + 1, last_error = ?, "
+                    "next_attempt_at = ?, thread_tweet_id = ? WHERE ip_id = ?",
+                    (error, time.time() + retry_in, thread_tweet_id, ip_id),
+                )
+
+    def continue_thread(self, thread_tweet_id, last_tweet_id):
+        """Make pending leftovers of a thread reply to its newest tweet.
+
+        Args:
+            thread_tweet_id (str): Tweet the leftovers were going to reply to
+            last_tweet_id (str): Tweet the thread now ends with
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE outbox SET thread_tweet_id = ? WHERE thread_tweet_id = ? AND status = 'pending'",
+                (last_tweet_id, thread_tweet_id),
+            )
+
+    def mark_unknown(self, ip_id, error):
+        """Record an attempt that may have posted the tweet; it is not retried.
+
+        Args:
+            ip_id (str): The ID of the IP asset
+            error (str): Error message from the attempt
+        """
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "UPDATE outbox SET status = 'unknown', attempts = attempts + 1, last_error = ? "
+                "WHERE ip_id = ?",
+                (error, ip_id),
+            )
+
+    def stats(self):
+        """Return the number of announcements in each status."""
+        with closing(self._connect()) as conn:
+            return dict(conn.execute("SELECT status, COUNT(*) FROM outbox GROUP BY status").fetchall())
+
+
+class OutboxDispatcher:
+    """Background task that drains the outbox.
+
+    Outbox reads and writes run in a worker thread so SQLite never blocks
+    the event loop.
+    """
+
+    def __init__(self, outbox, post=post_ip_minted_tweet, bucket=None,
+                 max_attempts=DEFAULT_MAX_ATTEMPTS, poll_interval=30.0,
+                 post_digest=post_mint_digest, digest_size=DEFAULT_DIGEST_SIZE,
+                 digest_window=DEFAULT_DIGEST_WINDOW, digest_mode=DEFAULT_DIGEST_MODE):
+        """Initialize the dispatcher without starting it.
+
+        Args:
+            outbox (TweetOutbox): Outbox to drain
+            post (callable): Coroutine function taking (ip_id, tx_hash, image_url)
+                and returning a result dict with a "success" key, and
+                "unknown" set if a failed post may have gone out
+            bucket (TokenBucket, optional): Rate limiter; defaults to
+                TWITTER_TWEETS_PER_WINDOW per TWITTER_RATE_WINDOW
+            max_attempts (int): Attempts before an announcement is marked failed
+            poll_interval (float): Longest time to sleep between outbox checks
+            post_digest (callable): Coroutine function taking (mints, mode,
+                reply_to), used instead of post when announcements are batched
+            digest_size (int): Batch up to this many announcements per
+                digest; 1 posts each announcement on its own
+            digest_window (float): Longest time to hold an announcement
+                while waiting for a batch to fill up
+            digest_mode (str): "digest" or "thread"
+        """
+        self.outbox = outbox
+        self.post = post
+        self.post_digest = post_digest
+        self.digest_size = digest_size
+        self.digest_window = digest_window
+        self.digest_mode = digest_mode
+        self._flushing = False
+        self.bucket = bucket or TokenBucket(
+            DEFAULT_TWEETS_PER_WINDOW / DEFAULT_RATE_WINDOW, capacity=5
+        )
+        self.max_attempts = max_attempts
+        self.poll_interval = poll_interval
+        self._task = None
+        self._wakeup = None
+
+    @property
+    def running(self):
+        """Whether the dispatcher task is alive."""
+        return self._task is not None and not self._task.done()
+
+    def start(self):
+        """Start draining the outbox on the running event loop."""
+        if self.running and self._task.get_loop() is asyncio.get_running_loop():
+            return
+        self._wakeup = asyncio.Event()
+        self._task = asyncio.create_task(self._run())
+
+    def notify(self):
+        """Wake the dispatcher after something was enqueued."""
+        if self._wakeup is not None:
+            self._wakeup.set()
+
+    async def stop(self):
+        """Stop the dispatcher. Pending announcements stay in the outbox."""
+        if self._task is None:
+            return
+        self._task.cancel()
+        try:
+            await self._task
+        except asyncio.CancelledError:
+            pass
+        self._task = None
+
+    async def flush(self, timeout):
+        """Wait until nothing is due right now, or until timeout seconds pass.
+
+        Returns:
+            bool: True if the outbox has nothing left that is due
+        """
+        deadline = time.monotonic() + timeout
+        # Don't hold partial digests back while flushing
+        self._flushing = True
+        try:
+            while time.monotonic() < deadline:
+                next_due = await asyncio.to_thread(self.outbox.next_due_at)
+                if next_due is None or next_due > time.time():
+                    return True
+                self.notify()
+                await asyncio.sleep(0.1)
+            return False
+        finally:
+            self._flushing = False
+
+    async def _run(self):
+        while True:
+            hold_until = None
+            if self.digest_size > 1:
+                hold_until = await self._drain_digests()
+            else:
+                for item in await asyncio.to_thread(self.outbox.due):
+                    await self.bucket.acquire()
+                    await self._dispatch(item)
+
+            next_due = hold_until or await asyncio.to_thread(self.outbox.next_due_at)
+            sleep_for = self.poll_interval
+            if next_due is not None:
+                sleep_for = min(sleep_for, max(0.0, next_due - time.time()))
+
+            self._wakeup.clear()
+            try:
+                await asyncio.wait_for(self._wakeup.wait(), sleep_for)
+            except asyncio.TimeoutError:
+                pass
+
+    async def _drain_digests(self):
+        """Post due announcements in batches.
+
+        Returns:
+            float or None: Time until which a partial batch is being held
+        """
+        while True:
+            batch = await asyncio.to_thread(self.outbox.due, limit=self.digest_size)
+            if not batch:
+                return None
+            # Leftovers of a broken thread continue it, so a batch only
+            # mixes announcements that continue the same thread
+            thread_tweet_id = batch[0]["thread_tweet_id"]
+            batch = [item for item in batch if item["thread_tweet_id"] == thread_tweet_id]
+
+            hold_until = min(item["created_at"] for item in batch) + self.digest_window
+            if len(batch) < self.digest_size and hold_until > time.time() and not self._flushing:
+                return hold_until
+
+            # A digest may need several tweets; each one costs a token
+            mints = [{"ip_id": item["ip_id"], "tx_hash": item["tx_hash"]} for item in batch]
+            for _ in render_mint_digest(mints, self.digest_mode, header=thread_tweet_id is None):
+                await self.bucket.acquire()
+            await self._dispatch_digest(batch)
+
+    async def _dispatch_digest(self, batch):
+        batch = [item for item in batch if await asyncio.to_thread(self.outbox.claim, item["ip_id"])]
+        if not batch:
+            return
+        mints = [
+            {"ip_id": item["ip_id"], "tx_hash": item["tx_hash"], "content_url": item["image_url"]}
+            for item in batch
+        ]
+        try:
+            result = await self.post_digest(mints, self.digest_mode, batch[0]["thread_tweet_id"])
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        # Where a broken thread left off, so retries don't post a new header
+        thread_tweet_id = result.get("thread_tweet_id", batch[0]["thread_tweet_id"])
+        if batch[0]["thread_tweet_id"] not in (None, thread_tweet_id) and thread_tweet_id:
+            # Other leftovers of this thread follow on from what we just posted
+            await asyncio.to_thread(
+                self.outbox.continue_thread, batch[0]["thread_tweet_id"], thread_tweet_id
+            )
+
+        # Announcements that made it out are done even if a later tweet failed
+        posted = set(result.get("posted_ip_ids", []))
+        if result.get("success"):
+            posted = {item["ip_id"] for item in batch}
+        unknown = set(result.get("unknown_ip_ids", []))
+        for item in batch:
+            if item["ip_id"] in posted:
+                await asyncio.to_thread(self.outbox.mark_sent, item["ip_id"])
+            elif item["ip_id"] in unknown:
+                await self._record_unknown(item, result.get("error", "Unknown error"))
+            else:
+                await self._record_failure(item, result.get("error", "Unknown error"), thread_tweet_id)
+        if posted:
+            print(f"\n✅ Posted a Twitter digest about {len(posted)} minted IP asset(s).")
+
+    async def _dispatch(self, item):
+        if not await asyncio.to_thread(self.outbox.claim, item["ip_id"]):
+            return
+        try:
+            result = await self.post(item["ip_id"], item["tx_hash"], item["image_url"])
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+
+        if result.get("success"):
+            await asyncio.to_thread(self.outbox.mark_sent, item["ip_id"])
+            print(f"\n✅ Posted to Twitter about the minted IP asset (ID: {item['ip_id']}).")
+        elif result.get("unknown"):
+            await self._record_unknown(item, result.get("error", "Unknown error"))
+        else:
+            await self._record_failure(item, result.get("error", "Unknown error"))
+
+    async def _record_unknown(self, item, error):
+        """Stop retrying an announcement that may already be posted."""
+        await asyncio.to_thread(self.outbox.mark_unknown, item["ip_id"], error)
+        print(f"\n❌ Tweet for IP asset {item['ip_id']} may have been posted, not retrying: {error}")
+
+    async def _record_failure(self, item, error, thread_tweet_id=None):
+        """Schedule a retry with backoff, or give up after max_attempts."""
+        attempts = item["attempts"] + 1
+        if attempts >= self.max_attempts:
+            await asyncio.to_thread(self.outbox.mark_failed, item["ip_id"], error)
+            print(f"\n❌ Giving up on tweet for IP asset {item['ip_id']}: {error}")
+            return
+
+        backoff = min(MAX_BACKOFF, BASE_BACKOFF * 2 ** (attempts - 1))
+        if any(marker in error.lower() for marker in RATE_LIMIT_MARKERS):
+            self.bucket.drain()
+            backoff = max(backoff, RATE_LIMIT_BACKOFF)
+        # Jitter so a burst of failures doesn't retry in lockstep
+        backoff *= random.uniform(0.8, 1.2)
+        await asyncio.to_thread(
+            self.outbox.mark_failed, item["ip_id"], error, retry_in=backoff,
+            thread_tweet_id=thread_tweet_id,
+        )
+
+
+_outbox = None
+_dispatcher = None
+
+
+def get_outbox():
+    """Return the process-wide tweet outbox."""
+    global _outbox
+    if _outbox is None:
+        _outbox = TweetOutbox()
+    return _outbox
+
+
+def get_dispatcher():
+    """Return the process-wide dispatcher, started on the running loop."""
+    global _dispatcher
+    if _dispatcher is None:
+        _dispatcher = OutboxDispatcher(get_outbox())
+    _dispatcher.start()
+    return _dispatcher
+
+
+async def enqueue_ip_minted_tweet(ip_id, tx_hash, image_url=None):
+    """Queue a tweet announcing a newly minted IP asset.
+
+    The outbox write runs in a worker thread, off the event loop.
+
+    Args:
+        ip_id (str): The ID of the IP asset
+        tx_hash (str): The transaction hash of the minting transaction
+        image_url (str, optional): URL to an image to include in the tweet
+
+    Returns:
+        bool: True if queued, False if this IP ID was already queued or posted
+    """
+    queued = await asyncio.to_thread(get_outbox().enqueue, ip_id, tx_hash, image_url)
+    get_dispatcher().notify()
+    return queued
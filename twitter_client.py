@@ -6,9 +6,13 @@ import os
 import sys
 import asyncio
 import json
+import re
+import uuid
+from collections import deque
 from dotenv import load_dotenv
-import subprocess
-import time
+
+from media_info import media_summary, probe_mp4
+from tweet_media import is_video_url, prepare_tweet_media
 
 # Add the agent-twitter-client directory to the Python path
 sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'agent-twitter-client'))
@@ -16,11 +20,400 @@ sys.path.append(os.path.join(os.path.dirname(os.path.dirname(__file__)), 'agent-
 # Load environment variables
 load_dotenv()
 
+# Path to the long-lived Node.js sidecar script
+SIDECAR_SCRIPT = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'twitter_sidecar.js')
+
+# Default number of seconds to wait for a single sidecar request
+DEFAULT_REQUEST_TIMEOUT = float(os.getenv("TWITTER_POST_TIMEOUT", "60"))
+
+# Default number of requests the sidecar works on at once
+DEFAULT_MAX_CONCURRENCY = int(os.getenv("TWITTER_MAX_CONCURRENCY", "4"))
+
+# Twitter's weighted length limit; every URL counts as a t.co link
+MAX_TWEET_LENGTH = 280
+TCO_URL_LENGTH = 23
+URL_PATTERN = re.compile(r"https?://\S+")
+
+# Code point ranges Twitter counts as a single character; the rest count as two
+SINGLE_WEIGHT_RANGES = ((0, 4351), (8192, 8205), (8208, 8223), (8242, 8247))
+
+DIGEST_HASHTAGS = "#StoryProtocol #Web3 #IP #NFT"
+
+
+class TwitterSidecar:
+    """Long-lived Node.js process that posts tweets on our behalf.
+    
+    The sidecar logs in once and then takes requests over a JSON-lines
+    protocol on stdin/stdout. Each request carries an ID so several can be
+    in flight at once, up to max_concurrency; the rest wait their turn.
+    If the process dies it is restarted on the next request; requests that
+    were in flight when it died fail rather than being re-sent, so a crash
+    can never post the same tweet twice.
+    
+    The sidecar reports when a post starts sending. A post that times out
+    or loses its process after that point may have gone out, so its result
+    is marked "unknown" and must not be retried.
+    """
+    
+    def __init__(self, script_path=SIDECAR_SCRIPT, node_command="node",
+                 max_concurrency=DEFAULT_MAX_CONCURRENCY):
+        """Initialize the sidecar without starting it.
+        
+        Args:
+            script_path (str): Path to the sidecar JavaScript file
+            node_command (str): Node.js executable to run the script with
+            max_concurrency (int): Maximum number of requests in flight
+        """
+        self.script_path = script_path
+        self.node_command = node_command
+        self.max_concurrency = max_concurrency
+        self.restarts = 0
+        self._process = None
+        self._loop = None
+        self._reader_task = None
+        self._stderr_task = None
+        self._pending = {}
+        self._started = set()
+        self._stderr_tail = deque(maxlen=5)
+        self._start_lock = None
+        self._semaphore = None
+    
+    @property
+    def running(self):
+        """Whether the sidecar process is alive on the current event loop."""
+        return (
+            self._process is not None
+            and self._process.returncode is None
+            and self._loop is asyncio.get_running_loop()
+        )
+    
+    async def start(self):
+        """Start the sidecar process if it is not already running."""
+        loop = asyncio.get_running_loop()
+        if self._start_lock is None or self._loop is not loop:
+            # Futures and locks are bound to a loop, so a new loop (e.g. a
+            # second asyncio.run call) gets a fresh process
+            self._start_lock = asyncio.Lock()
+            self._semaphore = asyncio.Semaphore(self.max_concurrency)
+            self._process = None
+            self._loop = loop
+        
+        async with self._start_lock:
+            if self.running:
+                return
+            
+            if self._process is not None:
+                self.restarts += 1
+                print(f"Twitter sidecar exited, restarting (restart #{self.restarts})")
+            
+            self._stderr_tail.clear()
+            # Each process gets its own pending map, so an old process's
+            # reader can only fail the requests that were sent to it
+            self._pending = {}
+            self._process = await asyncio.create_subprocess_exec(
+                self.node_command,
+                self.script_path,
+                stdin=asyncio.subprocess.PIPE,
+                stdout=asyncio.subprocess.PIPE,
+                stderr=asyncio.subprocess.PIPE,
+                cwd=os.path.dirname(self.script_path),
+                env=os.environ.copy(),
+            )
+            self._reader_task = asyncio.create_task(
+                self._read_responses(self._process, self._pending)
+            )
+            self._stderr_task = asyncio.create_task(self._read_stderr(self._process))
+    
+    async def request(self, op, payload=None, timeout=DEFAULT_REQUEST_TIMEOUT):
+        """Send a request to the sidecar and wait for its response.
+        
+        The timeout is a deadline for the whole call, including time spent
+        waiting for a free concurrency slot. If the call times out or is
+        cancelled, the sidecar is told to drop the request if it has not
+        started posting yet.
+        
+        Args:
+            op (str): Operation name, e.g. "post" or "ping"
+            payload (dict, optional): Extra fields for the request
+            timeout (float): Seconds to wait for the response
+            
+        Returns:
+            dict: The response from the sidecar, without the request ID.
+                A failed post that may still have gone out has "unknown"
+                set to True.
+        """
+        request_id = uuid.uuid4().hex
+        try:
+            return await asyncio.wait_for(self._request(op, payload, request_id), timeout)
+        except asyncio.TimeoutError:
+            if request_id in self._started:
+                return {
+                    "success": False,
+                    "unknown": True,
+                    "error": f"Timed out after {timeout}s waiting for the Twitter sidecar "
+                             "after the tweet was sent; it may have been posted"
+                }
+            return {
+                "success": False,
+                "error": f"Timed out after {timeout}s waiting for the Twitter sidecar"
+            }
+        finally:
+            self._started.discard(request_id)
+    
+    async def _request(self, op, payload, request_id):
+        """Send a single request once a concurrency slot is free."""
+        await self.start()
+        
+        async with self._semaphore:
+            await self.start()
+            process = self._process
+            pending = self._pending
+            
+            future = asyncio.get_running_loop().create_future()
+            pending[request_id] = future
+            
+            try:
+                line = json.dumps({"id": request_id, "op": op, **(payload or {})})
+                process.stdin.write(line.encode() + b"\n")
+                await process.stdin.drain()
+                response = await future
+            except (BrokenPipeError, ConnectionResetError):
+                return {
+                    "success": False,
+                    "error": f"Twitter sidecar is not running: {self._stderr_summary()}"
+                }
+            finally:
+                pending.pop(request_id, None)
+                if future.cancelled() or not future.done():
+                    # Timed out or cancelled: ask the sidecar to skip it
+                    self._send_cancel(process, request_id)
+        
+        response.pop("id", None)
+        return response
+    
+    def _send_cancel(self, process, request_id):
+        """Tell the sidecar to drop a request it has not started yet."""
+        if process.returncode is not None or process.stdin.is_closing():
+            return
+        line = json.dumps({"id": uuid.uuid4().hex, "op": "cancel", "target": request_id})
+        process.stdin.write(line.encode() + b"\n")
+    
+    async def close(self):
+        """Stop the sidecar process."""
+        process = self._process
+        self._process = None
+        if process is None or process.returncode is not None:
+            return
+        
+        process.stdin.close()
+        try:
+            await asyncio.wait_for(process.wait(), 5)
+        except asyncio.TimeoutError:
+            process.kill()
+            await process.wait()
+    
+    async def _read_responses(self, process, pending):
+        """Resolve the requests sent to one sidecar process from its stdout.
+        
+        Args:
+            process (asyncio.subprocess.Process): The sidecar process
+            pending (dict): Futures for that process's requests, by request ID
+        """
+        while True:
+            line = await process.stdout.readline()
+            if not line:
+                break
+            try:
+                response = json.loads(line)
+            except json.JSONDecodeError:
+                # Not a protocol line, just a stray log message
+                continue
+            
+            future = pending.get(response.get("id"))
+            if future is None or future.done():
+                continue
+            if response.get("started"):
+                # Progress, not the response: the tweet is being sent
+                self._started.add(response["id"])
+            else:
+                future.set_result(response)
+        
+        # The process exited, so nothing in flight will ever be answered
+        await process.wait()
+        error = (
+            f"Twitter sidecar exited with code {process.returncode}: "
+            f"{self._stderr_summary()}"
+        )
+        for request_id, future in list(pending.items()):
+            if future.done():
+                continue
+            if request_id in self._started:
+                future.set_result({
+                    "success": False,
+                    "unknown": True,
+                    "error": f"{error}; the tweet was being sent and may have been posted",
+                })
+            else:
+                future.set_result({"success": False, "error": error})
+    
+    async def _read_stderr(self, process):
+        """Keep the last few stderr lines for error messages."""
+        while True:
+            line = await process.stderr.readline()
+            if not line:
+                break
+            self._stderr_tail.append(line.decode(errors="replace").rstrip())
+    
+    def _stderr_summary(self):
+        """Return the most recent stderr output as a single string."""
+        return " | ".join(self._stderr_tail) or "no output"
+
+
+async def video_summary(content_url):
+    """Return a short description of a video's length, size and codec, or None.
+
+    The video is fetched through the tweet media cache, so posting it
+    afterwards does not download it again.
+    """
+    try:
+        media = await prepare_tweet_media(content_url)
+        if not media or not media["media_type"].startswith("video/"):
+            return None
+        info = await asyncio.to_thread(probe_mp4, media["path"])
+    except Exception as e:
+        print(f"Warning: could not read video details from {content_url}: {str(e)}")
+        return None
+    return media_summary(info) if info else None
+
+
+def _summary_line(tweet_text, summary, hashtags):
+    """Return the video summary line, or "" if it would push the tweet over the limit."""
+    if not summary:
+        return ""
+    line = f"🎬 {summary}\n\n"
+    return line if tweet_length(tweet_text + line + hashtags) <= MAX_TWEET_LENGTH else ""
+
+
+def tweet_length(text):
+    """Return the length of text as Twitter counts it against the limit."""
+    length = 0
+    position = 0
+    for match in URL_PATTERN.finditer(text):
+        length += _weighted_length(text[position:match.start()]) + TCO_URL_LENGTH
+        position = match.end()
+    return length + _weighted_length(text[position:])
+
+
+def _weighted_length(text):
+    return sum(
+        1 if any(low <= ord(char) <= high for low, high in SINGLE_WEIGHT_RANGES) else 2
+        for char in text
+    )
+
+
+def _pack_lines(header, lines, footer=""):
+    """Pack lines into as few tweets as possible, each with header and footer.
+    
+    Returns:
+        list[list[int]]: Indexes into lines for each tweet
+    """
+    chunks = []
+    current = []
+    for index, line in enumerate(lines):
+        candidate = header + "\n".join([lines[i] for i in current] + [line]) + footer
+        if current and tweet_length(candidate) > MAX_TWEET_LENGTH:
+            chunks.append(current)
+            current = [index]
+        else:
+            current.append(index)
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _render_digest_chunks(mints, mode, header=True):
+    """Render a digest as (tweet text, IP IDs announced in it) pairs.
+    
+    With header=False a thread is rendered without its header tweet, for
+    continuing a thread whose header is already posted.
+    """
+    links = [f"https://aeneid.explorer.story.foundation/ipa/{mint['ip_id']}" for mint in mints]
+    
+    if mode == "thread" and (len(mints) > 1 or not header):
+        numbered = [f"{i}/{len(links)} {link}" for i, link in enumerate(links, 1)]
+        replies = [
+            ("\n".join(numbered[i] for i in chunk), [mints[i]["ip_id"] for i in chunk])
+            for chunk in _pack_lines("", numbered)
+        ]
+        if not header:
+            return replies
+        header_text = f"🎉 Just minted {len(mints)} new IP assets on Story Protocol! 🎉\n\n"
+        header_text += f"Explorer links below 🧵\n\n{DIGEST_HASHTAGS}"
+        return [(header_text, [])] + replies
+    
+    # Size the header for the largest possible count so packing stays valid
+    probe_header = f"🎉 Just minted {len(mints)} new IP assets on Story Protocol! 🎉\n\n"
+    footer = f"\n\n{DIGEST_HASHTAGS}"
+    rendered = []
+    for chunk in _pack_lines(probe_header, links, footer):
+        noun = "a new IP asset" if len(chunk) == 1 else f"{len(chunk)} new IP assets"
+        header = f"🎉 Just minted {noun} on Story Protocol! 🎉\n\n"
+        text = header + "\n".join(links[i] for i in chunk) + footer
+        rendered.append((text, [mints[i]["ip_id"] for i in chunk]))
+    return rendered
+
+
+def render_mint_digest(mints, mode="digest", header=True):
+    """Render minted IP assets as digest tweets or a thread.
+    
+    Args:
+        mints (list[dict]): Minted assets, each with "ip_id" and "tx_hash"
+        mode (str): "digest" for standalone tweets that each list as many
+            explorer links as fit, or "thread" for a header tweet followed
+            by replies of explorer links
+        header (bool): Whether a thread starts with its header tweet
+            
+    Returns:
+        list[str]: Tweet texts, each within Twitter's length limit
+    """
+    return [text for text, _ in _render_digest_chunks(mints, mode, header)]
+
+
+def _post_error(result):
+    """Turn a failed sidecar response into a post_tweet error result."""
+    error = {
+        "success": False,
+        "error": f"Error posting tweet: {result.get('error', 'Unknown error')}"
+    }
+    if result.get("unknown"):
+        error["unknown"] = True
+    return error
+
+
+_shared_sidecar = None
+
+
+def get_sidecar():
+    """Return the process-wide Twitter sidecar, creating it if needed."""
+    global _shared_sidecar
+    if _shared_sidecar is None:
+        _shared_sidecar = TwitterSidecar()
+    return _shared_sidecar
+
+
 class TwitterClient:
     """Twitter client for posting tweets."""
     
-    def __init__(self):
-        """Initialize the Twitter client."""
+    def __init__(self, sidecar=None, timeout=DEFAULT_REQUEST_TIMEOUT):
+        """Initialize the Twitter client.
+        
+        Args:
+            sidecar (TwitterSidecar, optional): Sidecar to post through;
+                defaults to the shared process-wide sidecar
+            timeout (float, optional): Seconds to wait for each post
+        """
+        self.sidecar = sidecar or get_sidecar()
+        self.timeout = timeout
         self.username = os.getenv("TWITTER_USERNAME")
         self.password = os.getenv("TWITTER_PASSWORD")
         self.email = os.getenv("TWITTER_EMAIL")
@@ -33,112 +426,48 @@ class TwitterClient:
         if not all([self.username, self.password, self.email]):
             print("Warning: Twitter credentials not fully configured in .env file")
     
-    async def post_tweet(self, tweet_text, image_url=None):
+    async def post_tweet(self, tweet_text, image_url=None, timeout=None):
         """Post a tweet to Twitter using the agent-twitter-client library.
         
+        The tweet is sent to the shared Node.js sidecar, which keeps a
+        logged-in Scraper around between posts. This never blocks the event
+        loop, and cancelling the calling task stops the post if the sidecar
+        has not started sending it yet. Media is fetched and resized once
+        and cached; if it can't be prepared the tweet is posted without it.
+        
         Args:
             tweet_text (str): The text content of the tweet
             image_url (str, optional): URL to an image to include in the tweet
+            timeout (float, optional): Deadline in seconds for this post;
+                defaults to the client's timeout
             
         Returns:
             dict: Result of the tweet operation
                 - success (bool): Whether the tweet was posted successfully
                 - message (str): Success or error message
+                - unknown (bool): Set on failures where the tweet may have
+                  been posted anyway; these must not be retried
         """
         try:
-            # Create a temporary script to post the tweet
-            temp_script_path = os.path.join(os.path.dirname(__file__), f'temp_tweet_{int(time.time())}.js')
-            
-            try:
-                # Write the Node.js script content
-                with open(temp_script_path, 'w') as f:
-                    f.write("""
-                    const { Scraper } = require('../agent-twitter-client/dist/node/cjs/index.cjs');
-                    
-                    async function postTweet() {
-                        try {
-                            const scraper = new Scraper();
-                            
-                            // Login with credentials
-                            await scraper.login(
-                                process.env.TWITTER_USERNAME,
-                                process.env.TWITTER_PASSWORD,
-                                process.env.TWITTER_EMAIL
-                            );
-                            
-                            console.log('Logged in successfully');
-                            
-                            // Post the tweet
-                            const tweetText = process.argv[2];
-                            const imageUrl = process.argv[3] !== 'null' ? process.argv[3] : undefined;
-                            
-                            console.log(`Posting tweet: ${tweetText}`);
-                            if (imageUrl) {
-                                console.log(`With image: ${imageUrl}`);
-                            }
-                            
-                            // Send the tweet
-                            const result = await scraper.sendTweet(tweetText);
-                            
-                            // Return the result - note that sendTweet doesn't return tweet ID
-                            // We'll just indicate success
-                            console.log(JSON.stringify({
-                                success: true,
-                                message: "Tweet posted successfully"
-                            }));
-                            
-                            process.exit(0);
-                        } catch (error) {
-                            console.error('Error posting tweet:', error.message);
-                            console.log(JSON.stringify({
-                                success: false,
-                                error: error.message
-                            }));
-                            process.exit(1);
-                        }
-                    }
-                    
-                    postTweet();
-                    """)
-                
-                # Run the Node.js script
-                result = subprocess.run(
-                    ["node", temp_script_path, tweet_text, str(image_url) if image_url else "null"],
-                    capture_output=True,
-                    text=True,
-                    env=os.environ.copy()
-                )
-                
-                # Parse the output
-                output_lines = result.stdout.strip().split('\n')
-                for line in output_lines:
-                    try:
-                        # Try to parse as JSON
-                        data = json.loads(line)
-                        if 'success' in data:
-                            return data
-                    except json.JSONDecodeError:
-                        # Not a JSON line, just a log message
-                        continue
-                
-                # If we couldn't parse any JSON, check the return code
-                if result.returncode != 0:
-                    return {
-                        "success": False,
-                        "error": f"Error posting tweet: {result.stderr}"
-                    }
-                
-                return {
-                    "success": True,
-                    "message": "Tweet posted successfully"
-                }
-                    
-            finally:
-                # Clean up the temporary script
+            payload = {"text": tweet_text, "image_url": image_url}
+            if image_url:
                 try:
-                    os.remove(temp_script_path)
-                except:
-                    pass
+                    media = await prepare_tweet_media(image_url)
+                except Exception as e:
+                    media = None
+                    print(f"Warning: could not fetch tweet media {image_url}: {str(e)}")
+                if media:
+                    payload["media_path"] = media["path"]
+                    payload["media_type"] = media["media_type"]
+            
+            result = await self.sidecar.request(
+                "post",
+                payload,
+                timeout=timeout or self.timeout,
+            )
+            if not result.get("success"):
+                return _post_error(result)
+            return result
         
         except Exception as e:
             return {
@@ -146,7 +475,112 @@ class TwitterClient:
                 "error": f"Error posting tweet: {str(e)}"
             }
 
-    async def post_ip_minted_tweet(self, ip_id, tx_hash, content_url=None, content_type="image"):
+    async def post_many(self, tweets, timeout=None):
+        """Post several tweets concurrently.
+        
+        Concurrency is bounded by the sidecar, so large batches queue up
+        instead of flooding Twitter.
+        
+        Args:
+            tweets (list): Items to post. Each item is either the tweet text,
+                a dict of post_tweet arguments ("tweet_text", "image_url"),
+                or a dict of post_ip_minted_tweet arguments (with "ip_id")
+            timeout (float, optional): Deadline in seconds for each post
+            
+        Returns:
+            list[dict]: One result per item, in the same order as tweets
+        """
+        async def post_one(item):
+            if isinstance(item, str):
+                return await self.post_tweet(item, timeout=timeout)
+            if "ip_id" in item:
+                return await self.post_ip_minted_tweet(**item, timeout=timeout)
+            return await self.post_tweet(**item, timeout=timeout)
+        
+        results = await asyncio.gather(
+            *(post_one(item) for item in tweets), return_exceptions=True
+        )
+        return [
+            {"success": False, "error": f"Error posting tweet: {str(result)}"}
+            if isinstance(result, Exception) else result
+            for result in results
+        ]
+
+    async def _post_reply(self, tweet_text, image_url, reply_to, timeout):
+        """Post a tweet, optionally as a reply."""
+        if reply_to is None:
+            return await self.post_tweet(tweet_text, image_url, timeout=timeout)
+        try:
+            result = await self.sidecar.request(
+                "post",
+                {"text": tweet_text, "reply_to": reply_to},
+                timeout=timeout or self.timeout,
+            )
+        except Exception as e:
+            result = {"success": False, "error": str(e)}
+        if not result.get("success"):
+            return _post_error(result)
+        return result
+
+    async def post_mint_digest(self, mints, mode="digest", timeout=None, reply_to=None):
+        """Post one digest (or thread) announcing several minted IP assets.
+        
+        Batching announcements into digests is up to the caller; the tweet
+        outbox does it for the agent.
+        
+        Args:
+            mints (list[dict]): Minted assets, each with "ip_id", "tx_hash"
+                and optionally "content_url"; the first asset's content is
+                attached to the first tweet
+            mode (str, optional): "digest" or "thread", see render_mint_digest
+            timeout (float, optional): Deadline in seconds for each post
+            reply_to (str, optional): In thread mode, a tweet of an earlier
+                thread to continue from instead of posting a new header,
+                e.g. the thread_tweet_id of a partial failure
+            
+        Returns:
+            dict: Result of the digest operation
+                - success (bool): Whether every tweet was posted
+                - message (str): Success or error message
+                - posted (int): Number of tweets posted
+                - posted_ip_ids (list[str]): IP IDs whose links were posted,
+                  so a partial failure can be retried without repeats
+                - unknown_ip_ids (list[str]): IP IDs in a tweet whose outcome
+                  is unknown, which must not be retried
+                - thread_tweet_id (str or None): In thread mode, the last
+                  tweet of the thread, for continuing it after a failure
+        """
+        if mode != "thread":
+            reply_to = None
+        chunks = _render_digest_chunks(mints, mode, header=reply_to is None)
+        image_url = next((m.get("content_url") for m in mints if m.get("content_url")), None)
+        
+        posted_ip_ids = []
+        for index, (text, ip_ids) in enumerate(chunks):
+            result = await self._post_reply(
+                text, image_url if index == 0 else None, reply_to, timeout
+            )
+            if not result.get("success"):
+                result["posted"] = index
+                result["posted_ip_ids"] = posted_ip_ids
+                result["unknown_ip_ids"] = ip_ids if result.get("unknown") else []
+                result["thread_tweet_id"] = reply_to
+                return result
+            posted_ip_ids.extend(ip_ids)
+            if mode == "thread":
+                # If Twitter didn't give us an ID the rest are posted standalone
+                reply_to = result.get("tweet_id")
+        
+        return {
+            "success": True,
+            "message": f"Posted {len(chunks)} tweet(s) about {len(mints)} IP assets",
+            "posted": len(chunks),
+            "posted_ip_ids": posted_ip_ids,
+            "unknown_ip_ids": [],
+            "thread_tweet_id": reply_to,
+        }
+
+    async def post_ip_minted_tweet(self, ip_id, tx_hash, content_url=None, content_type="image", timeout=None):
         """
         Post a tweet announcing a newly minted IP asset.
         
@@ -155,6 +589,7 @@ class TwitterClient:
             tx_hash (str): The transaction hash of the minting transaction
             content_url (str, optional): URL to the content to include in the tweet
             content_type (str, optional): Type of content ("image" or "video")
+            timeout (float, optional): Deadline in seconds for the post
             
         Returns:
             dict: Result of the tweet operation
@@ -168,12 +603,14 @@ class TwitterClient:
         
         # Add appropriate hashtags based on content type
         if content_type == "video":
+            summary = await video_summary(content_url) if content_url else None
+            tweet_text += _summary_line(tweet_text, summary, "#StoryProtocol #Web3 #IP #Video #NFT")
             tweet_text += "#StoryProtocol #Web3 #IP #Video #NFT"
         else:
             tweet_text += "#StoryProtocol #Web3 #IP #NFT"
         
         # Post the tweet
-        result = await self.post_tweet(tweet_text, content_url)
+        result = await self.post_tweet(tweet_text, content_url, timeout=timeout)
         
         return result
 
@@ -195,7 +632,15 @@ async def post_ip_minted_tweet(ip_id, tx_hash, image_url=None):
     tweet_text += f"Transaction: {tx_hash[:8]}...{tx_hash[-6:]}\n\n"
     tweet_text += f"View on Explorer: https://aeneid.explorer.story.foundation/ipa/{ip_id}\n"
     tweet_text += f"View on StoryScan: https://aeneid.storyscan.xyz/tx/{tx_hash}\n\n"
-    tweet_text += "#StoryProtocol #Web3 #IP #NFT"
+    
+    # Videos get their length, size and codec and the #Video tag; only
+    # video URLs are probed, so images aren't fetched just to be skipped
+    summary = await video_summary(image_url) if image_url and is_video_url(image_url) else None
+    if summary:
+        tweet_text += _summary_line(tweet_text, summary, "#StoryProtocol #Web3 #IP #Video #NFT")
+        tweet_text += "#StoryProtocol #Web3 #IP #Video #NFT"
+    else:
+        tweet_text += "#StoryProtocol #Web3 #IP #NFT"
     
     # Create a Twitter client
     client = TwitterClient()
@@ -204,3 +649,21 @@ async def post_ip_minted_tweet(ip_id, tx_hash, image_url=None):
     result = await client.post_tweet(tweet_text, image_url)
     
     return result
+
+
+async def post_mint_digest(mints, mode="digest", reply_to=None):
+    """
+    Post a digest (or thread) announcing several newly minted IP assets.
+    
+    Args:
+        mints (list[dict]): Minted assets, each with "ip_id", "tx_hash" and
+            optionally "content_url"
+        mode (str, optional): "digest" or "thread"
+        reply_to (str, optional): In thread mode, a tweet to continue the
+            thread from instead of posting a new header
+        
+    Returns:
+        dict: Result of the digest operation, see TwitterClient.post_mint_digest
+    """
+    client = TwitterClient()
+    return await client.post_mint_digest(mints, mode=mode, reply_to=reply_to)
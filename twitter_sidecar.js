@@ -0,0 +1,248 @@
+/*
+ * Long-lived Twitter sidecar for twitter_client.py.
+ *
+ * Logs the Scraper in once and then serves requests over a JSON-lines
+ * protocol: one request object per line on stdin, one response object per
+ * line on stdout. stdout is reserved for protocol messages; all logging goes
+ * to stderr.
+ *
+ * Request:  {"id": "<request id>", "op": "post", "text": "...", "image_url": null,
+ *            "media_path": "<prepared file>", "media_type": "image/png",
+ *            "reply_to": "<tweet id>"}
+ *           {"id": "<request id>", "op": "ping"}
+ *           {"id": "<request id>", "op": "cancel", "target": "<request id>"}
+ * Response: {"id": "<request id>", "success": true, "message": "...", "tweet_id": "..."}
+ *           {"id": "<request id>", "success": false, "error": "..."}
+ *
+ * A post also sends {"id": "<request id>", "started": true} right before it
+ * hands the tweet to Twitter. If no response follows, e.g. because the
+ * Python side timed out or we crashed, the tweet may or may not have been
+ * posted; without it, the tweet was never sent.
+ *
+ * Session cookies are cached on disk per account (TWITTER_SESSION_DIR,
+ * default .twitter_sessions/) and reused until TWITTER_SESSION_TTL seconds
+ * have passed, so a restart does not have to log in again. Cached sessions
+ * are not checked up front: a post that fails with an auth error drops the
+ * cache, logs in once and retries.
+ */
+
+const fs = require('fs');
+const path = require('path');
+const readline = require('readline');
+// TWITTER_SCRAPER_MODULE swaps in another Scraper, e.g. fake_twitter_scraper.js
+const { Scraper } = require(
+    process.env.TWITTER_SCRAPER_MODULE
+        ? path.resolve(process.env.TWITTER_SCRAPER_MODULE)
+        : '../agent-twitter-client/dist/node/cjs/index.cjs'
+);
+
+const SESSION_DIR = process.env.TWITTER_SESSION_DIR || path.join(__dirname, '.twitter_sessions');
+const SESSION_TTL_MS = Number(process.env.TWITTER_SESSION_TTL || 7 * 24 * 60 * 60) * 1000;
+// Errors that mean the session is no longer valid. 403 is left out: Twitter
+// also uses it for rejected content, e.g. duplicate tweets or locked actions
+const AUTH_ERROR = /\b401\b|unauthori[sz]ed|authenticat|not logged in|login required/i;
+
+const scraper = new Scraper();
+let loginPromise = null;
+let sessionSource = null;
+
+// Post requests we are working on, and those the Python side gave up on
+// before we started sending them
+const inFlight = new Set();
+const cancelled = new Set();
+
+function log(...args) {
+    console.error('[twitter_sidecar]', ...args);
+}
+
+function send(response) {
+    process.stdout.write(JSON.stringify(response) + '\n');
+}
+
+function sessionPath() {
+    const account = (process.env.TWITTER_USERNAME || 'default').replace(/[^A-Za-z0-9_.-]/g, '_');
+    return path.join(SESSION_DIR, `${account}.json`);
+}
+
+async function loadSession() {
+    let session;
+    try {
+        session = JSON.parse(fs.readFileSync(sessionPath(), 'utf8'));
+    } catch (error) {
+        return false;
+    }
+
+    if (!Array.isArray(session.cookies) || Date.now() - session.saved_at > SESSION_TTL_MS) {
+        log('Cached session expired');
+        return false;
+    }
+
+    await scraper.setCookies(session.cookies);
+    return true;
+}
+
+async function saveSession() {
+    const cookies = (await scraper.getCookies()).map((cookie) => cookie.toString());
+    fs.mkdirSync(SESSION_DIR, { recursive: true, mode: 0o700 });
+    fs.writeFileSync(
+        sessionPath(),
+        JSON.stringify({ saved_at: Date.now(), cookies }),
+        { mode: 0o600 }
+    );
+}
+
+function dropSession() {
+    try {
+        fs.unlinkSync(sessionPath());
+    } catch (error) {
+        // Nothing cached
+    }
+}
+
+async function login() {
+    await scraper.login(
+        process.env.TWITTER_USERNAME,
+        process.env.TWITTER_PASSWORD,
+        process.env.TWITTER_EMAIL
+    );
+    log('Logged in successfully');
+    sessionSource = 'login';
+
+    try {
+        await saveSession();
+    } catch (error) {
+        log('Could not cache session:', error.message);
+    }
+}
+
+function ensureLoggedIn({ fresh = false } = {}) {
+    if (fresh) {
+        dropSession();
+        loginPromise = null;
+    }
+
+    if (!loginPromise) {
+        loginPromise = (async () => {
+            if (!fresh && (await loadSession())) {
+                log('Reusing cached session');
+                sessionSource = 'cache';
+                return;
+            }
+            await login();
+        })().catch((error) => {
+            // Allow the next request to try logging in again
+            loginPromise = null;
+            sessionSource = null;
+            throw error;
+        });
+    }
+    return loginPromise;
+}
+
+async function tweetIdFrom(response) {
+    // sendTweet returns the raw GraphQL response; the ID is best effort
+    try {
+        const body = await response.json();
+        return body.data.create_tweet.tweet_results.result.rest_id || null;
+    } catch (error) {
+        return null;
+    }
+}
+
+async function postTweet(request) {
+    const session = ensureLoggedIn();
+    await session;
+    const usedCachedSession = sessionSource === 'cache';
+
+    if (cancelled.delete(request.id)) {
+        return { success: false, error: 'Cancelled before posting' };
+    }
+
+    send({ id: request.id, started: true });
+    log(`Posting tweet: ${request.text}`);
+    if (request.image_url) {
+        log(`With image: ${request.image_url}`);
+    }
+
+    // Media has already been fetched and resized by tweet_media.py
+    const media = request.media_path
+        ? [{ data: fs.readFileSync(request.media_path), mediaType: request.media_type }]
+        : undefined;
+
+    const replyTo = request.reply_to || undefined;
+    let response;
+    try {
+        response = await scraper.sendTweet(request.text, replyTo, media);
+    } catch (error) {
+        if (!usedCachedSession || !AUTH_ERROR.test(error.message)) {
+            throw error;
+        }
+
+        // The cached cookies are no longer valid: log in again and retry
+        // once. Concurrent posts that hit the same error share one login.
+        if (loginPromise === session) {
+            log('Cached session rejected, logging in again');
+            await ensureLoggedIn({ fresh: true });
+        } else {
+            await ensureLoggedIn();
+        }
+        response = await scraper.sendTweet(request.text, replyTo, media);
+    }
+    return {
+        success: true,
+        message: 'Tweet posted successfully',
+        tweet_id: await tweetIdFrom(response),
+    };
+}
+
+async function handle(request) {
+    switch (request.op) {
+        case 'ping':
+            return { success: true, message: 'pong', session: sessionSource };
+        case 'post':
+            inFlight.add(request.id);
+            try {
+                return await postTweet(request);
+            } finally {
+                inFlight.delete(request.id);
+                cancelled.delete(request.id);
+            }
+        case 'cancel':
+            if (inFlight.has(request.target)) {
+                cancelled.add(request.target);
+            }
+            return { success: true, message: 'cancelled' };
+        default:
+            return { success: false, error: `Unknown op: ${request.op}` };
+    }
+}
+
+const rl = readline.createInterface({ input: process.stdin, terminal: false });
+
+rl.on('line', (line) => {
+    if (!line.trim()) {
+        return;
+    }
+
+    let request;
+    try {
+        request = JSON.parse(line);
+    } catch (error) {
+        log('Ignoring malformed request:', error.message);
+        return;
+    }
+
+    // Requests are handled concurrently; responses are matched by id
+    handle(request)
+        .then((result) => send({ id: request.id, ...result }))
+        .catch((error) => {
+            log('Error handling request:', error.message);
+            send({ id: request.id, success: false, error: error.message });
+        });
+});
+
+// Exit when the Python side closes our stdin
+rl.on('close', () => process.exit(0));
+
+// Start logging in straight away so the first post doesn't pay for it
+ensureLoggedIn().catch((error) => log('Initial login failed:', error.message));
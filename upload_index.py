@@ -0,0 +1,228 @@
+#!/usr/bin/env python3
+"""
+Index of content already uploaded to IPFS.
+
+Maps a content key to the IPFS URI its upload returned, so uploading the
+same content again (a file submitted twice, a retried run, a speculative
+upload followed by a real one) completes at once without sending anything.
+Local files are keyed by the SHA-256 of their bytes, so a copy or a renamed
+file still matches. Remote URLs are keyed by the SHA-256 of the URL.
+
+Entries can go stale if a pin is removed from the IPFS service. `verify`
+checks every entry against a gateway and evicts those that are gone, and
+`evict` removes entries by age.
+
+Example:
+    python upload_index.py stats
+    python upload_index.py verify --gateway https://gateway.pinata.cloud/ipfs/
+    python upload_index.py evict --older-than-days 30
+"""
+
+import os
+import sys
+import time
+import sqlite3
+import hashlib
+import argparse
+import threading
+from contextlib import closing
+
+from local_upload import DEFAULT_STATE_PATH, file_sha256
+
+# Default location of the index (shared with the upload state)
+DEFAULT_INDEX_PATH = os.getenv("UPLOAD_INDEX_PATH", DEFAULT_STATE_PATH)
+
+# Look up uploads in the index before sending them
+UPLOAD_DEDUPE = os.getenv("UPLOAD_DEDUPE", "1").lower() not in ("0", "false", "no")
+
+# Gateway used to check that indexed content is still available
+DEFAULT_GATEWAY = os.getenv("IPFS_GATEWAY_URL", "https://ipfs.io/ipfs/")
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS upload_index (
+    key TEXT PRIMARY KEY,
+    ipfs_uri TEXT NOT NULL,
+    source TEXT,
+    created_at REAL NOT NULL,
+    last_used_at REAL NOT NULL,
+    uses INTEGER NOT NULL DEFAULT 0
+);
+"""
+
+
+def content_key(content_url, progress=None):
+    """Return the index key for content about to be uploaded.
+
+    Args:
+        content_url (str): file:// URL, http(s) URL or other upload input
+        progress (callable): Passed to file_sha256 when a local file is hashed
+
+    Returns:
+        str: "sha256:<digest of the bytes>" for existing local files,
+            otherwise "url:<digest of the URL>"
+    """
+    if content_url.startswith("file://"):
+        path = content_url[len("file://"):]
+        if os.path.isfile(path):
+            return f"sha256:{file_sha256(path, progress=progress)}"
+    return f"url:{hashlib.sha256(content_url.encode()).hexdigest()}"
+
+
+class UploadIndex:
+    """SQLite map from content key to IPFS URI."""
+
+    def __init__(self, path=DEFAULT_INDEX_PATH):
+        """Open (and create if needed) the index.
+
+        Args:
+            path (str): Path to the SQLite database file
+        """
+        self.path = path
+        self.hits = 0
+        self.misses = 0
+        self._stats_lock = threading.Lock()
+        with closing(self._connect()) as conn, conn:
+            conn.execute("PRAGMA journal_mode=WAL")
+            conn.executescript(SCHEMA)
+
+    def _connect(self):
+        return sqlite3.connect(self.path, timeout=30)
+
+    def lookup(self, key):
+        """Return the IPFS URI stored for a key, or None.
+
+        Args:
+            key (str): Key from content_key()
+
+        Returns:
+            str or None: The IPFS URI
+        """
+        with closing(self._connect()) as conn, conn:
+            row = conn.execute("SELECT ipfs_uri FROM upload_index WHERE key = ?", (key,)).fetchone()
+            if row:
+                conn.execute(
+                    "UPDATE upload_index SET last_used_at = ?, uses = uses + 1 WHERE key = ?",
+                    (time.time(), key),
+                )
+        with self._stats_lock:
+            if row:
+                self.hits += 1
+            else:
+                self.misses += 1
+        return row[0] if row else None
+
+    def record(self, key, ipfs_uri, source=None):
+        """Store the IPFS URI an upload returned.
+
+        Args:
+            key (str): Key from content_key()
+            ipfs_uri (str): The uploaded content's URI
+            source (str): The uploaded URL or path, for reference
+        """
+        now = time.time()
+        with closing(self._connect()) as conn, conn:
+            conn.execute(
+                "INSERT OR REPLACE INTO upload_index (key, ipfs_uri, source, created_at, last_used_at) "
+                "VALUES (?, ?, ?, ?, ?)",
+                (key, ipfs_uri, source, now, now),
+            )
+
+    def evict(self, older_than=None, ipfs_uri=None):
+        """Remove entries and return how many were removed.
+
+        Args:
+            older_than (float): Remove entries not used for this many seconds
+            ipfs_uri (str): Remove entries pointing at this URI
+
+        Returns:
+            int: Entries removed
+        """
+        with closing(self._connect()) as conn, conn:
+            if ipfs_uri is not None:
+                return conn.execute("DELETE FROM upload_index WHERE ipfs_uri = ?", (ipfs_uri,)).rowcount
+            if older_than is not None:
+                return conn.execute(
+                    "DELETE FROM upload_index WHERE last_used_at < ?", (time.time() - older_than,)
+                ).rowcount
+        return 0
+
+    def verify(self, is_available):
+        """Evict entries whose content is no longer available.
+
+        Args:
+            is_available (callable): Returns whether an IPFS URI can be fetched
+
+        Returns:
+            tuple: (entries checked, entries evicted)
+        """
+        with closing(self._connect()) as conn:
+            uris = [row[0] for row in conn.execute("SELECT DISTINCT ipfs_uri FROM upload_index")]
+        gone = [uri for uri in uris if not is_available(uri)]
+        evicted = sum(self.evict(ipfs_uri=uri) for uri in gone)
+        return len(uris), evicted
+
+    def stats(self):
+        """Return the number of entries and this process's hits, misses and hit rate."""
+        with closing(self._connect()) as conn:
+            entries, uses = conn.execute("SELECT COUNT(*), COALESCE(SUM(uses), 0) FROM upload_index").fetchone()
+        with self._stats_lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": entries,
+                "total_reuses": uses,
+                "hits": self.hits,
+                "misses": self.misses,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+
+def gateway_check(gateway=DEFAULT_GATEWAY, timeout=30):
+    """Return an is_available(ipfs_uri) function that asks an IPFS gateway."""
+    import httpx
+
+    def is_available(ipfs_uri):
+        url = gateway.rstrip("/") + "/" + ipfs_uri.removeprefix("ipfs://")
+        try:
+            return httpx.head(url, timeout=timeout, follow_redirects=True).status_code < 400
+        except httpx.HTTPError:
+            # Unreachable gateway: keep the entry rather than guess
+            return True
+
+    return is_available
+
+
+_upload_index = None
+
+
+def get_upload_index():
+    """Return the process-wide upload index, or None if dedupe is disabled."""
+    global _upload_index
+    if _upload_index is None and UPLOAD_DEDUPE:
+        _upload_index = UploadIndex()
+    return _upload_index
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    commands = parser.add_subparsers(dest="command", required=True)
+    commands.add_parser("stats", help="show the number of entries and reuses")
+    verify = commands.add_parser("verify", help="evict entries a gateway no longer serves")
+    verify.add_argument("--gateway", default=DEFAULT_GATEWAY, help="IPFS gateway URL prefix")
+    evict = commands.add_parser("evict", help="evict entries by age")
+    evict.add_argument("--older-than-days", type=float, required=True, help="evict entries unused for this long")
+    args = parser.parse_args()
+
+    index = UploadIndex()
+    if args.command == "stats":
+        stats = index.stats()
+        print(f"entries: {stats['entries']}, reuses: {stats['total_reuses']}")
+    elif args.command == "verify":
+        checked, evicted = index.verify(gateway_check(args.gateway))
+        print(f"checked: {checked}, evicted: {evicted}")
+    else:
+        print(f"evicted: {index.evict(older_than=args.older_than_days * 24 * 60 * 60)}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())